@@ -0,0 +1,50 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from components.routing_table import RoutingTable
+
+def generate_routes(count, seed):
+    # BGP の経路表に近い長さの分布（/24 が中心）でランダムな経路を生成する
+    rng = random.Random(seed)
+    lengths = [8] * 1 + [16] * 10 + [20] * 15 + [22] * 15 + [24] * 55 + [28] * 3 + [32] * 1
+    routes = {}
+    while len(routes) < count:
+        length = rng.choice(lengths)
+        address = rng.getrandbits(32) & ((0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF)
+        routes[f"{address >> 24}.{(address >> 16) & 0xFF}.{(address >> 8) & 0xFF}.{address & 0xFF}/{length}"] = {"out_port": rng.randrange(48)}
+    return list(routes.items())
+
+def main():
+    parser = argparse.ArgumentParser(description="最長一致の転送表の構築時間と検索速度を計測します。")
+    parser.add_argument("--prefixes", type=int, default=100_000, help="経路数")
+    parser.add_argument("--lookups", type=int, default=1_000_000, help="検索回数")
+    parser.add_argument("--seed", type=int, default=0, help="乱数シード")
+    args = parser.parse_args()
+
+    routes = generate_routes(args.prefixes, args.seed)
+    table = RoutingTable()
+    started = time.perf_counter()
+    table.bulk_load(routes)
+    load_time = time.perf_counter() - started
+
+    rng = random.Random(args.seed + 1)
+    addresses = [rng.getrandbits(32) for _ in range(args.lookups)]
+    lookup = table.lookup
+    started = time.perf_counter()
+    hits = 0
+    for address in addresses:
+        if lookup(address) is not None:
+            hits += 1
+    lookup_time = time.perf_counter() - started
+
+    print(f"経路数: {len(table)}")
+    print(f"一括構築: {load_time:.3f} 秒")
+    print(f"検索: {args.lookups / lookup_time:,.0f} 回/秒（一致 {hits / args.lookups:.1%}）")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+import functools
+
+# アクションの辞書で使用できるキー
+ACTION_KEYS = ("out_port", "group", "set_field", "drop", "goto_table", "write_actions", "clear_actions")
+# write_actions（アクションセット）で使用できるキー
+WRITE_ACTION_KEYS = ("out_port", "group", "set_field")
+# set_field で書き換えられるパケットのフィールド
+SET_FIELDS = ("src", "dst", "src_mac", "dst_mac", "protocol", "src_port", "dst_port", "ttl")
+
+def _set_fields(fields, packet):
+    # パケットのフィールドを書き換える（fields は (フィールド名, 値) のタプル）
+    for name, value in fields:
+        setattr(packet, name, value)
+
+def _output_ports(send_packet, ports, packet):
+    # 最後のポート以外には複製を、最後のポートには元のパケットを送信する
+    for port in ports[:-1]:
+        send_packet(packet.copy(), port)
+    send_packet(packet, ports[-1])
+
+def _fan_out(outputs, packet):
+    # 最後の出力以外には複製を、最後の出力には元のパケットを渡す
+    for output in outputs[:-1]:
+        output(packet.copy())
+    outputs[-1](packet)
+
+def _compile_set_field(fields):
+    unknown = set(fields) - set(SET_FIELDS)
+    if unknown:
+        raise ValueError(f"書き換えできないフィールドです: {', '.join(sorted(unknown))}")
+    items = list(fields.items())
+    # アドレスを書き換えた場合は、パケットに記録したアドレス ID を求め直させる
+    if "src" in fields:
+        items.append(("src_id", None))
+    if "dst" in fields:
+        items.append(("dst_id", None))
+    return functools.partial(_set_fields, tuple(items))
+
+def _compile_output(actions, send_packet, groups):
+    # out_port と group を 1 つの出力の関数にまとめる（どちらも無い場合は None）
+    outputs = []
+    out_port = actions.get("out_port")
+    ports = tuple(out_port) if isinstance(out_port, (list, tuple)) else (() if out_port is None else (out_port,))
+    if len(ports) == 1:
+        outputs.append(functools.partial(send_packet, out_port=ports[0]))
+    elif ports:
+        outputs.append(functools.partial(_output_ports, send_packet, ports))
+    group_id = actions.get("group")
+    if group_id is not None:
+        group = (groups or {}).get(group_id)
+        if group is None:
+            raise ValueError(f"グループ {group_id} は存在しません。")
+        outputs.append(group.process)
+    if not outputs:
+        return None
+    if len(outputs) == 1:
+        return outputs[0]
+    return functools.partial(_fan_out, tuple(outputs))
+
+class ActionProgram:
+    """
+    フローエントリのアクションの辞書を、インストール時に呼び出し可能なオブジェクトの組に変換したもの。
+    パケットごとの処理では辞書の参照や文字列の比較を行わず、属性を順に参照して呼び出すだけで済みます。
+    """
+
+    __slots__ = ("set_field", "output", "goto_table", "write", "clear_actions", "drop")
+
+    def __init__(self, set_field=None, output=None, goto_table=None, write=(), clear_actions=False, drop=False):
+        self.set_field = set_field  # フィールドを書き換える関数 f(packet)（オプション）
+        self.output = output  # パケットを出力する関数 f(packet)（オプション）
+        self.goto_table = goto_table  # 次に検索するテーブルの番号（オプション）
+        self.write = write  # アクションセットに書き込む (種類, 関数) のタプル
+        self.clear_actions = clear_actions  # アクションセットを空にするかどうか
+        self.drop = drop  # パケットを破棄してパイプラインを終了するかどうか
+
+def compile_action(action, send_packet, table_id=0, groups=None):
+    """
+    アクションの辞書を ActionProgram に変換します。
+
+    アクションの辞書のキー:
+        out_port (int or list): パケットを出力するポート（リストの場合は複数のポートに複製して出力）。
+        group (int): パケットを渡すグループの番号（components.group_table.Group）。
+        set_field (dict): 書き換えるフィールド（src、dst、src_mac、dst_mac、protocol、src_port、dst_port、ttl）。
+        drop (bool): True の場合はパケットを破棄します。
+        goto_table (int): 続けて検索するテーブルの番号（現在のテーブルより大きい値）。
+        write_actions (dict): アクションセットに書き込むアクション（out_port、group、set_field）。
+            アクションセットはパイプラインの終了時に set_field、出力（out_port、group）の順に実行されます。
+        clear_actions (bool): True の場合はアクションセットを空にします。
+
+    out_port、group、set_field は検索したテーブルで直ちに（set_field、out_port、group の順に）実行されます。
+
+    Args:
+        action (dict): アクションの辞書。
+        send_packet (callable): send_packet(packet, out_port) の形でパケットを出力する関数。
+        table_id (int): エントリを登録するテーブルの番号。
+        groups (dict): グループの番号 -> Group（group を参照する場合に必要）。
+
+    Returns:
+        ActionProgram: 変換したアクション。
+
+    Raises:
+        ValueError: 未対応のキーやフィールドが含まれる場合、存在しないグループを参照する場合、
+            または goto_table が現在のテーブル以下の場合に発生。
+    """
+    unknown = set(action) - set(ACTION_KEYS)
+    if unknown:
+        raise ValueError(f"未対応のアクションです: {', '.join(sorted(unknown))}")
+    goto_table = action.get("goto_table")
+    if goto_table is not None and goto_table <= table_id:
+        raise ValueError(f"goto_table はテーブル {table_id} より大きい番号である必要があります: {goto_table}")
+    if action.get("drop"):
+        return ActionProgram(drop=True)
+
+    write = []
+    write_actions = action.get("write_actions") or {}
+    unknown = set(write_actions) - set(WRITE_ACTION_KEYS)
+    if unknown:
+        raise ValueError(f"アクションセットに書き込めないアクションです: {', '.join(sorted(unknown))}")
+    if write_actions.get("set_field"):
+        write.append(("set_field", _compile_set_field(write_actions["set_field"])))
+    write_output = _compile_output(write_actions, send_packet, groups)
+    if write_output is not None:
+        write.append(("output", write_output))
+
+    return ActionProgram(
+        set_field=_compile_set_field(action["set_field"]) if action.get("set_field") else None,
+        output=_compile_output(action, send_packet, groups),
+        goto_table=goto_table,
+        write=tuple(write),
+        clear_actions=bool(action.get("clear_actions")),
+    )
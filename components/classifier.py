@@ -0,0 +1,215 @@
+import ipaddress
+from core.address_registry import ipv4_value
+
+# マッチ条件に使用できるフィールド
+MATCH_FIELDS = ("in_port", "src", "dst", "protocol", "src_port", "dst_port")
+DEFAULT_PRIORITY = 0x8000  # OpenFlow の既定の優先度
+
+def _parse_prefix(value):
+    # "10.0.0.0/24" または "10.0.0.1" を (ネットワークアドレスの数値, プレフィックス長) に変換する
+    network = ipaddress.IPv4Network(value, strict=False)
+    return int(network.network_address), network.prefixlen
+
+def _prefix_mask(length):
+    return (0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF if length else 0
+
+class FlowEntry:
+    """
+    分類器に登録されたフローエントリ。
+    タイムアウトが設定されたエントリは、スイッチが期限の管理にも使用します。
+    """
+
+    def __init__(self, match, action, priority):
+        """
+        フローエントリを初期化します。
+
+        Args:
+            match (dict): マッチ条件（フィールド名 -> 値）。
+            action (dict): 実行するアクション。
+            priority (int): 優先度（大きいほど優先）。
+        """
+        self.match = match
+        self.action = action
+        self.priority = priority
+        self.idle_timeout = 0  # 最後に一致してからこの秒数が経過すると削除（0 は無期限）
+        self.hard_timeout = 0  # インストールからこの秒数が経過すると削除（0 は無期限）
+        self.entry_id = None  # 統計情報の配列の添字（スイッチが割り当てる）
+        self.table_id = 0  # 登録されているパイプラインのテーブルの番号
+        self.program = None  # アクションを変換した ActionProgram（スイッチが設定する）
+        self.last_used = 0.0  # 最後にパケットが一致したシミュレーション時刻
+        self.timer = None  # タイミングホイールのハンドル
+
+class _Subtable:
+    # 同じマスク（どのフィールドを何ビット比較するか）を持つエントリのハッシュテーブル
+    def __init__(self, mask):
+        self.mask = mask  # (in_port, src プレフィックス長, dst プレフィックス長, protocol, src_port, dst_port)
+        self.use_in_port, src_length, dst_length, self.use_protocol, self.use_src_port, self.use_dst_port = mask
+        self.src_mask = _prefix_mask(src_length)
+        self.dst_mask = _prefix_mask(dst_length)
+        self.entries = {}  # マスク後のキー -> 優先度の降順に並べた FlowEntry のリスト
+        self.max_priority = -1
+
+    def key(self, in_port, src, dst, protocol, src_port, dst_port):
+        return (
+            in_port if self.use_in_port else None,
+            src & self.src_mask,
+            dst & self.dst_mask,
+            protocol if self.use_protocol else None,
+            src_port if self.use_src_port else None,
+            dst_port if self.use_dst_port else None,
+        )
+
+class Classifier:
+    """
+    優先度とワイルドカードを持つ OpenFlow 形式のフロー分類器。
+
+    タプル空間探索を使用し、マスク（比較するフィールドとプレフィックス長の組）ごとに 1 つのハッシュテーブルを
+    持ちます。検索ではテーブルを最大優先度の降順に調べ、既に見つかったエントリの優先度が残りのテーブルの
+    最大優先度以上になった時点で打ち切るため、ルールが数万あってもテーブル数に比例する回数の
+    ハッシュ検索で済みます。
+    """
+
+    def __init__(self, registry=None):
+        """
+        分類器を初期化します。
+
+        Args:
+            registry (AddressRegistry): アドレスレジストリ（オプション）。設定されている場合は
+                パケットのアドレス ID から IPv4 アドレスの数値を求めます。
+        """
+        self.registry = registry
+        self.subtables = {}  # マスク -> _Subtable
+        self.ordered = []  # 最大優先度の降順に並べた _Subtable のリスト
+        self.count = 0
+
+    def set_registry(self, registry):
+        # アドレスレジストリを設定する
+        self.registry = registry
+
+    def _normalize(self, match):
+        # マッチ条件を (マスク, キー) に変換する
+        unknown = set(match) - set(MATCH_FIELDS)
+        if unknown:
+            raise ValueError(f"未対応のマッチフィールドです: {', '.join(sorted(unknown))}")
+        src, src_length = _parse_prefix(match["src"]) if match.get("src") is not None else (0, 0)
+        dst, dst_length = _parse_prefix(match["dst"]) if match.get("dst") is not None else (0, 0)
+        protocol = match.get("protocol")
+        mask = (
+            match.get("in_port") is not None, src_length, dst_length,
+            protocol is not None, match.get("src_port") is not None, match.get("dst_port") is not None,
+        )
+        subtable = self.subtables.get(mask) or _Subtable(mask)
+        key = subtable.key(
+            match.get("in_port"), src, dst, protocol.upper() if protocol is not None else None,
+            match.get("src_port"), match.get("dst_port"),
+        )
+        return mask, key
+
+    def add(self, match, action, priority=DEFAULT_PRIORITY):
+        """
+        フローエントリを追加します。同じマッチ条件と優先度のエントリがある場合はアクションを置き換えます。
+
+        Args:
+            match (dict): マッチ条件。キーは "in_port"、"src"、"dst"（CIDR 表記可）、"protocol"、
+                "src_port"、"dst_port" で、省略したフィールドはワイルドカードになります。
+            action (dict): 実行するアクション。
+            priority (int): 優先度（大きいほど優先）。
+
+        Returns:
+            FlowEntry: 追加または更新したエントリ。
+
+        Raises:
+            ValueError: 未対応のフィールドが含まれる場合に発生。
+        """
+        mask, key = self._normalize(match)
+        subtable = self.subtables.get(mask)
+        if subtable is None:
+            subtable = self.subtables[mask] = _Subtable(mask)
+        bucket = subtable.entries.setdefault(key, [])
+        for entry in bucket:
+            if entry.priority == priority:
+                entry.action = action
+                entry.match = dict(match)
+                return entry
+        entry = FlowEntry(dict(match), action, priority)
+        bucket.append(entry)
+        bucket.sort(key=lambda item: item.priority, reverse=True)
+        self.count += 1
+        if priority > subtable.max_priority:
+            subtable.max_priority = priority
+            self._reorder()
+        elif subtable not in self.ordered:
+            self._reorder()
+        return entry
+
+    def remove(self, match, priority=DEFAULT_PRIORITY):
+        """
+        マッチ条件と優先度が一致するエントリを削除します。
+
+        Args:
+            match (dict): マッチ条件。
+            priority (int): 優先度。
+
+        Returns:
+            FlowEntry: 削除したエントリ。見つからない場合は None。
+        """
+        mask, key = self._normalize(match)
+        subtable = self.subtables.get(mask)
+        bucket = subtable.entries.get(key) if subtable is not None else None
+        if not bucket:
+            return None
+        for index, entry in enumerate(bucket):
+            if entry.priority == priority:
+                del bucket[index]
+                break
+        else:
+            return None
+        if not bucket:
+            del subtable.entries[key]
+        self.count -= 1
+        if not subtable.entries:
+            del self.subtables[mask]
+        else:
+            subtable.max_priority = max(bucket[0].priority for bucket in subtable.entries.values())
+        self._reorder()
+        return entry
+
+    def _reorder(self):
+        self.ordered = sorted(self.subtables.values(), key=lambda subtable: subtable.max_priority, reverse=True)
+
+    def _ip_value(self, address, address_id):
+        if self.registry is not None:
+            return self.registry.ip_value(address, address_id)
+        return ipv4_value(address)
+
+    def lookup(self, packet, in_port=None):
+        """
+        パケットに一致する最も優先度の高いエントリを返します。
+
+        Args:
+            packet (Packet): 検索するパケット。
+            in_port (int): パケットを受信したポート番号。
+
+        Returns:
+            FlowEntry: 一致したエントリ。一致しない場合は None。
+        """
+        if not self.ordered:
+            return None
+        src = self._ip_value(packet.src, packet.src_id)
+        dst = self._ip_value(packet.dst, packet.dst_id)
+        protocol = packet.protocol.upper() if packet.protocol else None
+        best = None
+        for subtable in self.ordered:
+            if best is not None and best.priority >= subtable.max_priority:
+                break  # 残りのテーブルにはより優先度の高いエントリが無い
+            bucket = subtable.entries.get(subtable.key(in_port, src, dst, protocol, packet.src_port, packet.dst_port))
+            if bucket and (best is None or bucket[0].priority > best.priority):
+                best = bucket[0]
+        return best
+
+    def entries(self):
+        # 登録されているすべてのエントリを返す
+        return [entry for subtable in self.ordered for bucket in subtable.entries.values() for entry in bucket]
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,91 @@
+from array import array
+
+class FlowCounters:
+    """
+    フローエントリのパケット数、バイト数、インストール時刻を、エントリ ID を添字とする配列にまとめて保持します。
+    エントリごとに辞書やオブジェクトを持たないため、転送時の更新は配列の 2 要素の加算だけで済み、
+    集計は配列全体の合計で求められます。削除したエントリの ID はカウンタを 0 に戻して再利用します。
+    """
+
+    def __init__(self):
+        """
+        カウンタを初期化します。
+        """
+        self.packet_counts = array("Q")  # エントリ ID -> 一致したパケット数
+        self.byte_counts = array("Q")  # エントリ ID -> 一致したバイト数
+        self.install_times = array("d")  # エントリ ID -> インストールしたシミュレーション時刻
+        self.free_ids = []  # 再利用できるエントリ ID
+
+    def allocate(self, now):
+        """
+        新しいエントリ ID を割り当てます。
+
+        Args:
+            now (float): インストールしたシミュレーション時刻。
+
+        Returns:
+            int: エントリ ID。
+        """
+        if self.free_ids:
+            entry_id = self.free_ids.pop()
+            self.install_times[entry_id] = now
+            return entry_id
+        self.packet_counts.append(0)
+        self.byte_counts.append(0)
+        self.install_times.append(now)
+        return len(self.install_times) - 1
+
+    def reset(self, entry_id, now):
+        # エントリのカウンタを 0 に戻し、インストール時刻を設定し直す
+        self.packet_counts[entry_id] = 0
+        self.byte_counts[entry_id] = 0
+        self.install_times[entry_id] = now
+
+    def release(self, entry_id):
+        """
+        削除したエントリの ID を解放します。
+
+        Args:
+            entry_id (int): エントリ ID。
+        """
+        self.packet_counts[entry_id] = 0
+        self.byte_counts[entry_id] = 0
+        self.free_ids.append(entry_id)
+
+    def record(self, entry_id, size_bytes):
+        # エントリに一致したパケットを 1 つ計上する
+        self.packet_counts[entry_id] += 1
+        self.byte_counts[entry_id] += size_bytes
+
+    def stats(self, entry_id, now):
+        """
+        エントリの統計情報を返します。
+
+        Args:
+            entry_id (int): エントリ ID。
+            now (float): 現在のシミュレーション時刻。
+
+        Returns:
+            dict: パケット数、バイト数、インストールからの経過時間（秒）。
+        """
+        return {
+            "packet_count": self.packet_counts[entry_id],
+            "byte_count": self.byte_counts[entry_id],
+            "duration": now - self.install_times[entry_id],
+        }
+
+    def aggregate(self):
+        """
+        すべてのエントリの統計情報の合計を返します。
+
+        Returns:
+            dict: パケット数、バイト数、エントリ数の合計。
+        """
+        return {
+            "packet_count": sum(self.packet_counts),
+            "byte_count": sum(self.byte_counts),
+            "flow_count": len(self.install_times) - len(self.free_ids),
+        }
+
+    def __len__(self):
+        return len(self.install_times) - len(self.free_ids)
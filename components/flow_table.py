@@ -0,0 +1,92 @@
+from collections.abc import MutableMapping
+from components.classifier import FlowEntry
+
+class FlowTable(MutableMapping):
+    """
+    スイッチのフローテーブル。
+    マッチ条件 (送信元 IP, 宛先 IP) -> アクションの辞書として扱えますが、内部ではアドレスレジストリの
+    整数 ID から作った 64 ビットのフローキー (src_id << 32) | dst_id をキーとしてフローエントリ（FlowEntry）を
+    保持します。レジストリが設定されていない場合（エミュレータに属していないスイッチ）はマッチ条件をそのままキーにします。
+    """
+
+    def __init__(self, registry=None):
+        """
+        フローテーブルを初期化します。
+
+        Args:
+            registry (AddressRegistry): アドレスレジストリ（オプション）。
+        """
+        self.registry = registry
+        self.entries = {}  # 内部キー -> FlowEntry
+
+    def set_registry(self, registry):
+        """
+        アドレスレジストリを設定し、既存のエントリを整数のフローキーで登録し直します。
+
+        Args:
+            registry (AddressRegistry): アドレスレジストリ。
+        """
+        entries = list(self.entries.values())
+        self.registry = registry
+        self.entries = {self._key(entry.match): entry for entry in entries}
+
+    def _key(self, match):
+        if self.registry is None:
+            return match
+        src, dst = match
+        return self.registry.flow_key(src, dst)
+
+    def lookup_entry(self, packet):
+        """
+        パケットに一致するエントリを返します。
+
+        Args:
+            packet (Packet): 検索するパケット。
+
+        Returns:
+            FlowEntry: 一致したエントリ。一致しない場合は None。
+        """
+        registry = self.registry
+        if registry is None:
+            return self.entries.get((packet.src, packet.dst))
+        return self.entries.get(registry.packet_key(packet))
+
+    def lookup(self, packet):
+        """
+        パケットに一致するエントリのアクションを返します。
+
+        Args:
+            packet (Packet): 検索するパケット。
+
+        Returns:
+            dict: 一致したエントリのアクション。一致しない場合は None。
+        """
+        entry = self.lookup_entry(packet)
+        return entry.action if entry is not None else None
+
+    def entry(self, match):
+        # マッチ条件のエントリ（FlowEntry）を返す（存在しない場合は None）
+        return self.entries.get(self._key(match))
+
+    def __getitem__(self, match):
+        return self.entries[self._key(match)].action
+
+    def __setitem__(self, match, action):
+        key = self._key(match)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.entries[key] = FlowEntry(match, action, None)
+        else:
+            entry.action = action
+
+    def __delitem__(self, match):
+        del self.entries[self._key(match)]
+
+    def __contains__(self, match):
+        return self._key(match) in self.entries
+
+    def __iter__(self):
+        return (entry.match for entry in self.entries.values())
+
+    def __len__(self):
+        return len(self.entries)
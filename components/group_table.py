@@ -0,0 +1,179 @@
+from core.address_registry import ipv4_value
+from core.wire import lookup_protocol_number
+
+# グループの種類
+GROUP_ALL = "all"  # すべてのバケットを実行する（フラッディング、マルチキャスト）
+GROUP_SELECT = "select"  # ヘッダのハッシュで 1 つのバケットを選ぶ（ECMP）
+GROUP_FAST_FAILOVER = "fast_failover"  # 監視ポートが有効な最初のバケットを実行する
+GROUP_TYPES = (GROUP_ALL, GROUP_SELECT, GROUP_FAST_FAILOVER)
+# バケットの辞書で使用できるキー
+BUCKET_KEYS = ("actions", "weight", "watch_port")
+
+def flow_hash(packet):
+    """
+    パケットの 5 タプル（送信元・宛先アドレス、プロトコル、送信元・宛先ポート）のハッシュ値を返します。
+    整数のタプルのハッシュを使用するため、文字列のハッシュと異なり実行ごとに値が変わりません。
+    プロトコル名は大文字・小文字を区別せずに番号へ変換します。
+
+    Args:
+        packet (Packet): 対象のパケット。
+
+    Returns:
+        int: ハッシュ値。
+    """
+    return hash((
+        ipv4_value(packet.src), ipv4_value(packet.dst),
+        lookup_protocol_number(packet.protocol), packet.src_port, packet.dst_port,
+    ))
+
+class Bucket:
+    """
+    グループのバケット（実行するアクションの組）。
+    """
+
+    def __init__(self, action, program, weight=1, watch_port=None):
+        """
+        バケットを初期化します。
+
+        Args:
+            action (dict): バケットのアクション（out_port、set_field）。
+            program (ActionProgram): アクションを変換したもの。
+            weight (int): SELECT グループで選ばれる重み。
+            watch_port (int): 有効かどうかを監視するポート（オプション）。
+        """
+        self.action = action
+        self.program = program
+        self.weight = weight
+        self.watch_port = watch_port
+        self.packets = 0  # このバケットで処理したパケット数
+
+    def run(self, packet):
+        # バケットのアクションを実行する
+        self.packets += 1
+        program = self.program
+        if program.set_field is not None:
+            program.set_field(packet)
+        if program.output is not None:
+            program.output(packet)
+        else:
+            packet.release()
+
+class Group:
+    """
+    OpenFlow のグループテーブルのエントリ。フローエントリのアクションから "group" で参照されます。
+
+    SELECT グループは重みの比率でバケットの番号を並べた表をあらかじめ作成しておき、5 タプルのハッシュで
+    表を引くため、同じフローのパケットは常に同じバケットに振り分けられます。選ばれたバケットの監視ポートが
+    ダウンしている場合のみ有効なバケットで表を引き直すため、他のバケットのフローは移動しません。
+    """
+
+    def __init__(self, switch, group_id, group_type, buckets):
+        """
+        グループを初期化します。
+
+        Args:
+            switch (Switch): グループを持つスイッチ（ポートの状態の確認に使用）。
+            group_id (int): グループの番号。
+            group_type (str): "all"、"select"、"fast_failover" のいずれか。
+            buckets (list): Bucket のリスト。
+        """
+        self.switch = switch
+        self.group_id = group_id
+        self.set_buckets(group_type, buckets)
+        self.dropped_packets = 0  # 有効なバケットが無く破棄したパケット数
+
+    def set_buckets(self, group_type, buckets):
+        """
+        グループの種類とバケットを設定します。グループを参照するフローエントリはそのまま新しいバケットを使用します。
+
+        Args:
+            group_type (str): グループの種類。
+            buckets (list): Bucket のリスト。
+        """
+        self.group_type = group_type
+        self.buckets = buckets
+        # SELECT グループで使用する、重みに比例した回数だけバケットの番号を並べた表
+        self.select_table = tuple(index for index, bucket in enumerate(buckets) for _ in range(bucket.weight))
+        self.apply = {
+            GROUP_ALL: self._apply_all,
+            GROUP_SELECT: self._apply_select,
+            GROUP_FAST_FAILOVER: self._apply_fast_failover,
+        }[group_type]
+
+    def process(self, packet):
+        """
+        パケットにグループを適用します。フローエントリのアクションはこのメソッドを参照するため、
+        グループを変更してもフローエントリを変換し直す必要はありません。
+
+        Args:
+            packet (Packet): 対象のパケット。
+        """
+        self.apply(packet)
+
+    def is_live(self, bucket):
+        """
+        バケットが有効か（監視ポートのリンクが接続されていてアップしているか）を返します。
+
+        Args:
+            bucket (Bucket): 対象のバケット。
+
+        Returns:
+            bool: 有効な場合は True。監視ポートが無いバケットは常に有効です。
+        """
+        port = bucket.watch_port
+        if port is None:
+            return True
+        links = self.switch.links
+        return port < len(links) and links[port].up
+
+    def _apply_all(self, packet):
+        # すべてのバケットを実行する（最後のバケット以外には複製を渡す）
+        buckets = self.buckets
+        if not buckets:
+            self._drop(packet)
+            return
+        for bucket in buckets[:-1]:
+            bucket.run(packet.copy())
+        buckets[-1].run(packet)
+
+    def _apply_select(self, packet):
+        # 5 タプルのハッシュでバケットを 1 つ選んで実行する
+        table = self.select_table
+        if not table:
+            self._drop(packet)
+            return
+        digest = flow_hash(packet)
+        bucket = self.buckets[table[digest % len(table)]]
+        if not self.is_live(bucket):
+            live = tuple(index for index in table if self.is_live(self.buckets[index]))
+            if not live:
+                self._drop(packet)
+                return
+            bucket = self.buckets[live[digest % len(live)]]
+        bucket.run(packet)
+
+    def _apply_fast_failover(self, packet):
+        # 監視ポートが有効な最初のバケットを実行する
+        for bucket in self.buckets:
+            if self.is_live(bucket):
+                bucket.run(packet)
+                return
+        self._drop(packet)
+
+    def _drop(self, packet):
+        self.dropped_packets += 1
+        packet.release()
+
+    def get_stats(self):
+        """
+        グループの統計情報を返します。
+
+        Returns:
+            dict: グループの種類、バケットごとのパケット数、破棄したパケット数。
+        """
+        return {
+            "group_id": self.group_id,
+            "group_type": self.group_type,
+            "bucket_packets": [bucket.packets for bucket in self.buckets],
+            "dropped_packets": self.dropped_packets,
+        }
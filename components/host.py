@@ -1,5 +1,6 @@
 from components.node import Node
 from core.packet import Packet
+from core.tracing import tracer, TRACE_RECEIVE, TRACE_SEND
 import threading
 import time
 
@@ -36,12 +37,13 @@ class Host(Node):
             payload (str): パケットのペイロード。
         """
         packet = Packet(
-            src_ip=self.ip_address,
-            dst_ip=destination_ip,
+            src=self.ip_address,
+            dst=destination_ip,
             src_mac=self.mac_address,
             dst_mac="ff:ff:ff:ff:ff:ff",  # ブロードキャスト MAC アドレス（仮）
             protocol="TCP",
-            payload=payload
+            payload=payload,
+            timestamp=self.emulator.current_time if self.emulator is not None else 0.0
         )
         # 送信ポートはゼロで仮置き
         self.send_packet(packet, 0)
@@ -56,8 +58,9 @@ class Host(Node):
         """
         # 送信パケット数と送信バイト数を更新
         self.sent_packets += 1
-        self.sent_bytes += len(packet.payload)
-        print(f"{self.name} からパケットを送信しました: {packet.payload}")
+        self.sent_bytes += packet.size_bytes
+        if tracer.packets:
+            tracer.record(TRACE_SEND, self, packet, port)
         # パケットをリンクに転送（仮実装）
         if self.links:
             self.links[port].transfer_packet(packet, self)
@@ -72,8 +75,11 @@ class Host(Node):
         """
         # 受信パケット数と受信バイト数を更新
         self.received_packets += 1
-        self.received_bytes += len(packet.payload)
-        print(f"{self.name} がパケットを受信しました: {packet.payload}")
+        self.received_bytes += packet.size_bytes
+        if tracer.packets:
+            tracer.record(TRACE_RECEIVE, self, packet, port)
+        # ホストはパケットの終点のため、プールから取得したパケットであれば返却する
+        packet.release()
 
     def start_sending_packets(self, dst_ip, payload, interval=1.0, duration=10):
         """
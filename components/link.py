@@ -1,6 +1,100 @@
 import random
-import time
-import queue
+from collections import deque
+from core.event_queue import Event
+from core.tracing import tracer, TRACE_LINK_DOWN, TRACE_LINK_LOSS, TRACE_QUEUE_DROP
+
+# バッファサイズをパケット数で指定した場合に 1 パケットあたりに見込むバイト数
+DEFAULT_MTU = 1500
+
+class EgressQueue:
+    """
+    リンクの片方向の送信キューを表します。
+    キューの占有量はバイト単位で管理し、送信中および送信待ちのパケットを保持します。
+    送信はFIFOで非プリエンプティブなため、各パケットの送信完了時刻はキュー投入時に確定します。
+    """
+
+    def __init__(self, src_node, dst_node, capacity_bytes):
+        """
+        送信キューを初期化します。
+
+        Args:
+            src_node (Node): この方向の送信側ノード。
+            dst_node (Node): この方向の受信側ノード。
+            capacity_bytes (int): キューに保持できる最大バイト数。
+        """
+        self.src_node = src_node
+        self.dst_node = dst_node
+        self.capacity_bytes = capacity_bytes
+        self.queue = deque()  # (送信完了時刻, バイト数) の組（ロック不要の両端キュー）
+        self.queued_bytes = 0  # 現在キューに存在するバイト数
+        self.busy_until = 0.0  # 送信機が空くシミュレーション時刻
+        # 統計情報の初期化
+        self.sent_packets = 0
+        self.sent_bytes = 0
+        self.dropped_packets = 0  # テールドロップしたパケット数
+        self.dropped_bytes = 0  # テールドロップしたバイト数
+        self.max_queued_bytes = 0  # キュー占有量の最大値
+        self.loss_stream = None  # パケット損失の判定に使う乱数ストリーム（初回送信時に取得）
+        self.tap = None  # この方向のキャプチャタップ（無効な場合は None）
+        self.in_port = None  # 受信側ノードでのリンクのポート番号（両端の接続時に設定）
+
+    def drain(self, now):
+        """
+        指定時刻までに送信が完了したパケットをキューから取り除きます。
+
+        Args:
+            now (float): 現在のシミュレーション時刻（秒）。
+        """
+        queue = self.queue
+        while queue and queue[0][0] <= now:
+            self.queued_bytes -= queue.popleft()[1]
+
+    def enqueue(self, size, now, bandwidth_bps):
+        """
+        パケットをキューに追加し、送信完了時刻を返します。
+        キューに空きが無い場合はテールドロップします。
+
+        Args:
+            size (int): パケットのバイト数。
+            now (float): 現在のシミュレーション時刻（秒）。
+            bandwidth_bps (float): リンクの帯域幅（bps）。
+
+        Returns:
+            float or None: 送信完了時刻（秒）。ドロップした場合は None。
+        """
+        self.drain(now)
+        if self.queued_bytes + size > self.capacity_bytes:
+            self.dropped_packets += 1
+            self.dropped_bytes += size
+            return None
+
+        # 送信機が空き次第、シリアライズ時間をかけて送信する
+        start = self.busy_until if self.busy_until > now else now
+        finish = start + size * 8 / bandwidth_bps if bandwidth_bps > 0 else start
+        self.busy_until = finish
+        self.queue.append((finish, size))
+        self.queued_bytes += size
+        if self.queued_bytes > self.max_queued_bytes:
+            self.max_queued_bytes = self.queued_bytes
+        self.sent_packets += 1
+        self.sent_bytes += size
+        return finish
+
+    def get_stats(self):
+        """
+        送信キューの統計情報を返します。
+
+        Returns:
+            dict: 送信・ドロップしたパケット数とバイト数、キュー占有量。
+        """
+        return {
+            "sent_packets": self.sent_packets,
+            "sent_bytes": self.sent_bytes,
+            "dropped_packets": self.dropped_packets,
+            "dropped_bytes": self.dropped_bytes,
+            "queued_bytes": self.queued_bytes,
+            "max_queued_bytes": self.max_queued_bytes,
+        }
 
 class Link:
     """
@@ -8,7 +102,7 @@ class Link:
     パケット転送を行い、帯域幅、遅延、パケット損失率などの特性をシミュレートします。
     """
 
-    def __init__(self, node1, node2, bandwidth=100, delay=10, packet_loss_rate=0.0, buffer_size=10):
+    def __init__(self, node1, node2, bandwidth=100, delay=10, packet_loss_rate=0.0, buffer_size=10, buffer_bytes=None):
         """
         リンクを初期化します。
 
@@ -18,72 +112,146 @@ class Link:
             bandwidth (int): リンクの帯域幅（Mbps）。
             delay (int): リンクの遅延（ミリ秒）。
             packet_loss_rate (float): パケット損失率（0.0〜1.0）。
-            buffer_size (int): リンクのバッファサイズ（待ち行列の最大数）。
+            buffer_size (int): リンクのバッファサイズ（待ち行列の最大パケット数）。
+                buffer_bytes を省略した場合は buffer_size * DEFAULT_MTU バイトとして扱います。
+            buffer_bytes (int): 各方向の送信キューの容量（バイト、オプション）。
         """
         self.node1 = node1
         self.node2 = node2
         self.bandwidth = bandwidth
         self.delay = delay
         self.packet_loss_rate = packet_loss_rate
-        self.buffer = queue.Queue(maxsize=buffer_size)  # バッファを初期化
-        self.currently_processing = 0  # 現在処理中のパケット数
-        self.processing_limit = bandwidth // 10  # 処理できるパケット数を帯域幅に応じて設定
+        if buffer_bytes is None:
+            buffer_bytes = buffer_size * DEFAULT_MTU
+        self.buffer_bytes = buffer_bytes
+        self.up = True  # リンクが有効かどうか（ダウンしている間に送信されたパケットは破棄）
+        self.down_drops = 0  # ダウンしている間に破棄したパケット数
+        # 方向ごとの送信キュー（送信側ノード -> EgressQueue）
+        self.egress_queues = {
+            node1: EgressQueue(node1, node2, buffer_bytes),
+            node2: EgressQueue(node2, node1, buffer_bytes),
+        }
+        self.ports = {}  # ノード -> 接続したポート（Port）
+        self.port_map = {}  # ノード -> (そのノードのポート番号, 対向ノードのポート番号)
 
-        # リンクをノードに追加
+        # リンクを両端のノードのポートに接続（ポート番号はここで一度だけ割り当てる）
         self.node1.add_link(self)
         self.node2.add_link(self)
 
-        # 確認用のデバッグ出力
-        print(f"Link added between {self.node1.name} and {self.node2.name}")
-        print(f"{self.node1.name} links: {[link for link in self.node1.links]}")
-        print(f"{self.node2.name} links: {[link for link in self.node2.links]}")
+    def attach(self, port):
+        """
+        ノードのポートをリンクに接続します。Node.add_link から呼び出されます。
+        両端が接続された時点でポート番号の対応表と、各方向の受信側のポート番号を確定します。
+
+        Args:
+            port (Port): 接続するポート。
+        """
+        self.ports[port.node] = port
+        if len(self.ports) < 2:
+            return
+        port1 = self.ports[self.node1]
+        port2 = self.ports[self.node2]
+        self.port_map = {self.node1: (port1.number, port2.number), self.node2: (port2.number, port1.number)}
+        self.egress_queues[self.node1].in_port = port2.number
+        self.egress_queues[self.node2].in_port = port1.number
 
     def transfer_packet(self, packet, src_node):
         """
         ソースノードから宛先ノードへパケットを転送します。
         リンクの遅延やパケット損失のシミュレーションを行います。
 
+        ノードがエミュレータに属している場合は、送信方向の送信キューにパケットを追加し、
+        シリアライズ時間（パケットサイズ / 帯域幅）と伝搬遅延の経過後に
+        宛先ノードへ配送する PACKET_ARRIVAL イベントを仮想時間でスケジュールします。
+
         Args:
             packet (Packet): 転送するパケット。
             src_node (Node): パケットを送信したソースノード。
         """
+        if not self.up:
+            self.down_drops += 1
+            if tracer.drops:
+                tracer.record(TRACE_LINK_DOWN, src_node, packet)
+            packet.release()
+            return
+        egress = self.egress_queues[src_node]
+        emulator = src_node.emulator
+
         # パケット損失率に基づいてパケットをドロップするかを決定
-        if random.random() < self.packet_loss_rate:
-            print(f"リンク ({self.node1.name} - {self.node2.name}) でパケットが損失しました。")
+        # （エミュレータに属している場合は送信方向ごとのシード付き乱数ストリームを使用）
+        if self.packet_loss_rate > 0:
+            if emulator is None:
+                sample = random.random()
+            else:
+                if egress.loss_stream is None:
+                    egress.loss_stream = emulator.random.stream(f"link:{src_node.name}->{egress.dst_node.name}")
+                sample = egress.loss_stream.random()
+            if sample < self.packet_loss_rate:
+                if tracer.drops:
+                    tracer.record(TRACE_LINK_LOSS, src_node, packet)
+                packet.release()
+                return
+
+        # 対向ノードとその受信ポートは送信側の送信キューに接続時に記録してある
+        dest_node = egress.dst_node
+        in_port = egress.in_port
+
+        if emulator is None:
+            # エミュレータが無い場合は仮想時間が存在しないため即座に配送
+            if egress.tap is not None:
+                egress.tap.capture(packet, 0.0)
+            dest_node.receive_packet(packet, in_port)
             return
 
-        # バッファに空きがあるか確認
-        if self.buffer.full():
-            print(f"リンク ({self.node1.name} - {self.node2.name}) のバッファが満杯です。パケットをドロップします。")
+        # 送信キューに追加し、送信完了時刻を求める（満杯ならテールドロップ）
+        finish = egress.enqueue(packet.size_bytes, emulator.current_time, self.bandwidth * 1_000_000)
+        if finish is None:
+            if tracer.drops:
+                tracer.record(TRACE_QUEUE_DROP, src_node, packet)
+            packet.release()
             return
+        if egress.tap is not None:
+            egress.tap.capture(packet, emulator.current_time)
+
+        # 送信完了から伝搬遅延（ミリ秒）後に宛先ノードへ配送する
+        emulator.schedule_event(Event(finish + self.delay / 1000.0, "PACKET_ARRIVAL", dest_node, packet, in_port))
 
-        # バッファにパケットを追加
-        self.buffer.put(packet)
-        print(f"リンク ({self.node1.name} - {self.node2.name}) のバッファにパケットを追加しました。")
+    def set_up(self, up):
+        """
+        リンクの状態を設定します。ダウンしたリンクはパケットを転送せず、
+        スイッチの FAST_FAILOVER グループは監視ポートのリンクがダウンしたバケットを使用しません。
 
-        # バッファの処理を非同期で行う
-        self._process_buffer()
+        Args:
+            up (bool): True でアップ、False でダウン。
+        """
+        self.up = up
 
-    def _process_buffer(self):
+    def add_tap(self, src_node, tap):
         """
-        バッファ内のパケットを処理します。
-        同時に処理できるパケット数に上限を設定し、超えた分は待機させます。
+        src_node からの送信方向にキャプチャタップを設定します。
+        送信キューに受け付けられたパケットが、その時点のシミュレーション時刻で記録されます。
+
+        Args:
+            src_node (Node): 記録する方向の送信側ノード。
+            tap (CaptureTap): キャプチャタップ。
         """
-        if self.currently_processing < self.processing_limit and not self.buffer.empty():
-            packet = self.buffer.get()
-            self.currently_processing += 1
-            # 転送遅延をシミュレーション
-            time.sleep(self.delay / 1000.0)
+        self.egress_queues[src_node].tap = tap
 
-            # 宛先ノードを決定し、パケットを送信
-            dest_node = self.node1 if packet.src != self.node1.ip_address else self.node2
-            in_port = self.get_port_number(dest_node)
+    def remove_tap(self, src_node):
+        # src_node からの送信方向のキャプチャタップを解除する
+        self.egress_queues[src_node].tap = None
 
-            # 宛先ノードにパケットを転送
-            dest_node.receive_packet(packet, in_port)
+    def get_queue_stats(self):
+        """
+        方向ごとの送信キューの統計情報を返します。
 
-            # 処理が終了したことを記録
-            self.currently_processing -= 1
+        Returns:
+            dict: (送信側ノード名, 受信側ノード名) をキーとした統計情報の辞書。
+        """
+        return {
+            (egress.src_node.name, egress.dst_node.name): egress.get_stats()
+            for egress in self.egress_queues.values()
+        }
 
     def get_port_number(self, node):
         """
@@ -95,6 +263,4 @@ class Link:
         Returns:
             int: ノード内のリンクのインデックスとしてのポート番号。
         """
-        print("node.links", node.links)
-        print("self", self)
-        return node.links.index(self)
\ No newline at end of file
+        return self.port_map[node][0]
\ No newline at end of file
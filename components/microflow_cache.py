@@ -0,0 +1,90 @@
+from collections import OrderedDict
+
+class MicroflowCache:
+    """
+    パケットのヘッダの組 (受信ポート, 送信元, 宛先, プロトコル, 送信元ポート, 宛先ポート) をキーとして、
+    分類器と転送表の検索結果を記憶する完全一致のキャッシュ。
+
+    容量を超えると最も長く参照されていないエントリを削除します（LRU）。分類器や転送表が変更された場合は
+    invalidate ですべてのエントリを破棄します。一致するエントリが無かったという結果もキャッシュします。
+    """
+
+    def __init__(self, capacity=4096):
+        """
+        キャッシュを初期化します。
+
+        Args:
+            capacity (int): 保持するエントリの最大数（0 の場合はキャッシュしません）。
+        """
+        self.capacity = capacity
+        self.entries = OrderedDict()  # ヘッダの組 -> アクション（一致なしの場合は None）
+        # 統計情報の初期化
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, default=None):
+        """
+        キャッシュされたアクションを返します。
+
+        Args:
+            key (tuple): ヘッダの組。
+            default: キャッシュに無い場合に返す値。
+
+        Returns:
+            キャッシュされたアクション（一致なしの結果は None）。キャッシュに無い場合は default。
+        """
+        entries = self.entries
+        if key in entries:
+            entries.move_to_end(key)
+            self.hits += 1
+            return entries[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, action):
+        """
+        アクションをキャッシュします。
+
+        Args:
+            key (tuple): ヘッダの組。
+            action (dict): アクション（一致なしの場合は None）。
+        """
+        if self.capacity <= 0:
+            return
+        entries = self.entries
+        entries[key] = action
+        entries.move_to_end(key)
+        if len(entries) > self.capacity:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self):
+        """
+        すべてのエントリを破棄します。
+        """
+        if self.entries:
+            self.entries.clear()
+        self.invalidations += 1
+
+    def get_stats(self):
+        """
+        キャッシュの統計情報を返します。
+
+        Returns:
+            dict: エントリ数、ヒット数、ミス数、ヒット率、削除数、無効化の回数。
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def __len__(self):
+        return len(self.entries)
@@ -1,4 +1,28 @@
 # components/node.py
+from core.tracing import tracer, TRACE_INVALID_PORT, TRACE_RECEIVE, TRACE_SEND
+
+class Port:
+    """
+    ノードのポートを表します。ポート番号はリンクの接続時に一度だけ割り当てられ、以後変わりません。
+    """
+
+    __slots__ = ("node", "number", "link")
+
+    def __init__(self, node, number, link):
+        """
+        ポートを初期化します。
+
+        Args:
+            node (Node): ポートを持つノード。
+            number (int): ポート番号（ノードの links のインデックスと一致）。
+            link (Link): ポートに接続されたリンク。
+        """
+        self.node = node
+        self.number = number
+        self.link = link
+
+    def __repr__(self):
+        return f"Port({self.node.name}:{self.number})"
 
 class Node:
     """
@@ -15,25 +39,44 @@ class Node:
             name (str): ノードの名前。
         """
         self.name = name  # ノードの名前
-        self.links = []  # このノードに接続されているリンクのリスト
+        self.links = []  # このノードに接続されているリンクのリスト（インデックスがポート番号）
+        self.ports = []  # このノードのポート（Port）のリスト
+        self.emulator = None  # ノードが属するエミュレータ（仮想時間のイベントスケジューリングに使用）
         # 統計情報の初期化
         self.sent_packets = 0  # 送信したパケット数
         self.received_packets = 0  # 受信したパケット数
         self.sent_bytes = 0  # 送信したバイト数
         self.received_bytes = 0  # 受信したバイト数
 
+    def set_emulator(self, emulator):
+        """
+        ノードが属するエミュレータを設定します。
+        設定後、リンクはパケットの配送を仮想時間のイベントとしてスケジュールします。
+
+        Args:
+            emulator (Emulator): エミュレータのインスタンス。
+        """
+        self.emulator = emulator
+
     def add_link(self, link):
         """
-        ノードにリンクを追加します。
+        ノードにリンクを追加し、新しいポートに接続します。
+        既に接続されているリンクの場合は何もしません（リンク側の対応表で確認するため O(1)）。
 
         Args:
             link (Link): ノードに追加するリンク。
+
+        Returns:
+            int: リンクを接続したポート番号。
         """
-        if link not in self.links:
-            self.links.append(link)
-            print(f"リンクが {self.name} に追加されました: {link}")  # デバッグ出力
-        else:
-            print(f"リンクは既に {self.name} に存在しています: {link}")
+        port = link.ports.get(self)
+        if port is not None:
+            return port.number
+        port = Port(self, len(self.links), link)
+        self.links.append(link)
+        self.ports.append(port)
+        link.attach(port)
+        return port.number
 
     def receive_packet(self, packet, in_port=None):
         """
@@ -46,9 +89,9 @@ class Node:
         """
         # 受信したパケット数とバイト数を更新
         self.received_packets += 1
-        self.received_bytes += len(packet.payload)
-        # パケット受信の情報を表示
-        print(f"{self.name} がパケットを受信しました: {packet.get_info()} (ポート {in_port})")
+        self.received_bytes += packet.size_bytes
+        if tracer.packets:
+            tracer.record(TRACE_RECEIVE, self, packet, -1 if in_port is None else in_port)
 
     def send_packet(self, packet, out_port):
         """
@@ -63,13 +106,14 @@ class Node:
             link = self.links[out_port]
             # 送信したパケット数とバイト数を更新
             self.sent_packets += 1
-            self.sent_bytes += len(packet.payload)
-            # パケット送信の情報を表示
-            print(f"{self.name} からパケットを送信しました: {packet.get_info()} (ポート {out_port})")
+            self.sent_bytes += packet.size_bytes
+            if tracer.packets:
+                tracer.record(TRACE_SEND, self, packet, out_port)
             # リンクを介してパケットを転送
             link.transfer_packet(packet, self)
         else:
-            print(f"{self.name} のポート {out_port} は無効です。")
+            if tracer.drops:
+                tracer.record(TRACE_INVALID_PORT, self, packet, out_port)
 
     def get_packets_sent(self):
         """
@@ -0,0 +1,173 @@
+import ipaddress
+from core.address_registry import ipv4_value
+
+# 各階層で参照するビット数（16 + 8 + 8 = 32 ビット）
+STRIDES = (16, 8, 8)
+
+class _TrieNode:
+    # マルチビットトライの 1 階層（2^stride 個のスロット）
+    __slots__ = ("values", "lengths", "children")
+
+    def __init__(self, stride):
+        size = 1 << stride
+        self.values = [None] * size  # スロットに展開した経路のアクション
+        self.lengths = [0] * size  # スロットに展開した経路のプレフィックス長（0 は経路なし）
+        self.children = [None] * size  # 次の階層のノード
+
+class RoutingTable:
+    """
+    IPv4 の最長一致（LPM）による転送表。
+
+    16-8-8 ビットのストライドを持つマルチビットトライで、各経路をプレフィックスの展開
+    （controlled prefix expansion）によって階層内のスロットに書き込みます。検索は宛先アドレスを
+    ビット列として最大 3 回の配列参照でたどるだけで済み、経路数に依存しません。
+    """
+
+    def __init__(self):
+        """
+        転送表を初期化します。
+        """
+        self.routes = {}  # (ネットワークアドレスの数値, プレフィックス長) -> アクション
+        self.root = _TrieNode(STRIDES[0])
+
+    def add_route(self, prefix, action):
+        """
+        経路を追加します。同じプレフィックスの経路がある場合はアクションを置き換えます。
+
+        Args:
+            prefix (str): CIDR 表記のプレフィックス（例: "10.0.0.0/24"）。
+            action (dict): 一致したパケットに実行するアクション（例: {"out_port": 1}）。
+        """
+        network = ipaddress.IPv4Network(prefix, strict=False)
+        key = (int(network.network_address), network.prefixlen)
+        self.routes[key] = action
+        self._insert(key[0], key[1], action)
+
+    def remove_route(self, prefix):
+        """
+        経路を削除します。削除した経路を展開したスロットだけを、そのプレフィックスを含む次に長い経路
+        （無い場合は経路なし）に戻すため、転送表全体を再構築しません。
+
+        Args:
+            prefix (str): CIDR 表記のプレフィックス。
+
+        Returns:
+            bool: 経路を削除した場合は True。
+        """
+        network = ipaddress.IPv4Network(prefix, strict=False)
+        address = int(network.network_address)
+        length = network.prefixlen
+        if self.routes.pop((address, length), None) is None:
+            return False
+        self._remove(address, length)
+        return True
+
+    def bulk_load(self, routes):
+        """
+        経路のリストから転送表をまとめて構築します（既存の経路は破棄します）。
+        プレフィックスの短い順に挿入するため、各スロットの書き込みは展開範囲につき 1 回で済みます。
+
+        Args:
+            routes (iterable): (CIDR 表記のプレフィックス, アクション) の組のリスト。
+        """
+        self.routes = {}
+        for prefix, action in routes:
+            network = ipaddress.IPv4Network(prefix, strict=False)
+            self.routes[(int(network.network_address), network.prefixlen)] = action
+        self._rebuild()
+
+    def _rebuild(self):
+        self.root = _TrieNode(STRIDES[0])
+        for (address, length), action in sorted(self.routes.items(), key=lambda item: item[0][1]):
+            self._insert(address, length, action)
+
+    def _insert(self, address, length, action):
+        node = self.root
+        offset = 0
+        for level, stride in enumerate(STRIDES):
+            end = offset + stride
+            index = (address >> (32 - end)) & ((1 << stride) - 1)
+            if length <= end:
+                # この階層のスロットにプレフィックスを展開する（より長い経路のスロットは上書きしない）
+                span = 1 << (end - length)
+                index &= ~(span - 1)
+                values = node.values
+                lengths = node.lengths
+                for slot in range(index, index + span):
+                    if lengths[slot] <= length:
+                        values[slot] = action
+                        lengths[slot] = length
+                return
+            child = node.children[index]
+            if child is None:
+                child = node.children[index] = _TrieNode(STRIDES[level + 1])
+            node = child
+            offset = end
+
+    def _covering_route(self, address, length):
+        # address/length を含む経路のうち最も長いもの（プレフィックス長とアクション）を返す
+        for shorter in range(length - 1, -1, -1):
+            network = address & ~((1 << (32 - shorter)) - 1) & 0xFFFFFFFF
+            action = self.routes.get((network, shorter))
+            if action is not None:
+                return shorter, action
+        return 0, None
+
+    def _remove(self, address, length):
+        node = self.root
+        offset = 0
+        for level, stride in enumerate(STRIDES):
+            end = offset + stride
+            index = (address >> (32 - end)) & ((1 << stride) - 1)
+            if length <= end:
+                # 削除した経路のスロットだけを戻す（より長い経路のスロットはそのまま）
+                cover_length, cover_action = self._covering_route(address, length)
+                if level > 0 and cover_length <= offset:
+                    # 含む経路は上の階層に展開されているため、この階層では経路なしとする
+                    cover_length, cover_action = 0, None
+                span = 1 << (end - length)
+                index &= ~(span - 1)
+                values = node.values
+                lengths = node.lengths
+                for slot in range(index, index + span):
+                    if lengths[slot] == length:
+                        values[slot] = cover_action
+                        lengths[slot] = cover_length
+                return
+            node = node.children[index]
+            if node is None:
+                return
+            offset = end
+
+    def lookup(self, address):
+        """
+        宛先アドレスに最長一致する経路のアクションを返します。
+
+        Args:
+            address (int): IPv4 アドレスの数値。
+
+        Returns:
+            dict: 一致した経路のアクション。一致しない場合は None。
+        """
+        node = self.root
+        index = address >> 16
+        best = node.values[index]
+        node = node.children[index]
+        if node is None:
+            return best
+        index = (address >> 8) & 0xFF
+        value = node.values[index]
+        if value is not None:
+            best = value
+        node = node.children[index]
+        if node is None:
+            return best
+        value = node.values[address & 0xFF]
+        return best if value is None else value
+
+    def lookup_address(self, ip_address):
+        # 文字列の IPv4 アドレスで検索する
+        return self.lookup(ipv4_value(ip_address))
+
+    def __len__(self):
+        return len(self.routes)
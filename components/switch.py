@@ -1,14 +1,36 @@
 from components.node import Node
-from queue import Queue
+from components.flow_table import FlowTable
+from components.actions import compile_action
+from components.classifier import Classifier, FlowEntry, DEFAULT_PRIORITY
+from components.flow_stats import FlowCounters
+from components.group_table import Bucket, Group, BUCKET_KEYS, GROUP_TYPES
+from components.routing_table import RoutingTable
+from components.microflow_cache import MicroflowCache
+from core.address_registry import ipv4_value
+from core.timing_wheel import TimingWheel
+from core.tracing import (
+    tracer, TRACE_BUFFER_DROP, TRACE_FLOW_MOD, TRACE_INVALID_PORT, TRACE_NO_CONTROLLER, TRACE_PACKET_IN,
+    TRACE_RECEIVE, TRACE_SEND, TRACE_TABLE_MISS,
+)
+from collections import deque
+import functools
 import logging
 
+_NOT_CACHED = object()  # マイクロフローキャッシュに無いことを表す値
+_TIME_EPSILON = 1e-9  # 期限の比較で浮動小数点の誤差を吸収するための許容量
+
+def _references_group(action, group_id):
+    # アクション（または write_actions）がグループを参照しているかどうか
+    return action.get("group") == group_id or (action.get("write_actions") or {}).get("group") == group_id
+
 class Switch(Node):
     """
     OpenFlow対応のネットワークスイッチを表します。
     フローテーブルを管理し、フローエントリに基づいてパケットを転送します。
     """
 
-    def __init__(self, name, processing_limit=10, buffer_size=20):
+    def __init__(self, name, processing_limit=10, buffer_size=20, cache_size=4096, timeout_tick=0.01,
+                 miss_buffer_size=256, packet_in_rate=0, packet_in_burst=None, packet_in_timeout=1.0):
         """
         スイッチを初期化します。
 
@@ -16,21 +38,74 @@ class Switch(Node):
             name (str): スイッチの名前。
             processing_limit (int): 同時に処理できるパケット数の上限。
             buffer_size (int): スイッチのバッファサイズ（待ち行列の最大数）。
+            cache_size (int): マイクロフローキャッシュのエントリ数の上限（0 で無効）。
+            timeout_tick (float): フローエントリのタイムアウトを管理するタイミングホイールの刻み（秒）。
+            miss_buffer_size (int): コントローラの応答を待つ間に保持するテーブルミスのパケット数の上限。
+            packet_in_rate (float): コントローラに送信する Packet-In の上限（1 秒あたり、0 は無制限）。
+            packet_in_burst (int): Packet-In のトークンバケットの容量（省略時は packet_in_rate と同じ、最小 1）。
+            packet_in_timeout (float): コントローラの応答を待つ時間（秒）。経過するとバッファのパケットを破棄します。
         """
         super().__init__(name)
-        self.flow_table = {}  # フローテーブル（マッチ条件 -> アクションの辞書）
+        self.flow_table = FlowTable()  # 完全一致のフローテーブル（(送信元, 宛先) -> アクション）
+        self.classifier = Classifier()  # 優先度とワイルドカードを持つフローエントリの分類器
+        # パイプラインのテーブル（テーブル 0 は完全一致のテーブル、分類器、転送表の組、1 以降は分類器）
+        self.tables = [self.classifier]
+        self.groups = {}  # グループの番号 -> Group
+        self.routing_table = RoutingTable()  # 宛先 IPv4 アドレスの最長一致による転送表
+        self.microflow_cache = MicroflowCache(cache_size)  # 分類器と転送表の検索結果のキャッシュ
+        self.flow_counters = FlowCounters()  # フローエントリごとのパケット数・バイト数（エントリ ID を添字とする配列）
+        self.flow_timeouts = TimingWheel(timeout_tick)  # フローエントリの期限を管理するタイミングホイール
+        self.expiry_timer = None  # 期限を確認する TIMER イベントのハンドル
+        self.expiry_time = None  # 期限を確認する TIMER イベントの時刻
         self.controller = None  # コントローラの参照を保持
-        self.buffer = Queue(maxsize=buffer_size)  # スイッチの待ち行列
+        self.buffer = deque()  # スイッチの待ち行列（ロック不要の両端キュー）
+        self.buffer_size = buffer_size  # 待ち行列の最大数
         self.processing_limit = processing_limit  # 同時に処理できるパケット数の上限
         self.currently_processing = 0  # 現在処理中のパケット数
+        self.port_taps = {}  # ポート番号 -> キャプチャタップ
+        # テーブルミスのパケットのバッファ（フローごとに 1 つの buffer_id を割り当て、Packet-In は最初の 1 パケットだけ送信）
+        self.miss_buffers = {}  # buffer_id -> [ヘッダの組, [(パケット, 受信ポート), ...], タイマーのハンドル]
+        self.pending_flows = {}  # ヘッダの組 -> 応答待ちの buffer_id
+        self.pending_pairs = {}  # (送信元, 宛先) -> {応答待ちの buffer_id: None}（完全一致の Flow-Mod で解放するバッファの索引）
+        self.miss_buffer_size = miss_buffer_size
+        self.buffered_packets = 0  # バッファ内のテーブルミスのパケット数
+        self.next_buffer_id = 0
+        self.packet_in_timeout = packet_in_timeout
+        # Packet-In のトークンバケット
+        self.packet_in_rate = packet_in_rate
+        self.packet_in_burst = packet_in_burst if packet_in_burst is not None else max(1, packet_in_rate)
+        self.packet_in_tokens = self.packet_in_burst
+        self.token_time = 0.0  # トークンを最後に補充したシミュレーション時刻
         # 統計情報の初期化
         self.sent_packets = 0  # 送信したパケット数
         self.received_packets = 0  # 受信したパケット数
         self.sent_bytes = 0  # 送信したバイト数
         self.received_bytes = 0  # 受信したバイト数
+        self.table_lookups = [0]  # テーブル番号 -> 検索したパケット数
+        self.table_matches = [0]  # テーブル番号 -> エントリに一致したパケット数
+        self.pipeline_packets = 0  # パイプラインを通過したパケット数
+        self.pipeline_depth_total = 0  # パケットごとに検索したテーブル数の合計
+        self.max_pipeline_depth = 0  # 1 パケットで検索したテーブル数の最大値
+        self.packet_ins = 0  # 送信した Packet-In の数
+        self.coalesced_packets = 0  # 同じフローの Packet-In を待つためにバッファしたパケット数
+        self.throttled_packet_ins = 0  # レート制限により送信しなかった Packet-In の数
+        self.miss_drops = 0  # バッファの上限、制限、応答待ちの期限切れ、コントローラ未設定により破棄したパケット数
+        self.buffer_drops = 0  # 待ち行列が満杯で破棄したパケット数
 
         self.logger = logging.getLogger(__name__)  # ロガーを設定
 
+    def set_emulator(self, emulator):
+        """
+        スイッチが属するエミュレータを設定し、フローテーブルのキーをエミュレータのアドレス ID に切り替えます。
+
+        Args:
+            emulator (Emulator): エミュレータのインスタンス。
+        """
+        super().set_emulator(emulator)
+        self.flow_table.set_registry(emulator.addresses)
+        for table in self.tables:
+            table.set_registry(emulator.addresses)
+
     def set_controller(self, controller):
         """
         スイッチにコントローラを設定します。
@@ -50,22 +125,22 @@ class Switch(Node):
         """
         # 受信パケット数と受信バイト数を更新
         self.received_packets += 1
-        self.received_bytes += len(packet.payload)
-        self.logger.info(f"{self.name} がパケットを受信しました: {packet.payload}")
-
-        key = (packet.src, packet.dst)
-        if key not in self.flow_table:
-            self.logger.info(f"{self.name}: パケットに対するフローエントリが存在しません: {packet.get_info()}")
-            self.send_packet_to_controller(packet, in_port)
+        self.received_bytes += packet.size_bytes
+        if self.port_taps and in_port in self.port_taps:
+            self.port_taps[in_port].capture(packet, self.emulator.current_time if self.emulator is not None else 0.0)
+        if tracer.packets:
+            tracer.record(TRACE_RECEIVE, self, packet, in_port)
 
         # バッファに空きがあるか確認
-        if self.buffer.full():
-            print(f"{self.name}: バッファが満杯です。パケットをドロップします。")
+        if len(self.buffer) >= self.buffer_size:
+            self.buffer_drops += 1
+            if tracer.drops:
+                tracer.record(TRACE_BUFFER_DROP, self, packet, in_port)
+            packet.release()
             return
 
         # バッファにパケットを追加
-        self.buffer.put((packet, in_port))
-        print(f"{self.name}: バッファにパケットを追加しました。")
+        self.buffer.append((packet, in_port))
 
         # バッファの処理を非同期で行う
         self._process_buffer()
@@ -75,51 +150,593 @@ class Switch(Node):
         バッファ内のパケットを処理します。
         同時に処理できるパケット数に上限を設定し、超えた分は待機させます。
         """
-        if self.currently_processing < self.processing_limit and not self.buffer.empty():
-            packet, in_port = self.buffer.get()
+        if self.currently_processing < self.processing_limit and self.buffer:
+            packet, in_port = self.buffer.popleft()
             self.currently_processing += 1
 
-            # パケットの送信元と宛先に基づいてフローテーブルを確認
-            key = (packet.src, packet.dst)
-            if key in self.flow_table:
-                # フローテーブルに一致するエントリがある場合、アクションを取得
-                action = self.flow_table[key]
-                # アクションに基づいてパケットを転送
-                self.send_packet(packet, action["out_port"])
-            else:
-                # フローテーブルに一致するエントリがない場合、コントローラにパケットを送信
-                if self.controller:
-                    print(f"{self.name}: パケットに対するフローエントリが存在しないため、コントローラに問い合わせます。")
-                    self.send_packet_to_controller(packet, in_port)
-                else:
-                    print(f"{self.name}: コントローラが設定されていません。")
+            # フローテーブルのパイプラインを実行し、一致したエントリのアクションに基づいてパケットを転送
+            if not self._run_pipeline(packet, in_port):
+                # フローテーブルに一致するエントリがない場合、コントローラに問い合わせる
+                if tracer.control:
+                    tracer.record(TRACE_TABLE_MISS, self, packet, in_port)
+                # ログの文字列はロガーが有効な場合のみ組み立てる
+                if self.logger.isEnabledFor(logging.INFO):
+                    self.logger.info("%s: パケットに対するフローエントリが存在しません: %s", self.name, packet.get_info())
+                self._handle_table_miss(packet, in_port)
 
             # 処理が終了したことを記録
             self.currently_processing -= 1
 
-    def install_flow(self, match, action):
+    def _run_pipeline(self, packet, in_port):
+        """
+        内部メソッド: テーブル 0 から順にパイプラインを実行します。
+        各テーブルで一致したエントリの set_field と out_port は直ちに実行し、write_actions はアクションセットに
+        蓄積して goto_table が無くなった時点で実行します。テーブル 1 以降で一致するエントリが無い場合や、
+        出力するアクションが無い場合はパケットを破棄します。
+
+        Returns:
+            bool: テーブル 0 で一致するエントリが無かった場合は False。
+        """
+        table_lookups = self.table_lookups
+        table_lookups[0] += 1
+        entry = self._match_flow(packet, in_port)[1]
+        if entry is None:
+            return False
+        table_matches = self.table_matches
+        table_id = 0
+        depth = 1
+        action_set = None
+        consumed = False
+        while True:
+            table_matches[table_id] += 1
+            if entry.entry_id is not None:
+                self.flow_counters.record(entry.entry_id, packet.size_bytes)
+            program = entry.program
+            if program is None:
+                # フローテーブルに直接設定されたエントリは最初に一致した時点で変換する
+                program = entry.program = compile_action(entry.action, self.send_packet, table_id, self.groups)
+            if program.drop:
+                action_set = None
+                break
+            if program.set_field is not None:
+                program.set_field(packet)
+            if program.clear_actions:
+                action_set = None
+            if program.write:
+                if action_set is None:
+                    action_set = {}
+                action_set.update(program.write)
+            next_table = program.goto_table
+            if program.output is not None:
+                if next_table is None and not action_set:
+                    program.output(packet)
+                    consumed = True
+                    break
+                program.output(packet.copy())
+            if next_table is None:
+                break
+            if next_table >= len(self.tables):
+                action_set = None
+                break
+            depth += 1
+            table_lookups[next_table] += 1
+            entry = self.tables[next_table].lookup(packet, in_port)
+            if entry is None:
+                action_set = None
+                break
+            if entry.idle_timeout:
+                entry.last_used = self.emulator.current_time
+            table_id = next_table
+
+        self.pipeline_packets += 1
+        self.pipeline_depth_total += depth
+        if depth > self.max_pipeline_depth:
+            self.max_pipeline_depth = depth
+        if action_set:
+            set_field = action_set.get("set_field")
+            if set_field is not None:
+                set_field(packet)
+            output = action_set.get("output")
+            if output is not None:
+                output(packet)
+                consumed = True
+        if not consumed:
+            packet.release()
+        return True
+
+    def _handle_table_miss(self, packet, in_port):
+        """
+        内部メソッド: テーブルミスのパケットをバッファし、新しいフローの場合のみコントローラに Packet-In を送信します。
+        同じヘッダの組のパケットは応答（Flow-Mod）が届くまで同じ buffer_id のバッファで待機します。
+        """
+        if not self.controller:
+            if tracer.drops:
+                tracer.record(TRACE_NO_CONTROLLER, self, packet, in_port)
+            self._drop_missed(packet)
+            return
+        key = (in_port, packet.src, packet.dst, packet.protocol, packet.src_port, packet.dst_port)
+        buffer_id = self.pending_flows.get(key)
+        if buffer_id is not None:
+            # 同じフローの Packet-In は送信済みのため、応答を待つ
+            if self.buffered_packets >= self.miss_buffer_size:
+                self._drop_missed(packet)
+                return
+            self.miss_buffers[buffer_id][1].append((packet, in_port))
+            self.buffered_packets += 1
+            self.coalesced_packets += 1
+            return
+        if not self._take_packet_in_token():
+            self.throttled_packet_ins += 1
+            self._drop_missed(packet)
+            return
+        if self.buffered_packets < self.miss_buffer_size:
+            buffer_id = self.next_buffer_id
+            self.next_buffer_id += 1
+            timer = None
+            if self.emulator is not None and self.packet_in_timeout:
+                timer = self.emulator.schedule_timer(
+                    self.packet_in_timeout, functools.partial(self._expire_miss_buffer, buffer_id), node=self
+                )
+            self.miss_buffers[buffer_id] = [key, [(packet, in_port)], timer]
+            self.pending_flows[key] = buffer_id
+            self.pending_pairs.setdefault((packet.src, packet.dst), {})[buffer_id] = None
+            self.buffered_packets += 1
+            self.send_packet_to_controller(packet, in_port, buffer_id)
+            return
+        # バッファに空きが無い場合は buffer_id を付けずに送信する。Packet-Out は無いため、
+        # コントローラがフローを設定してもこのパケット自体は転送されず、破棄として数える
+        self.send_packet_to_controller(packet, in_port, None)
+        self._drop_missed(packet)
+
+    def _take_packet_in_token(self):
+        # トークンバケットから Packet-In 1 回分のトークンを取り出す（不足している場合は False）
+        if not self.packet_in_rate:
+            return True
+        now = self.emulator.current_time if self.emulator is not None else 0.0
+        self.packet_in_tokens = min(
+            self.packet_in_burst, self.packet_in_tokens + (now - self.token_time) * self.packet_in_rate
+        )
+        self.token_time = now
+        if self.packet_in_tokens < 1:
+            return False
+        self.packet_in_tokens -= 1
+        return True
+
+    def _drop_missed(self, packet):
+        # テーブルミスのパケットを破棄する
+        self.miss_drops += 1
+        packet.release()
+
+    def _pop_miss_buffer(self, buffer_id):
+        # バッファを取り出し、応答待ちの状態を解除する
+        key, packets, timer = self.miss_buffers.pop(buffer_id)
+        del self.pending_flows[key]
+        pair = (key[1], key[2])
+        buffer_ids = self.pending_pairs[pair]
+        del buffer_ids[buffer_id]
+        if not buffer_ids:
+            del self.pending_pairs[pair]
+        self.buffered_packets -= len(packets)
+        if timer is not None:
+            self.emulator.cancel_event(timer)
+        return packets
+
+    def _expire_miss_buffer(self, buffer_id):
+        """
+        内部メソッド: コントローラの応答が期限までに届かなかったバッファのパケットを破棄します。
+        以降に同じフローのパケットが届くと、再び Packet-In を送信します。
+        """
+        if buffer_id not in self.miss_buffers:
+            return
+        self.miss_buffers[buffer_id][2] = None
+        for packet, _ in self._pop_miss_buffer(buffer_id):
+            self._drop_missed(packet)
+
+    def _release_miss_buffers(self, pair, buffer_id):
+        """
+        内部メソッド: Flow-Mod の後に、応答を待っているバッファのパケットをパイプラインで転送します。
+        buffer_id を指定した場合はそのバッファだけを、指定しない場合はテーブル 0 の (送信元, 宛先) のタプルの
+        マッチ条件に該当するバッファだけを索引から取り出すため、他のバッファは走査しません。
+        """
+        if buffer_id is not None:
+            buffer_ids = (buffer_id,) if buffer_id in self.miss_buffers else ()
+        elif pair is not None:
+            buffer_ids = tuple(self.pending_pairs.get(pair, ()))
+        else:
+            return
+        for buffer_id in buffer_ids:
+            for packet, in_port in self._pop_miss_buffer(buffer_id):
+                if not self._run_pipeline(packet, in_port):
+                    self._drop_missed(packet)
+
+    def add_port_tap(self, port, tap):
+        """
+        ポートにキャプチャタップを設定します。ポートで受信したパケットと送信したパケットの両方を記録します。
+
+        Args:
+            port (int): ポート番号。
+            tap (CaptureTap): キャプチャタップ。
+        """
+        self.port_taps[port] = tap
+
+    def remove_port_tap(self, port):
+        # ポートのキャプチャタップを解除する
+        self.port_taps.pop(port, None)
+
+    def lookup_flow(self, packet, in_port=None):
+        """
+        パケットに適用するアクションを検索します。
+        OpenFlow 1.0 と同様に完全一致のエントリを優先し、一致しない場合は分類器で
+        優先度の最も高いワイルドカードのエントリを、それも無い場合は転送表で宛先の最長一致の経路を検索します。
+        分類器と転送表の検索結果はマイクロフローキャッシュに記憶し、同じヘッダの組のパケットでは再利用します。
+        完全一致のエントリはキャッシュより先に確認するため、その追加や削除でキャッシュを破棄する必要はありません。
+        アイドルタイムアウトを持つエントリに一致した場合は最終使用時刻だけを更新し、タイマーは再設定しません。
+
+        Args:
+            packet (Packet): 検索するパケット。
+            in_port (int): パケットを受信したポート番号。
+
+        Returns:
+            dict: 一致したエントリのアクション。一致しない場合は None。
+        """
+        return self._match_flow(packet, in_port)[0]
+
+    def _match_flow(self, packet, in_port):
+        # lookup_flow の本体。(アクション, 一致したエントリ) を返す（転送表の経路は経路ごとのエントリを返す）
+        entry = self.flow_table.lookup_entry(packet)
+        if entry is not None:
+            if entry.idle_timeout:
+                entry.last_used = self.emulator.current_time
+            return entry.action, entry
+
+        # 完全一致のエントリが無い場合は、ヘッダの組をキーとするキャッシュを先に確認する
+        key = (in_port, packet.src, packet.dst, packet.protocol, packet.src_port, packet.dst_port)
+        cached = self.microflow_cache.get(key, _NOT_CACHED)
+        if cached is not _NOT_CACHED:
+            action, entry = cached
+            if entry is not None and entry.idle_timeout:
+                entry.last_used = self.emulator.current_time
+            return cached
+        entry = self.classifier.lookup(packet, in_port)
+        if entry is not None:
+            action = entry.action
+            if entry.idle_timeout:
+                entry.last_used = self.emulator.current_time
+        elif self.routing_table.routes:
+            registry = self.flow_table.registry
+            if registry is not None:
+                entry = self.routing_table.lookup(registry.ip_value(packet.dst, packet.dst_id))
+            else:
+                entry = self.routing_table.lookup(ipv4_value(packet.dst))
+            action = entry.action if entry is not None else None
+        else:
+            action = None
+        cached = (action, entry)
+        self.microflow_cache.put(key, cached)
+        return cached
+
+    def install_flow(self, match, action, priority=None, idle_timeout=0, hard_timeout=0, table_id=0, buffer_id=None):
         """
         フローテーブルに新しいフローエントリをインストールします。
+        同じマッチ条件（と優先度）のエントリがある場合は置き換え、パケット数・バイト数とインストール時刻を初期化します。
+        タイムアウトを指定したエントリは期限切れになると削除され、コントローラに FLOW_REMOVED を通知します
+        （スイッチがエミュレータに属している場合のみ）。
 
         Args:
-            match (tuple): マッチ条件（通常は送信元と宛先アドレス）。
-            action (dict): 実行するアクション（例: 特定のポートへの転送）。
+            match (tuple or dict): マッチ条件。(送信元, 宛先) のタプルで優先度を省略した場合は
+                完全一致のエントリ、辞書（"in_port"、"src"、"dst"、"protocol"、"src_port"、"dst_port"、
+                アドレスは CIDR 表記可）の場合は優先度付きのワイルドカードのエントリになります。
+                テーブル 1 以降のエントリは常にワイルドカードのエントリです。
+            action (dict): 実行するアクション（例: {"out_port": 1}）。キーは components.actions.compile_action を
+                参照してください。インストール時に呼び出し可能なオブジェクトの組に変換します。
+            priority (int): 優先度（オプション、大きいほど優先）。
+            idle_timeout (float): 最後にパケットが一致してからこの秒数が経過すると削除します（0 は無期限）。
+            hard_timeout (float): インストールからこの秒数が経過すると削除します（0 は無期限）。
+            table_id (int): エントリを登録するテーブルの番号。
+            buffer_id (int): Packet-In で通知したバッファの ID（オプション）。指定した場合はそのバッファの
+                パケットを転送します。省略した場合は (送信元, 宛先) のタプルのマッチ条件に該当するバッファのみ転送します。
+
+        Raises:
+            ValueError: アクションやマッチ条件に未対応のキーが含まれる場合に発生。
         """
-        self.flow_table[match] = action
+        program = compile_action(action, self.send_packet, table_id, self.groups)
+        # (送信元, 宛先) のタプルのテーブル 0 のエントリは、そのアドレスの組のパケットに必ず一致する
+        pair = match if isinstance(match, tuple) and table_id == 0 else None
+        if isinstance(match, tuple) and priority is None and table_id == 0:
+            self.flow_table[match] = action
+            entry = self.flow_table.entry(match)
+        else:
+            if isinstance(match, tuple):
+                match = {"src": match[0], "dst": match[1]}
+            while len(self.tables) <= table_id:
+                table = Classifier(self.flow_table.registry)
+                self.tables.append(table)
+                self.table_lookups.append(0)
+                self.table_matches.append(0)
+            entry = self.tables[table_id].add(match, action, DEFAULT_PRIORITY if priority is None else priority)
+            entry.table_id = table_id
+            if table_id == 0:
+                self.microflow_cache.invalidate()
+        entry.program = program
+        now = self.emulator.current_time if self.emulator is not None else 0.0
+        if entry.entry_id is None:
+            entry.entry_id = self.flow_counters.allocate(now)
+        else:
+            self.flow_counters.reset(entry.entry_id, now)
+        self._start_timeout(entry, idle_timeout, hard_timeout)
+        if tracer.control:
+            tracer.record(TRACE_FLOW_MOD, self)
+        if self.miss_buffers:
+            self._release_miss_buffers(pair, buffer_id)
+
+    def remove_flow(self, match, priority=None, table_id=0):
+        """
+        フローエントリを削除します。
 
-    def send_packet_to_controller(self, packet, in_port):
+        Args:
+            match (tuple or dict): install_flow に指定したマッチ条件。
+            priority (int): install_flow に指定した優先度。
+            table_id (int): install_flow に指定したテーブルの番号。
+
+        Returns:
+            bool: エントリを削除した場合は True。
+        """
+        if isinstance(match, tuple) and priority is None and table_id == 0:
+            entry = self.flow_table.entry(match)
+            if entry is None:
+                return False
+            del self.flow_table[match]
+        else:
+            if isinstance(match, tuple):
+                match = {"src": match[0], "dst": match[1]}
+            if table_id >= len(self.tables):
+                return False
+            entry = self.tables[table_id].remove(match, DEFAULT_PRIORITY if priority is None else priority)
+            if entry is None:
+                return False
+            if table_id == 0:
+                self.microflow_cache.invalidate()
+        self.flow_timeouts.cancel(entry.timer)
+        entry.timer = None
+        if entry.entry_id is not None:
+            self.flow_counters.release(entry.entry_id)
+            entry.entry_id = None
+        return True
+
+    def _entry_stats(self, entry, now):
+        # エントリの統計情報（フロー統計の 1 件分）を返す
+        stats = {
+            "match": entry.match,
+            "priority": entry.priority,
+            "table_id": entry.table_id,
+            "action": entry.action,
+            "idle_timeout": entry.idle_timeout,
+            "hard_timeout": entry.hard_timeout,
+        }
+        if entry.entry_id is not None:
+            stats.update(self.flow_counters.stats(entry.entry_id, now))
+        else:
+            stats.update(packet_count=0, byte_count=0, duration=0.0)
+        return stats
+
+    def get_flow_stats(self):
+        """
+        すべてのフローエントリの統計情報をまとめて返します（OpenFlow のフロー統計）。
+
+        Returns:
+            list: エントリごとの辞書（match、priority、table_id、action、idle_timeout、hard_timeout、
+                packet_count、byte_count、duration）のリスト。完全一致のエントリの priority は None です。
+        """
+        now = self.emulator.current_time if self.emulator is not None else 0.0
+        entries = list(self.flow_table.entries.values())
+        for table in self.tables:
+            entries.extend(table.entries())
+        return [self._entry_stats(entry, now) for entry in entries]
+
+    def get_pipeline_stats(self):
+        """
+        パイプラインの統計情報を返します。ルールをどのテーブルに配置するかの調整に使用します。
+
+        Returns:
+            dict: テーブルごとのエントリ数・検索数・一致数のリスト（tables）、パケットあたりの
+                平均の検索テーブル数（average_depth）、最大の検索テーブル数（max_depth）。
+        """
+        tables = []
+        for table_id, table in enumerate(self.tables):
+            entries = len(table) + (len(self.flow_table) + len(self.routing_table) if table_id == 0 else 0)
+            tables.append({
+                "table_id": table_id,
+                "entries": entries,
+                "lookups": self.table_lookups[table_id],
+                "matches": self.table_matches[table_id],
+            })
+        return {
+            "tables": tables,
+            "average_depth": self.pipeline_depth_total / self.pipeline_packets if self.pipeline_packets else 0.0,
+            "max_depth": self.max_pipeline_depth,
+        }
+
+    def get_aggregate_stats(self):
+        """
+        すべてのフローエントリの統計情報の合計を返します（OpenFlow の集計統計）。
+
+        Returns:
+            dict: packet_count、byte_count、flow_count の合計。
+        """
+        return self.flow_counters.aggregate()
+
+    def _start_timeout(self, entry, idle_timeout, hard_timeout):
+        # エントリのタイムアウトを設定し、期限をタイミングホイールに登録する（登録した場合は True）
+        self.flow_timeouts.cancel(entry.timer)
+        entry.timer = None
+        if self.emulator is None:
+            idle_timeout = hard_timeout = 0
+        entry.idle_timeout = idle_timeout
+        entry.hard_timeout = hard_timeout
+        if not (idle_timeout or hard_timeout):
+            return False
+        entry.last_used = self.emulator.current_time
+        entry.timer = self.flow_timeouts.add(self._deadline(entry), entry)
+        self._schedule_expiry()
+        return True
+
+    def _deadline(self, entry):
+        # エントリの現在の期限（ハードタイムアウトとアイドルタイムアウトの早い方）
+        deadline = self.flow_counters.install_times[entry.entry_id] + entry.hard_timeout if entry.hard_timeout else None
+        if entry.idle_timeout:
+            idle_deadline = entry.last_used + entry.idle_timeout
+            if deadline is None or idle_deadline < deadline:
+                deadline = idle_deadline
+        return deadline
+
+    def _schedule_expiry(self):
+        # タイミングホイールの次の期限に TIMER イベントを 1 つだけスケジュールする
+        next_time = self.flow_timeouts.next_expiry_time()
+        if next_time is None or (self.expiry_timer is not None and self.expiry_time <= next_time):
+            return
+        if self.expiry_timer is not None:
+            self.emulator.cancel_event(self.expiry_timer)
+        self.expiry_time = next_time
+        self.expiry_timer = self.emulator.schedule_timer(
+            max(0.0, next_time - self.emulator.current_time), self._expire_flows, node=self
+        )
+
+    def _expire_flows(self):
+        """
+        内部メソッド: 期限切れのフローエントリを削除し、コントローラに FLOW_REMOVED を通知します。
+        アイドルタイムアウトのエントリが期限までに使用されていた場合は、最終使用時刻から期限を求め直して再登録します。
+        """
+        self.expiry_timer = None
+        now = self.emulator.current_time
+        for entry in self.flow_timeouts.advance(now):
+            entry.timer = None
+            if self._deadline(entry) > now + _TIME_EPSILON:
+                entry.timer = self.flow_timeouts.add(self._deadline(entry), entry)
+                continue
+            if entry.hard_timeout and self.flow_counters.install_times[entry.entry_id] + entry.hard_timeout <= now + _TIME_EPSILON:
+                reason = "hard_timeout"
+            else:
+                reason = "idle_timeout"
+            stats = self._entry_stats(entry, now)
+            if self.remove_flow(entry.match, entry.priority, entry.table_id) and self.controller:
+                self.controller.handle_flow_removed(self, entry, reason, stats)
+        self._schedule_expiry()
+
+    def add_route(self, prefix, action):
+        """
+        転送表に経路を追加します。フローエントリに一致しないパケットは宛先の最長一致で転送されます。
+
+        Args:
+            prefix (str): CIDR 表記のプレフィックス（例: "10.0.0.0/24"）。
+            action (dict): 実行するアクション（例: {"out_port": 1}）。
+        """
+        self.routing_table.add_route(prefix, self._route_entry(prefix, action))
+        self.microflow_cache.invalidate()
+
+    def load_routes(self, routes):
+        """
+        経路のリストから転送表をまとめて構築します（既存の経路は破棄します）。
+
+        Args:
+            routes (iterable): (CIDR 表記のプレフィックス, アクション) の組のリスト。
+        """
+        self.routing_table.bulk_load([(prefix, self._route_entry(prefix, action)) for prefix, action in routes])
+        self.microflow_cache.invalidate()
+
+    def _route_entry(self, prefix, action):
+        # 転送表に登録する経路のエントリ（アクションは変換済み、統計の対象外）
+        entry = FlowEntry(prefix, action, None)
+        entry.program = compile_action(action, self.send_packet, groups=self.groups)
+        return entry
+
+    def install_group(self, group_id, group_type, buckets):
+        """
+        グループを追加します。同じ番号のグループがある場合は種類とバケットを置き換え、
+        そのグループを参照しているフローエントリは新しいバケットを使用します。
+
+        Args:
+            group_id (int): グループの番号。
+            group_type (str): "all"（すべてのバケット）、"select"（5 タプルのハッシュによる ECMP）、
+                "fast_failover"（監視ポートが有効な最初のバケット）のいずれか。
+            buckets (list): バケットの辞書のリスト。キーは "actions"（out_port、group、set_field のアクション）、
+                "weight"（select の重み、既定 1）、"watch_port"（監視するポート、既定は actions の out_port）。
+
+        Raises:
+            ValueError: 種類やバケットのキー、アクションが不正な場合に発生。
+        """
+        if group_type not in GROUP_TYPES:
+            raise ValueError(f"未対応のグループの種類です: {group_type}")
+        compiled = []
+        for bucket in buckets:
+            unknown = set(bucket) - set(BUCKET_KEYS)
+            if unknown:
+                raise ValueError(f"未対応のバケットのキーです: {', '.join(sorted(unknown))}")
+            actions = bucket.get("actions", {})
+            program = compile_action(actions, self.send_packet, groups=self.groups)
+            if program.goto_table is not None or program.write or program.clear_actions:
+                raise ValueError("バケットで使用できるアクションは out_port、group、set_field、drop のみです。")
+            watch_port = bucket.get("watch_port")
+            if watch_port is None and isinstance(actions.get("out_port"), int):
+                watch_port = actions["out_port"]
+            compiled.append(Bucket(actions, program, bucket.get("weight", 1), watch_port))
+        group = self.groups.get(group_id)
+        if group is None:
+            self.groups[group_id] = Group(self, group_id, group_type, compiled)
+        else:
+            group.set_buckets(group_type, compiled)
+
+    def remove_group(self, group_id):
+        """
+        グループを削除します。OpenFlow と同様に、グループを参照しているフローエントリも削除します。
+        転送表の経路もグループを参照している場合は削除します。
+
+        Args:
+            group_id (int): グループの番号。
+
+        Returns:
+            bool: グループを削除した場合は True。
+        """
+        if self.groups.pop(group_id, None) is None:
+            return False
+        entries = list(self.flow_table.entries.values())
+        for table in self.tables:
+            entries.extend(table.entries())
+        for entry in entries:
+            if _references_group(entry.action, group_id):
+                self.remove_flow(entry.match, entry.priority, entry.table_id)
+        routes = [entry.match for entry in self.routing_table.routes.values() if _references_group(entry.action, group_id)]
+        for prefix in routes:
+            self.routing_table.remove_route(prefix)
+        if routes:
+            self.microflow_cache.invalidate()
+        return True
+
+    def get_group_stats(self):
+        """
+        すべてのグループの統計情報を返します。
+
+        Returns:
+            list: グループごとの辞書（group_id、group_type、bucket_packets、dropped_packets）のリスト。
+        """
+        return [group.get_stats() for group in self.groups.values()]
+
+    def send_packet_to_controller(self, packet, in_port, buffer_id=None):
         """
         コントローラにPacket-Inメッセージを送信します。
 
         Args:
             packet (Packet): コントローラに送信するパケット。
             in_port (int): パケットを受信したポート番号。
+            buffer_id (int): パケットを保持しているバッファの ID（オプション、バッファしていない場合は None）。
         """
         if self.controller:
             # コントローラにパケットを送信
-            self.controller.handle_packet_in(packet, self, in_port)
-        else:
-            print(f"{self.name}: コントローラが設定されていません。")
+            self.packet_ins += 1
+            if tracer.control:
+                tracer.record(TRACE_PACKET_IN, self, packet, in_port)
+            self.controller.handle_packet_in(packet, self, in_port, buffer_id)
+        elif tracer.drops:
+            tracer.record(TRACE_NO_CONTROLLER, self, packet, in_port)
 
     def send_packet(self, packet, out_port):
         """
@@ -134,12 +751,17 @@ class Switch(Node):
             link = self.links[out_port]
             # 送信パケット数と送信バイト数を更新
             self.sent_packets += 1
-            self.sent_bytes += len(packet.payload)
-            print(f"{self.name} からパケットを送信しました: {packet.payload}")
+            self.sent_bytes += packet.size_bytes
+            if self.port_taps and out_port in self.port_taps:
+                self.port_taps[out_port].capture(packet, self.emulator.current_time if self.emulator is not None else 0.0)
+            if tracer.packets:
+                tracer.record(TRACE_SEND, self, packet, out_port)
             # リンクを介してパケットを転送
             link.transfer_packet(packet, self)
         else:
-            print(f"{self.name} のポート {out_port} は無効です。")
+            if tracer.drops:
+                tracer.record(TRACE_INVALID_PORT, self, packet, out_port)
+            packet.release()
 
     # 統計情報取得用のメソッド
     def get_packets_sent(self):
@@ -21,7 +21,7 @@ class BaseController:
         # スイッチのコントローラを自身に設定
         switch.set_controller(self)
 
-    def handle_packet_in(self, packet, switch, in_port):
+    def handle_packet_in(self, packet, switch, in_port, buffer_id=None):
         """
         スイッチからのPacket-Inメッセージを受信して処理を行います。
 
@@ -29,17 +29,86 @@ class BaseController:
             packet (Packet): 受信したパケット。
             switch (Switch): パケットを受信したスイッチ。
             in_port (int): パケットを受信したポート番号。
+            buffer_id (int): スイッチがパケットを保持しているバッファの ID（オプション）。
+                同じフローのパケットは Flow-Mod を設定するまでスイッチ側で待機し、設定後に転送されます。
         """
         # サブクラスで具体的なロジックを実装
         raise NotImplementedError("このメソッドはサブクラスで実装する必要があります。")
 
-    def send_flow_mod(self, switch, match, action):
+    def handle_flow_removed(self, switch, entry, reason, stats):
+        """
+        スイッチからのFLOW_REMOVEDメッセージを受信します。フローエントリがタイムアウトで削除された際に呼び出されます。
+        既定では何もしません。
+
+        Args:
+            switch (Switch): エントリを削除したスイッチ。
+            entry (FlowEntry): 削除されたエントリ（match、priority、idle_timeout、hard_timeout を持つ）。
+            reason (str): 削除の理由（"idle_timeout" または "hard_timeout"）。
+            stats (dict): 削除時点のエントリの統計情報（packet_count、byte_count、duration など）。
+        """
+        pass
+
+    def send_flow_mod(self, switch, match, action, priority=None, idle_timeout=0, hard_timeout=0, table_id=0,
+                      buffer_id=None):
         """
         スイッチにフローエントリを設定する（Flow-Mod）。
 
         Args:
             switch (Switch): フローを設定するスイッチ。
-            match (tuple): フローのマッチ条件（通常は送信元と宛先アドレス）。
-            action (dict): 実行するアクション（例: 特定のポートへの転送）。
+            match (tuple or dict): フローのマッチ条件（送信元と宛先アドレスのタプル、
+                またはワイルドカードを含むマッチフィールドの辞書）。
+            action (dict): 実行するアクション（例: {"out_port": 1}、goto_table や set_field なども指定可）。
+            priority (int): 優先度（オプション）。
+            idle_timeout (float): アイドルタイムアウト（秒、0 は無期限）。
+            hard_timeout (float): ハードタイムアウト（秒、0 は無期限）。
+            table_id (int): エントリを登録するパイプラインのテーブルの番号。
+            buffer_id (int): Packet-In で受け取ったバッファの ID（オプション）。指定するとバッファ内の
+                同じフローのパケットをこのエントリで転送させます。
+        """
+        switch.install_flow(match, action, priority, idle_timeout, hard_timeout, table_id, buffer_id)
+
+    def send_group_mod(self, switch, group_id, group_type, buckets):
+        """
+        スイッチにグループを設定する（Group-Mod）。フローエントリのアクション {"group": group_id} から参照できます。
+
+        Args:
+            switch (Switch): グループを設定するスイッチ。
+            group_id (int): グループの番号。
+            group_type (str): "all"、"select"、"fast_failover" のいずれか。
+            buckets (list): バケットの辞書（actions、weight、watch_port）のリスト。
+        """
+        switch.install_group(group_id, group_type, buckets)
+
+    def request_flow_stats(self, switch):
+        """
+        スイッチにフロー統計を要求します。
+
+        Args:
+            switch (Switch): 対象のスイッチ。
+
+        Returns:
+            list: フローエントリごとの統計情報（Switch.get_flow_stats を参照）。
+        """
+        return switch.get_flow_stats()
+
+    def request_aggregate_stats(self, switch):
+        """
+        スイッチに集計統計を要求します。
+
+        Args:
+            switch (Switch): 対象のスイッチ。
+
+        Returns:
+            dict: すべてのフローエントリのパケット数、バイト数、エントリ数の合計。
+        """
+        return switch.get_aggregate_stats()
+
+    def send_routes(self, switch, routes):
+        """
+        スイッチの転送表に CIDR の経路をまとめて設定します（既存の経路は破棄します）。
+
+        Args:
+            switch (Switch): 経路を設定するスイッチ。
+            routes (list): (CIDR 表記のプレフィックス, 出力ポート番号) の組のリスト。
         """
-        switch.install_flow(match, action)
\ No newline at end of file
+        switch.load_routes([(prefix, {"out_port": out_port}) for prefix, out_port in routes])
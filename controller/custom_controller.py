@@ -1,4 +1,5 @@
 from controller.base_controller import BaseController
+from core.tracing import tracer, TRACE_CONTROLLER_REJECT
 
 class CustomController(BaseController):
     """
@@ -10,6 +11,7 @@ class CustomController(BaseController):
         """
         コントローラの初期化。IPアドレスとポート番号を初期化します。
         """
+        super().__init__()
         self.ip_address = None
         self.port = None
 
@@ -33,7 +35,7 @@ class CustomController(BaseController):
         self.port = port
         print(f"コントローラのポート番号を設定: {self.port}")
 
-    def handle_packet_in(self, packet, switch, in_port):
+    def handle_packet_in(self, packet, switch, in_port, buffer_id=None):
         """
         スイッチからのPacket-Inメッセージを受信し、フローエントリを設定します。
 
@@ -41,9 +43,9 @@ class CustomController(BaseController):
             packet (Packet): 受信したパケット。
             switch (Switch): パケットを受信したスイッチ。
             in_port (int): パケットを受信したポート番号。
+            buffer_id (int): スイッチがパケットを保持しているバッファの ID（オプション）。
+                同じフローのパケットは Flow-Mod を設定するまでスイッチ側で待機し、設定後に転送されます。
         """
-        print(f"カスタムコントローラがパケットを受信しました: {packet.get_info()}")
-
         # MACアドレスに基づくシンプルなフロー設定
         match = (packet.src, packet.dst)
 
@@ -52,19 +54,25 @@ class CustomController(BaseController):
             # 簡単なルールに基づいてポートを設定（仮の設定）
             out_port = (in_port + 1) % len(switch.links)
             action = {"out_port": out_port}
-            self.send_flow_mod(switch, match, action)  # 親クラスのメソッドを直接呼び出す
-            print(f"フローエントリを設定: {match} -> ポート {out_port}")
-        else:
-            print(f"無効なフロー: {packet.get_info()}")
+            self.send_flow_mod(switch, match, action, buffer_id=buffer_id)
+        elif tracer.drops:
+            tracer.record(TRACE_CONTROLLER_REJECT, switch, packet, in_port)
 
-    def send_flow_mod(self, switch, match, action):
+    def send_flow_mod(self, switch, match, action, priority=None, idle_timeout=0, hard_timeout=0, table_id=0,
+                      buffer_id=None):
         """
         スイッチにフローエントリを設定します。
 
         Args:
             switch (Switch): フローを設定するスイッチ。
-            match (tuple): フローのマッチ条件（送信元と宛先アドレス）。
+            match (tuple or dict): フローのマッチ条件（送信元と宛先アドレス、またはマッチフィールドの辞書）。
             action (dict): 実行するアクション（例: 特定のポートへの転送）。
+            priority (int): 優先度（オプション）。
+            idle_timeout (float): アイドルタイムアウト（秒、0 は無期限）。
+            hard_timeout (float): ハードタイムアウト（秒、0 は無期限）。
+            table_id (int): エントリを登録するパイプラインのテーブルの番号。
+            buffer_id (int): Packet-In で受け取ったバッファの ID（オプション）。
         """
-        print(f"フローエントリをスイッチ {switch.name} に設定: {match} -> {action}")
-        BaseController.send_flow_mod(self, switch, match, action)
\ No newline at end of file
+        BaseController.send_flow_mod(
+            self, switch, match, action, priority, idle_timeout, hard_timeout, table_id, buffer_id
+        )
\ No newline at end of file
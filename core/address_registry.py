@@ -0,0 +1,149 @@
+import functools
+import ipaddress
+from array import array
+
+@functools.lru_cache(maxsize=65536)
+def ipv4_value(ip_address):
+    """
+    IPv4 アドレスの数値を返します（結果はキャッシュします）。
+
+    Args:
+        ip_address (str): IPv4 アドレス。
+
+    Returns:
+        int: アドレスの数値。IPv4 アドレスとして解釈できない場合は 0。
+    """
+    try:
+        return int(ipaddress.IPv4Address(ip_address))
+    except (ipaddress.AddressValueError, ValueError):
+        return 0
+
+def pack_flow_key(src_id, dst_id):
+    """
+    送信元と宛先のアドレス ID を 1 つの 64 ビット整数のフローキーにまとめます。
+
+    Args:
+        src_id (int): 送信元 IP アドレスの ID。
+        dst_id (int): 宛先 IP アドレスの ID。
+
+    Returns:
+        int: (src_id << 32) | dst_id。
+    """
+    return (src_id << 32) | dst_id
+
+def unpack_flow_key(key):
+    # pack_flow_key の逆変換（送信元 ID, 宛先 ID）を返す
+    return key >> 32, key & 0xFFFFFFFF
+
+class AddressRegistry:
+    """
+    IP アドレスと MAC アドレスを 0 から始まる連続した整数 ID に変換（インターン）するレジストリ。
+    トポロジの構築時にノードのアドレスを登録しておくことで、パケットやフローテーブルは文字列の代わりに
+    整数を扱えるようになり、ハッシュや比較のコストを抑え、ID を添字とする配列のテーブルも利用できます。
+    """
+
+    def __init__(self):
+        """
+        アドレスレジストリを初期化します。
+        """
+        self.ip_ids = {}  # IP アドレス -> ID
+        self.ips = []  # ID -> IP アドレス
+        self.ip_values = array("I")  # ID -> IPv4 アドレスの数値（IPv4 でない場合は 0）
+        self.mac_ids = {}  # MAC アドレス -> ID
+        self.macs = []  # ID -> MAC アドレス
+
+    def intern_ip(self, ip_address):
+        """
+        IP アドレスの ID を返します。未登録の場合は新しい ID を割り当てます。
+
+        Args:
+            ip_address (str): IP アドレス。
+
+        Returns:
+            int: IP アドレスの ID。
+        """
+        ip_id = self.ip_ids.get(ip_address)
+        if ip_id is None:
+            ip_id = len(self.ips)
+            self.ip_ids[ip_address] = ip_id
+            self.ips.append(ip_address)
+            self.ip_values.append(ipv4_value(ip_address))
+        return ip_id
+
+    def intern_mac(self, mac_address):
+        """
+        MAC アドレスの ID を返します。未登録の場合は新しい ID を割り当てます。
+
+        Args:
+            mac_address (str): MAC アドレス。
+
+        Returns:
+            int: MAC アドレスの ID。
+        """
+        mac_id = self.mac_ids.get(mac_address)
+        if mac_id is None:
+            mac_id = len(self.macs)
+            self.mac_ids[mac_address] = mac_id
+            self.macs.append(mac_address)
+        return mac_id
+
+    def register_node(self, node):
+        """
+        ノードが持つ IP アドレスと MAC アドレスを登録します。
+
+        Args:
+            node (Node): 登録するノード。
+        """
+        ip_address = getattr(node, "ip_address", None)
+        if ip_address is not None:
+            self.intern_ip(ip_address)
+        mac_address = getattr(node, "mac_address", None)
+        if mac_address is not None:
+            self.intern_mac(mac_address)
+
+    def ip_value(self, ip_address, ip_id=None):
+        """
+        IP アドレスの数値を ID を添字とした配列から返します。
+
+        Args:
+            ip_address (str): IP アドレス。
+            ip_id (int): IP アドレスの ID（既知の場合、オプション）。
+
+        Returns:
+            int: IPv4 アドレスの数値。
+        """
+        if ip_id is None:
+            ip_id = self.intern_ip(ip_address)
+        return self.ip_values[ip_id]
+
+    def flow_key(self, src, dst):
+        """
+        送信元と宛先の IP アドレスからフローキーを求めます。
+
+        Args:
+            src (str): 送信元 IP アドレス。
+            dst (str): 宛先 IP アドレス。
+
+        Returns:
+            int: pack_flow_key で作成したフローキー。
+        """
+        return (self.intern_ip(src) << 32) | self.intern_ip(dst)
+
+    def packet_key(self, packet):
+        """
+        パケットのフローキーを返します。
+        パケットにアドレス ID が無い場合は ID を求めてパケットに記録し、以降のホップでは再利用します。
+
+        Args:
+            packet (Packet): 対象のパケット。
+
+        Returns:
+            int: フローキー。
+        """
+        src_id = packet.src_id
+        if src_id is None:
+            src_id = packet.src_id = self.intern_ip(packet.src)
+        dst_id = packet.dst_id
+        if dst_id is None:
+            dst_id = packet.dst_id = self.intern_ip(packet.dst)
+        return (src_id << 32) | dst_id
@@ -0,0 +1,140 @@
+import copy
+import gzip
+import os
+import pickle
+import random
+import sys
+import traceback
+
+CHECKPOINT_VERSION = 1
+
+def save_checkpoint(emulator, file_path):
+    """
+    エミュレータの全状態を圧縮した pickle ファイルに保存します。
+    ノードから到達できるすべてのオブジェクト（イベントキュー、各ノードの統計、スイッチのフローテーブル、
+    リンクの送信キュー、コントローラ、エミュレータの乱数サービスとそのストリーム）に加え、
+    グローバルな乱数生成器の状態も保存します。
+
+    Args:
+        emulator (Emulator): 保存するエミュレータ。
+        file_path (str): 保存先のパス。
+
+    Raises:
+        TypeError: 状態に pickle できないオブジェクト（ラムダ式のハンドラ、スレッドなど）が含まれる場合に発生。
+    """
+    folder = os.path.dirname(file_path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+
+    state = {
+        "version": CHECKPOINT_VERSION,
+        "emulator": emulator,
+        "random_state": random.getstate(),
+    }
+    try:
+        payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        raise TypeError(f"エミュレータの状態を保存できません（pickle できないオブジェクトが含まれています）: {e}")
+    with gzip.open(file_path, "wb", compresslevel=6) as file:
+        file.write(payload)
+
+def load_checkpoint(file_path):
+    """
+    save_checkpoint で保存したファイルからエミュレータを復元します。
+    乱数生成器の状態も保存時の状態に戻します。
+
+    Args:
+        file_path (str): チェックポイントファイルのパス。
+
+    Returns:
+        Emulator: 復元したエミュレータ。
+
+    Raises:
+        ValueError: ファイルの形式が対応していない場合に発生。
+    """
+    with gzip.open(file_path, "rb") as file:
+        state = pickle.load(file)
+    if not isinstance(state, dict) or state.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"対応していないチェックポイントファイルです: {file_path}")
+    random.setstate(state["random_state"])
+    return state["emulator"]
+
+def _run_branch(emulator, branch, variant):
+    try:
+        return ("result", branch(emulator, variant))
+    except Exception:
+        return ("error", traceback.format_exc())
+
+def fork_branches(emulator, branch, variants, workers=None):
+    """
+    現在のエミュレータを複製し、変種ごとに branch(emulator, variant) を実行した結果を返します。
+
+    Linux などの os.fork が利用できる環境では、各分岐を子プロセスで実行します。子プロセスは
+    コピーオンライトで親のメモリを共有するため、ウォームアップ済みの大きな状態も複製のコストが
+    ほとんどかかりません。子プロセスでの変更は親のエミュレータに影響しません。
+    os.fork が利用できない環境では、エミュレータを deepcopy して順に実行します。
+
+    Args:
+        emulator (Emulator): 複製元のエミュレータ。
+        branch (callable): branch(emulator, variant) の形で呼び出され、pickle 可能な結果を返す関数。
+        variants (list): 各分岐に渡す値のリスト。
+        workers (int): 同時に実行する子プロセスの最大数（省略時は CPU 数）。
+
+    Returns:
+        list: variants と同じ順の各分岐の結果。
+
+    Raises:
+        RuntimeError: いずれかの分岐で例外が発生した場合に発生。
+    """
+    variants = list(variants)
+    if not hasattr(os, "fork"):
+        outcomes = [_run_branch(copy.deepcopy(emulator), branch, variant) for variant in variants]
+    else:
+        workers = workers or os.cpu_count() or 1
+        outcomes = []
+        for start in range(0, len(variants), workers):
+            outcomes.extend(_fork_batch(emulator, branch, variants[start:start + workers]))
+
+    results = []
+    for kind, value in outcomes:
+        if kind == "error":
+            raise RuntimeError(f"分岐の実行中にエラーが発生しました:\n{value}")
+        results.append(value)
+    return results
+
+def _fork_batch(emulator, branch, variants):
+    children = []
+    # 未出力のバッファが子プロセスで重複して出力されないように先に書き出す
+    sys.stdout.flush()
+    sys.stderr.flush()
+    for variant in variants:
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            # 子プロセス: 分岐を実行し、結果をパイプに書き込んで終了する
+            os.close(read_fd)
+            status = 0
+            try:
+                outcome = _run_branch(emulator, branch, variant)
+                try:
+                    payload = pickle.dumps(outcome, protocol=pickle.HIGHEST_PROTOCOL)
+                except Exception:
+                    payload = pickle.dumps(("error", traceback.format_exc()))
+                with os.fdopen(write_fd, "wb") as pipe:
+                    pipe.write(payload)
+            except BaseException:
+                status = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(status)
+        os.close(write_fd)
+        children.append((pid, read_fd))
+
+    outcomes = []
+    for pid, read_fd in children:
+        with os.fdopen(read_fd, "rb") as pipe:
+            payload = pipe.read()
+        os.waitpid(pid, 0)
+        outcomes.append(pickle.loads(payload) if payload else ("error", "子プロセスが結果を返さずに終了しました。"))
+    return outcomes
@@ -1,45 +1,300 @@
-from core.event_queue import EventQueue
+import time
+from core.address_registry import AddressRegistry
+from core.event_queue import Event, EventQueue
+from core.packet import PacketPool
+from core.random_streams import RandomService
 
 class Emulator:
-	def __init__(self):
+	def __init__(self, event_queue=None, batch_dispatch=False, seed=None):
+		"""
+		エミュレータを初期化します。
+
+		Args:
+			event_queue (EventQueue or CalendarQueue): 使用するイベントキュー（オプション）。
+				省略した場合はヒープによる EventQueue を使用します。
+			batch_dispatch (bool): True の場合、同一時刻のイベントをまとめて取り出し、
+				イベントタイプごとにバッチとしてハンドラに渡します。
+			seed (int): 乱数サービスの基準シード（オプション）。同じシードを指定すると、
+				リンクのパケット損失やトラフィックの発生間隔が実行ごとに同一になります。
+		"""
 		# ノード、リンク、イベントキュー、シミュレーション時刻の初期化
 		self.nodes = {}
 		self.links = []
-		self.event_queue = EventQueue()
+		self.event_queue = event_queue if event_queue is not None else EventQueue()
 		self.current_time = 0
+		self.batch_dispatch = batch_dispatch
+		# コンポーネントごとの独立した乱数ストリームを提供する乱数サービス
+		self.random = RandomService(seed)
+		# トラフィック生成器が再利用するパケットのフリーリスト
+		self.packet_pool = PacketPool()
+		# IP/MAC アドレスを連続した整数 ID に変換するレジストリ
+		self.addresses = AddressRegistry()
+		# イベントタイプ -> ハンドラのディスパッチテーブル
+		self.handlers = {}
+		self.batch_handlers = {}
+		self.register_handler("PACKET_ARRIVAL", self.handle_packet_arrival)
+		self.register_handler("TIMER", self.handle_timer)
 
 	def add_node(self, node):
 		# ノードを追加（名前をキーとした辞書に格納）
 		self.nodes[node.name] = node
+		# ノードのアドレスをトポロジの構築時に整数 ID として登録
+		self.addresses.register_node(node)
+		# ノードからイベントをスケジュールできるようにエミュレータを登録
+		if hasattr(node, "set_emulator"):
+			node.set_emulator(self)
 
 	def add_link(self, link):
-		# リンクを追加し、リンクの両端のノードにリンクを登録
+		# リンクを追加する（両端のノードへの登録は Link の作成時に済んでいる）
 		self.links.append(link)
-		link.node1.add_link(link)
-		link.node2.add_link(link)
 
 	def schedule_event(self, event):
-		# イベントをイベントキューに追加
-		self.event_queue.push(event)
+		"""
+		イベントをイベントキューに追加します。
+
+		Args:
+			event (Event): スケジュールするイベント。
+
+		Returns:
+			list: cancel_event に渡すことのできるイベントのハンドル。
+		"""
+		return self.event_queue.push(event)
+
+	def schedule_events(self, events):
+		# 複数のイベントをまとめてイベントキューに追加し、ハンドルのリストを返す
+		return self.event_queue.push_many(events)
+
+	def schedule_timer(self, delay, callback, node=None):
+		"""
+		現在時刻から delay 秒後に callback を呼び出す TIMER イベントをスケジュールします。
+
+		Args:
+			delay (float): 現在のシミュレーション時刻からの遅延（秒）。
+			callback (callable): 引数なしで呼び出される関数。
+			node (Node): タイマーを所有するノード（オプション、並列実行時の担当決定に使用）。
+
+		Returns:
+			list: cancel_event に渡すことのできるイベントのハンドル。
+		"""
+		return self.event_queue.push(Event(self.current_time + delay, "TIMER", node, callback=callback))
+
+	def cancel_event(self, handle):
+		"""
+		スケジュール済みのイベントを取り消します（タイマーの再設定などに使用）。
+
+		Args:
+			handle (list): schedule_event が返したイベントのハンドル。
+
+		Returns:
+			bool: 取り消した場合は True、既に処理済みまたは取り消し済みの場合は False。
+		"""
+		return self.event_queue.cancel(handle)
+
+	def register_handler(self, event_type, handler):
+		"""
+		イベントタイプに対するハンドラを登録します（既存の登録は置き換えられます）。
+
+		Args:
+			event_type (str or int): イベントのタイプ。
+			handler (callable): イベントを引数に取る関数 handler(event)。
+		"""
+		self.handlers[event_type] = handler
+
+	def register_batch_handler(self, event_type, handler):
+		"""
+		バッチディスパッチ時に使用するハンドラを登録します。
+		同一時刻に発生した同じタイプのイベントが、発生順のリストとしてまとめて渡されます。
+		登録が無いタイプは register_handler のハンドラが 1 件ずつ呼び出されます。
+
+		Args:
+			event_type (str or int): イベントのタイプ。
+			handler (callable): イベントのリストを引数に取る関数 handler(events)。
+		"""
+		self.batch_handlers[event_type] = handler
+
+	def run_simulation(self, duration, max_events=None, wall_clock_limit=None, stop_when=None, realtime_factor=0):
+		"""
+		指定されたシミュレーション期間の間、イベントを順次処理します。
+
+		Args:
+			duration (float): シミュレーション期間（秒）。
+			max_events (int): 処理するイベント数の上限（オプション）。
+			wall_clock_limit (float): 実行時間（実時間の秒）の上限（オプション）。
+			stop_when (callable): イベントを処理するたびに stop_when(emulator) の形で呼び出され、
+				True を返した時点で終了する述語（オプション）。
+			realtime_factor (float): 実時間に対するシミュレーション時刻の進む速さ。0 の場合は待機せず
+				可能な限り高速に実行し、1.0 で実時間、10 で実時間の 10 倍の速さになるように
+				単調時計に合わせてイベントの処理を待機します。
 
-	def run_simulation(self, duration):
-		# 指定されたシミュレーション期間の間、イベントを順次処理
+		Returns:
+			str: 終了した理由（"duration"、"empty"、"max_events"、"wall_clock"、"stop_when" のいずれか）。
+		"""
 		end_time = self.current_time + duration
-		while self.current_time < end_time and not self.event_queue.is_empty():
-			# 次のイベントを取得し、シミュレーション時刻を更新
-			event = self.event_queue.pop()
-			self.current_time = event.time
-			self.process_event(event)
+		if max_events is None and wall_clock_limit is None and stop_when is None and not realtime_factor:
+			return self._run_until(end_time)
+		return self._run_controlled(end_time, max_events, wall_clock_limit, stop_when, realtime_factor)
+
+	def _run_until(self, end_time):
+		# 制御オプションが無い場合の高速なイベントループ
+		event_queue = self.event_queue
+		if self.batch_dispatch:
+			while len(event_queue) and event_queue.peek_time() <= end_time:
+				# 同一時刻のイベントをまとめて取り出し、シミュレーション時刻を更新
+				batch_time = event_queue.peek_time()
+				batch = []
+				while len(event_queue) and event_queue.peek_time() == batch_time:
+					batch.append(event_queue.pop())
+				self.current_time = batch_time
+				self.process_batch(batch)
+		else:
+			handlers = self.handlers
+			while len(event_queue) and event_queue.peek_time() <= end_time:
+				# 次のイベントを取得し、シミュレーション時刻を更新
+				event = event_queue.pop()
+				self.current_time = event.time
+				handler = handlers.get(event.type)
+				if handler is not None:
+					handler(event)
+		return "duration" if len(event_queue) else "empty"
+
+	def _run_controlled(self, end_time, max_events, wall_clock_limit, stop_when, realtime_factor):
+		# イベント数、実行時間、述語、実時間への同期を考慮したイベントループ
+		event_queue = self.event_queue
+		handlers = self.handlers
+		wall_start = time.monotonic()
+		sim_start = self.current_time
+		deadline = wall_start + wall_clock_limit if wall_clock_limit is not None else None
+		processed = 0
+		while True:
+			if not len(event_queue):
+				return "empty"
+			next_time = event_queue.peek_time()
+			if next_time > end_time:
+				return "duration"
+			if max_events is not None and processed >= max_events:
+				return "max_events"
+
+			now = time.monotonic()
+			if deadline is not None and now >= deadline:
+				return "wall_clock"
+			if realtime_factor:
+				# 次のイベントの時刻に対応する実時間まで待機する
+				target = wall_start + (next_time - sim_start) / realtime_factor
+				if deadline is not None and target > deadline:
+					time.sleep(max(0.0, deadline - now))
+					return "wall_clock"
+				if target > now:
+					time.sleep(target - now)
+
+			if self.batch_dispatch:
+				# 同一時刻のイベントは残りのイベント数の上限までしか取り出さない（残りはキューに残す）
+				limit = max_events - processed if max_events is not None else None
+				batch = []
+				while len(event_queue) and event_queue.peek_time() == next_time and (limit is None or len(batch) < limit):
+					batch.append(event_queue.pop())
+				self.current_time = next_time
+				self.process_batch(batch)
+				processed += len(batch)
+			else:
+				event = event_queue.pop()
+				self.current_time = event.time
+				handler = handlers.get(event.type)
+				if handler is not None:
+					handler(event)
+				processed += 1
+
+			if stop_when is not None and stop_when(self):
+				return "stop_when"
+
+	def run_parallel(self, duration, workers=None, partition=None):
+		"""
+		ノードを複数のプロセスに分割し、保守的な並列離散イベントシミュレーションを実行します。
+		詳細は core.parallel.ParallelSimulation を参照してください。
+
+		Args:
+			duration (float): シミュレーション期間（秒）。
+			workers (int): ワーカープロセス数（オプション、省略時は CPU 数）。
+			partition (dict): ノード名 -> パーティション番号の辞書（オプション）。
+		"""
+		from core.parallel import ParallelSimulation
+		ParallelSimulation(self, workers=workers, partition=partition).run(duration)
+
+	def checkpoint(self, file_path):
+		"""
+		エミュレータの全状態（イベントキュー、ノード、フローテーブル、リンクのバッファ、
+		コントローラ、乱数の状態）を圧縮ファイルに保存します。
+
+		Args:
+			file_path (str): 保存先のパス。
+		"""
+		from core.checkpoint import save_checkpoint
+		save_checkpoint(self, file_path)
+
+	@classmethod
+	def restore(cls, file_path):
+		"""
+		checkpoint で保存したファイルからエミュレータを復元します。
+
+		Args:
+			file_path (str): チェックポイントファイルのパス。
+
+		Returns:
+			Emulator: 復元したエミュレータ。
+		"""
+		from core.checkpoint import load_checkpoint
+		return load_checkpoint(file_path)
+
+	def fork(self, branch, variants, workers=None):
+		"""
+		現在の状態を複製し、変種ごとに branch(emulator, variant) を別々に実行します。
+		Linux では os.fork によるコピーオンライトで複製するため、ウォームアップを 1 回で済ませられます。
+
+		Args:
+			branch (callable): branch(emulator, variant) の形で呼び出され、pickle 可能な結果を返す関数。
+			variants (list): 各分岐に渡す値のリスト。
+			workers (int): 同時に実行する子プロセスの最大数（オプション）。
+
+		Returns:
+			list: variants と同じ順の各分岐の結果。
+		"""
+		from core.checkpoint import fork_branches
+		return fork_branches(self, branch, variants, workers)
 
 	def process_event(self, event):
-		# イベントのタイプに応じた処理を実行
-		if event.type == "PACKET_ARRIVAL":
-			self.handle_packet_arrival(event)
-		# 他のイベントタイプの処理を追加可能
+		# イベントのタイプに応じたハンドラを呼び出す（未登録のタイプは無視）
+		handler = self.handlers.get(event.type)
+		if handler is not None:
+			handler(event)
+
+	def process_batch(self, events):
+		"""
+		同一時刻のイベントをタイプごとにまとめて処理します。
+		タイプは最初に出現した順に、各タイプ内のイベントは発生順に処理されます。
+
+		Args:
+			events (list): 同一時刻のイベントのリスト。
+		"""
+		groups = {}
+		for event in events:
+			groups.setdefault(event.type, []).append(event)
+		for event_type, group in groups.items():
+			batch_handler = self.batch_handlers.get(event_type)
+			if batch_handler is not None:
+				batch_handler(group)
+				continue
+			handler = self.handlers.get(event_type)
+			if handler is not None:
+				for event in group:
+					handler(event)
 
 	def handle_packet_arrival(self, event):
-		# パケット到着イベントの処理（仮の処理）
-		print(f"Packet arrived at {event.node.name} at time {event.time}")
+		# パケット到着イベントの処理（リンクから届いたパケットを受信ノードに渡す）
+		if event.packet is not None:
+			event.node.receive_packet(event.packet, event.in_port)
+
+	def handle_timer(self, event):
+		# タイマーイベントの処理（登録された関数を呼び出す）
+		event.callback()
 
 	def get_node_by_name(self, name):
 		"""
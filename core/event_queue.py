@@ -1,18 +1,415 @@
 import heapq
+import itertools
+
+class Event:
+    """
+    シミュレーション内で発生するイベントを表すクラス。
+    """
+
+    def __init__(self, time, event_type, node=None, packet=None, in_port=None, callback=None):
+        """
+        イベントの初期化。
+
+        Args:
+            time (float): イベントが発生するシミュレーション時刻（秒）。
+            event_type (str): イベントのタイプ（例: "PACKET_ARRIVAL"）。
+            node (Node): イベントが発生するノード（オプション）。
+            packet (Packet): イベントに関連するパケット（オプション）。
+            in_port (int): パケットを受信するポート番号（オプション）。
+            callback (callable): TIMER イベントで呼び出す関数（オプション）。
+        """
+        self.time = time
+        self.type = event_type
+        self.node = node
+        self.packet = packet
+        self.in_port = in_port
+        self.callback = callback
+
+    def __lt__(self, other):
+        # イベントの優先順位（時刻）を比較する
+        return self.time < other.time
 
 class EventQueue:
+    """
+    二分ヒープによるイベントキュー。
+    イベントは [時刻, 通し番号, イベント] の組として格納されるため、比較は組み込みの
+    シーケンス比較で行われ、同一時刻のイベントは追加された順（FIFO）に取り出されます。
+
+    push が返す組はイベントのハンドルとして cancel に渡すことができます。
+    取り消されたイベントはその場で削除せず墓標（イベントを None にした組）として残し、
+    取り出し時に読み飛ばします。墓標の割合が COMPACT_RATIO を超えるとヒープを再構築します。
+    """
+
+    COMPACT_RATIO = 0.5  # 再構築を行う墓標の割合
+    COMPACT_MIN = 64  # 再構築を行う墓標の最小数
+
     def __init__(self):
-        # 優先度付きキューとしてイベントを格納するリスト
+        # 優先度付きキューとして [時刻, 通し番号, イベント] を格納するリスト
         self.queue = []
+        self._counter = itertools.count()  # 同一時刻のイベントの順序を決める通し番号
+        self._tombstones = 0  # 取り消し済みでヒープに残っている組の数
 
     def push(self, event):
-        # ヒープにイベントを追加（優先度はevent.timeで決定）
-        heapq.heappush(self.queue, event)
+        """
+        イベントを追加します（優先度はevent.timeと通し番号で決定）。
+
+        Args:
+            event (Event): 追加するイベント。
+
+        Returns:
+            list: cancel に渡すことのできるイベントのハンドル。
+        """
+        entry = [event.time, next(self._counter), event]
+        heapq.heappush(self.queue, entry)
+        return entry
+
+    def push_many(self, events):
+        """
+        複数のイベントをまとめて追加します。
+        追加数が既存のイベント数より多い場合はヒープを一括で再構築します。
+
+        Args:
+            events (iterable): 追加するイベント。
+
+        Returns:
+            list: 追加した順のイベントのハンドル。
+        """
+        counter = self._counter
+        entries = [[event.time, next(counter), event] for event in events]
+        if len(entries) > len(self.queue):
+            self.queue.extend(entries)
+            heapq.heapify(self.queue)
+        else:
+            for entry in entries:
+                heapq.heappush(self.queue, entry)
+        return entries
+
+    def push_entry(self, entry, renumber=False):
+        """
+        他のキューから取り出した組をそのまま追加します。組はハンドルを兼ねているため、
+        ハンドルを保持しているコンポーネントは移動後も同じハンドルでイベントを取り消せます。
+
+        Args:
+            entry (list): drain_entries が返した [時刻, 通し番号, イベント] の組。
+            renumber (bool): True の場合は通し番号をこのキューの番号に振り直します。
+        """
+        if renumber:
+            entry[1] = next(self._counter)
+        heapq.heappush(self.queue, entry)
+
+    def drain_entries(self):
+        """
+        取り消されていないすべての組を取り出される順に返し、キューを空にします。
+        pop と異なり組を処理済みにしないため、push_entry で別のキューに移すことができます。
+
+        Returns:
+            list: [時刻, 通し番号, イベント] の組のリスト。
+        """
+        entries = sorted(entry for entry in self.queue if entry[2] is not None)
+        self.queue = []
+        self._tombstones = 0
+        return entries
+
+    def cancel(self, handle):
+        """
+        スケジュール済みのイベントを O(1) で取り消します。
+
+        Args:
+            handle (list): push が返したイベントのハンドル。
+
+        Returns:
+            bool: 取り消した場合は True、既に処理済みまたは取り消し済みの場合は False。
+        """
+        if handle[2] is None:
+            return False
+        handle[2] = None
+        self._tombstones += 1
+        if self._tombstones > self.COMPACT_MIN and self._tombstones > self.COMPACT_RATIO * len(self.queue):
+            self.compact()
+        return True
+
+    def compact(self):
+        """
+        墓標を取り除いてヒープを再構築します。
+        """
+        self.queue = [entry for entry in self.queue if entry[2] is not None]
+        heapq.heapify(self.queue)
+        self._tombstones = 0
 
     def pop(self):
-        # ヒープからイベントを取り出す（最も早い時間のイベント）
-        return heapq.heappop(self.queue)
+        # ヒープからイベントを取り出す（最も早い時間のイベント、墓標は読み飛ばす）
+        queue = self.queue
+        while True:
+            entry = heapq.heappop(queue)
+            event = entry[2]
+            if event is not None:
+                # 処理済みのハンドルを取り消せないように印を付ける
+                entry[2] = None
+                return event
+            self._tombstones -= 1
+
+    def pop_entry(self):
+        """
+        pop と同様にイベントを取り出し、組の内容を返します（組は処理済みになります）。
+
+        Returns:
+            tuple: (時刻, 通し番号, イベント)。
+        """
+        queue = self.queue
+        while True:
+            entry = heapq.heappop(queue)
+            event = entry[2]
+            if event is not None:
+                entry[2] = None
+                return entry[0], entry[1], event
+            self._tombstones -= 1
+
+    def peek_time(self):
+        """
+        次に取り出されるイベントの時刻を返します。
+
+        Returns:
+            float or None: 最も早いイベントの時刻。キューが空の場合は None。
+        """
+        queue = self.queue
+        while queue and queue[0][2] is None:
+            heapq.heappop(queue)
+            self._tombstones -= 1
+        return queue[0][0] if queue else None
 
     def is_empty(self):
         # キューが空かどうかを確認する
-        return len(self.queue) == 0
\ No newline at end of file
+        return len(self.queue) == self._tombstones
+
+    def __len__(self):
+        return len(self.queue) - self._tombstones
+
+class CalendarQueue:
+    """
+    カレンダーキュー（Brown, 1988）によるイベントキュー。
+    時刻軸を幅 bucket_width のバケットに区切って循環配列に割り当て、近い将来のイベントが
+    密集する分布では追加・取り出しともに償却 O(1) で動作します。
+    イベント数に応じてバケット数とバケット幅を自動的に調整します。
+    EventQueue と同じインターフェース（ハンドルによる取り消しを含む）を持ち、
+    Emulator に差し替えて使用できます。
+    """
+
+    MIN_BUCKETS = 2
+    SAMPLE_SIZE = 25  # バケット幅の推定に使用するイベント数
+    COMPACT_RATIO = 0.5  # 再構築を行う墓標の割合
+    COMPACT_MIN = 64  # 再構築を行う墓標の最小数
+
+    def __init__(self, bucket_count=2, bucket_width=1.0):
+        """
+        カレンダーキューを初期化します。
+
+        Args:
+            bucket_count (int): 初期バケット数。
+            bucket_width (float): 初期バケット幅（秒）。
+        """
+        self._counter = itertools.count()
+        self._size = 0  # バケットに格納されている組の数（墓標を含む）
+        self._tombstones = 0  # 取り消し済みでバケットに残っている組の数
+        self._current = 0  # 現在走査中の仮想バケット番号（int(時刻 / バケット幅)）
+        self._setup(max(bucket_count, self.MIN_BUCKETS), bucket_width)
+
+    def _setup(self, bucket_count, bucket_width):
+        # バケット（各バケットは [時刻, 通し番号, イベント] の小さなヒープ）を初期化
+        self.buckets = [[] for _ in range(bucket_count)]
+        self.bucket_count = bucket_count
+        self.bucket_width = bucket_width
+
+    def push(self, event):
+        """
+        イベントを追加します。
+
+        Args:
+            event (Event): 追加するイベント。
+
+        Returns:
+            list: cancel に渡すことのできるイベントのハンドル。
+        """
+        entry = [event.time, next(self._counter), event]
+        self._insert(entry)
+        self._size += 1
+        if self._size > 2 * self.bucket_count:
+            self._resize(2 * self.bucket_count)
+        return entry
+
+    def push_many(self, events):
+        """
+        複数のイベントをまとめて追加します。
+
+        Args:
+            events (iterable): 追加するイベント。
+
+        Returns:
+            list: 追加した順のイベントのハンドル。
+        """
+        counter = self._counter
+        entries = [[event.time, next(counter), event] for event in events]
+        for entry in entries:
+            self._insert(entry)
+        self._size += len(entries)
+        if self._size > 2 * self.bucket_count:
+            self._resize(self._size)
+        return entries
+
+    def push_entry(self, entry, renumber=False):
+        """
+        他のキューから取り出した組をそのまま追加します（EventQueue.push_entry と同じ）。
+
+        Args:
+            entry (list): drain_entries が返した [時刻, 通し番号, イベント] の組。
+            renumber (bool): True の場合は通し番号をこのキューの番号に振り直します。
+        """
+        if renumber:
+            entry[1] = next(self._counter)
+        self._insert(entry)
+        self._size += 1
+        if self._size > 2 * self.bucket_count:
+            self._resize(2 * self.bucket_count)
+
+    def drain_entries(self):
+        """
+        取り消されていないすべての組を取り出される順に返し、キューを空にします（EventQueue.drain_entries と同じ）。
+
+        Returns:
+            list: [時刻, 通し番号, イベント] の組のリスト。
+        """
+        entries = sorted(entry for bucket in self.buckets for entry in bucket if entry[2] is not None)
+        self._setup(self.bucket_count, self.bucket_width)
+        self._size = 0
+        self._tombstones = 0
+        self._current = 0
+        return entries
+
+    def cancel(self, handle):
+        """
+        スケジュール済みのイベントを O(1) で取り消します。
+
+        Args:
+            handle (list): push が返したイベントのハンドル。
+
+        Returns:
+            bool: 取り消した場合は True、既に処理済みまたは取り消し済みの場合は False。
+        """
+        if handle[2] is None:
+            return False
+        handle[2] = None
+        self._tombstones += 1
+        if self._tombstones > self.COMPACT_MIN and self._tombstones > self.COMPACT_RATIO * self._size:
+            self.compact()
+        return True
+
+    def compact(self):
+        """
+        墓標を取り除いてバケットを再構築します。
+        """
+        self._resize(self.bucket_count)
+
+    def _insert(self, entry):
+        virtual_bucket = int(entry[0] / self.bucket_width)
+        heapq.heappush(self.buckets[virtual_bucket % self.bucket_count], entry)
+        # 現在位置より過去のイベントが追加された場合は走査位置を戻す
+        if virtual_bucket < self._current:
+            self._current = virtual_bucket
+
+    def _locate(self):
+        """
+        最も早い組（墓標を含む）を先頭に持つバケットを探し、そのインデックスを返します。
+        """
+        buckets = self.buckets
+        count = self.bucket_count
+        width = self.bucket_width
+        virtual_bucket = self._current
+        # 現在位置から 1 周分、今年（同じ仮想バケット）のイベントを探す
+        for _ in range(count):
+            bucket = buckets[virtual_bucket % count]
+            if bucket and int(bucket[0][0] / width) <= virtual_bucket:
+                self._current = virtual_bucket
+                return virtual_bucket % count
+            virtual_bucket += 1
+        # 1 周して見つからない場合は全バケットの先頭から最小のものを直接探す
+        index = min((i for i in range(count) if buckets[i]), key=lambda i: buckets[i][0][:2])
+        self._current = int(buckets[index][0][0] / width)
+        return index
+
+    def _discard_tombstones(self):
+        # 先頭にある墓標を取り除き、生きているイベントを先頭に持つバケットを返す
+        while True:
+            bucket = self.buckets[self._locate()]
+            if bucket[0][2] is not None:
+                return bucket
+            heapq.heappop(bucket)
+            self._size -= 1
+            self._tombstones -= 1
+
+    def pop(self):
+        if self._size == self._tombstones:
+            raise IndexError("pop from an empty event queue")
+        entry = heapq.heappop(self._discard_tombstones())
+        self._size -= 1
+        if self.bucket_count > self.MIN_BUCKETS and self._size < self.bucket_count // 2:
+            self._resize(self.bucket_count // 2)
+        event = entry[2]
+        # 処理済みのハンドルを取り消せないように印を付ける
+        entry[2] = None
+        return event
+
+    def pop_entry(self):
+        """
+        pop と同様にイベントを取り出し、組の内容を返します（EventQueue.pop_entry と同じ）。
+
+        Returns:
+            tuple: (時刻, 通し番号, イベント)。
+        """
+        if self._size == self._tombstones:
+            raise IndexError("pop from an empty event queue")
+        time, key = self._discard_tombstones()[0][:2]
+        return time, key, self.pop()
+
+    def peek_time(self):
+        """
+        次に取り出されるイベントの時刻を返します。
+
+        Returns:
+            float or None: 最も早いイベントの時刻。キューが空の場合は None。
+        """
+        if self._size == self._tombstones:
+            return None
+        return self._discard_tombstones()[0][0]
+
+    def _resize(self, bucket_count):
+        """
+        墓標を取り除いてバケット数を変更し、先頭付近のイベント間隔からバケット幅を推定し直します。
+        """
+        entries = [entry for bucket in self.buckets for entry in bucket if entry[2] is not None]
+        bucket_count = max(bucket_count, self.MIN_BUCKETS)
+        width = self._estimate_width(entries)
+        self._setup(bucket_count, width)
+        buckets = self.buckets
+        for entry in entries:
+            buckets[int(entry[0] / width) % bucket_count].append(entry)
+        for bucket in buckets:
+            heapq.heapify(bucket)
+        self._size = len(entries)
+        self._tombstones = 0
+        self._current = int(min(entries)[0] / width) if entries else 0
+
+    def _estimate_width(self, entries):
+        # 先頭のイベント間隔の平均を求め、外れ値（平均の 2 倍超）を除いた平均の 3 倍を幅とする
+        sample = heapq.nsmallest(self.SAMPLE_SIZE, entries)
+        gaps = [b[0] - a[0] for a, b in zip(sample, sample[1:])]
+        if not gaps:
+            return self.bucket_width
+        average = sum(gaps) / len(gaps)
+        gaps = [gap for gap in gaps if gap <= 2 * average]
+        average = sum(gaps) / len(gaps) if gaps else 0
+        return 3 * average if average > 0 else self.bucket_width
+
+    def is_empty(self):
+        return self._size == self._tombstones
+
+    def __len__(self):
+        return self._size - self._tombstones
@@ -1,11 +1,161 @@
 class Packet:
-    def __init__(self, src, dst, payload, protocol="TCP"):
+    """
+    ネットワーク上を転送されるパケットを表します。
+    大量のパケットを扱えるように __slots__ で属性を固定し、インスタンスごとの辞書を持ちません。
+    サイズは size_bytes で数値として保持するため、ペイロードの実データは省略できます。
+    """
+
+    __slots__ = (
+        "src", "dst", "src_mac", "dst_mac", "protocol", "src_port", "dst_port",
+        "ttl", "size_bytes", "timestamp", "flow_id", "payload", "packet_id", "src_id", "dst_id", "pool",
+    )
+    # pickle で保存する属性（アドレス ID とプールはプロセスごとに異なるため除く）
+    _STATE_FIELDS = __slots__[:-3]
+
+    def __init__(self, src=None, dst=None, payload=None, protocol="TCP", src_mac=None, dst_mac=None,
+                 src_port=0, dst_port=0, ttl=64, size_bytes=None, timestamp=0.0, flow_id=None,
+                 src_ip=None, dst_ip=None, src_id=None, dst_id=None):
+        """
+        パケットを初期化します。
+
+        Args:
+            src (str): 送信元 IP アドレス（src_ip でも指定できます）。
+            dst (str): 宛先 IP アドレス（dst_ip でも指定できます）。
+            payload (str): ペイロード（オプション）。
+            protocol (str): プロトコル名。
+            src_mac (str): 送信元 MAC アドレス。
+            dst_mac (str): 宛先 MAC アドレス。
+            src_port (int): 送信元ポート番号。
+            dst_port (int): 宛先ポート番号。
+            ttl (int): TTL。
+            size_bytes (int): パケットのサイズ（バイト）。省略した場合はペイロードの長さ。
+            timestamp (float): パケットを生成したシミュレーション時刻（秒）。
+            flow_id (int): フローの識別子（オプション）。
+            src_ip (str): src の別名。
+            dst_ip (str): dst の別名。
+            src_id (int): 送信元 IP アドレスの ID（AddressRegistry が割り当てた値、オプション）。
+            dst_id (int): 宛先 IP アドレスの ID（オプション）。
+        """
         # パケットの送信元、宛先、ペイロード、プロトコルの初期化
-        self.src = src
-        self.dst = dst
+        self.src = src if src is not None else src_ip
+        self.dst = dst if dst is not None else dst_ip
         self.payload = payload
         self.protocol = protocol
+        self.src_mac = src_mac
+        self.dst_mac = dst_mac
+        self.src_port = src_port
+        self.dst_port = dst_port
+        self.ttl = ttl
+        self.size_bytes = size_bytes if size_bytes is not None else (len(payload) if payload is not None else 0)
+        self.timestamp = timestamp
+        self.flow_id = flow_id
+        self.packet_id = None  # トレースで使用する ID（初めて記録したときに割り当てる）
+        self.src_id = src_id  # 省略した場合は最初のスイッチで求めて記録する
+        self.dst_id = dst_id
+        self.pool = None  # 取得元の PacketPool（プールから取得した場合のみ）
+
+    @property
+    def src_ip(self):
+        return self.src
+
+    @src_ip.setter
+    def src_ip(self, value):
+        self.src = value
+
+    @property
+    def dst_ip(self):
+        return self.dst
+
+    @dst_ip.setter
+    def dst_ip(self, value):
+        self.dst = value
+
+    def __getstate__(self):
+        # アドレス ID とプールへの参照は pickle しない（転送先のプロセスで改めて求める）
+        return tuple(getattr(self, name) for name in self._STATE_FIELDS)
+
+    def __setstate__(self, state):
+        for name, value in zip(self._STATE_FIELDS, state):
+            setattr(self, name, value)
+        self.src_id = None
+        self.dst_id = None
+        self.pool = None
+
+    def copy(self):
+        """
+        同じフィールドを持つパケットを複製します（複数のポートへの出力などに使用）。
+        複製したパケットは元のパケットと同じプールに返却され、トレースでも同じパケット ID で記録されます。
+
+        Returns:
+            Packet: 複製したパケット。
+        """
+        packet = Packet.__new__(Packet)
+        for name in Packet.__slots__:
+            setattr(packet, name, getattr(self, name))
+        return packet
+
+    def release(self):
+        """
+        パケットの処理が終わったことを通知し、プールから取得したパケットであればプールに返却します。
+        返却後のパケットは再利用されるため、呼び出し側で参照を保持しないでください。
+        """
+        if self.pool is not None:
+            self.pool.release(self)
 
     def get_info(self):
         # パケットの基本情報を文字列で返す
-        return f"Packet from {self.src} to {self.dst}, protocol: {self.protocol}, payload: {self.payload}"
\ No newline at end of file
+        return f"Packet from {self.src} to {self.dst}, protocol: {self.protocol}, size: {self.size_bytes}, payload: {self.payload}"
+
+class PacketPool:
+    """
+    Packet オブジェクトを再利用するためのフリーリスト。
+    トラフィック生成器がパケットを大量に生成・破棄する際の割り当てのコストを抑えます。
+    """
+
+    def __init__(self, max_size=65536):
+        """
+        パケットプールを初期化します。
+
+        Args:
+            max_size (int): フリーリストに保持するパケットの最大数。
+        """
+        self.max_size = max_size
+        self.free = []  # 再利用可能なパケットのリスト
+        self.allocated = 0  # 新たに生成したパケット数
+        self.reused = 0  # 再利用したパケット数
+
+    def acquire(self, src, dst, payload=None, protocol="TCP", **fields):
+        """
+        フリーリストのパケットを再初期化して返します。フリーリストが空の場合は新たに生成します。
+
+        Args:
+            src (str): 送信元 IP アドレス。
+            dst (str): 宛先 IP アドレス。
+            payload (str): ペイロード（オプション）。
+            protocol (str): プロトコル名。
+            **fields: Packet のその他のヘッダフィールド（size_bytes、timestamp など）。
+
+        Returns:
+            Packet: 初期化済みのパケット。
+        """
+        if self.free:
+            packet = self.free.pop()
+            Packet.__init__(packet, src, dst, payload, protocol, **fields)
+            self.reused += 1
+        else:
+            packet = Packet(src, dst, payload, protocol, **fields)
+            self.allocated += 1
+        packet.pool = self
+        return packet
+
+    def release(self, packet):
+        """
+        パケットをフリーリストに返却します。
+
+        Args:
+            packet (Packet): 返却するパケット。
+        """
+        packet.pool = None  # 二重に返却されないようにする
+        packet.payload = None
+        if len(self.free) < self.max_size:
+            self.free.append(packet)
@@ -0,0 +1,525 @@
+import functools
+import heapq
+import io
+import itertools
+import multiprocessing
+import os
+import pickle
+import traceback
+from collections import deque
+from core.random_streams import RandomStream
+
+def collect_links(emulator):
+    """
+    エミュレータ内のノードに接続されているすべてのリンクを返します。
+    Emulator.add_link を経由せずに作成されたリンクも含みます。
+
+    Args:
+        emulator (Emulator): 対象のエミュレータ。
+
+    Returns:
+        list: 重複を除いたリンクのリスト（検出順）。
+    """
+    links = {}
+    for link in emulator.links:
+        links[id(link)] = link
+    for node in emulator.nodes.values():
+        for link in node.links:
+            links.setdefault(id(link), link)
+    return list(links.values())
+
+def partition_nodes(emulator, partition_count):
+    """
+    ノードを幅優先探索の順に並べ、連続したブロックに分割します。
+    隣接するノードが同じパーティションに入りやすくなるため、分割をまたぐリンクが少なくなります。
+
+    Args:
+        emulator (Emulator): 対象のエミュレータ。
+        partition_count (int): パーティション数。
+
+    Returns:
+        dict: ノード名 -> パーティション番号の辞書。
+    """
+    adjacency = {name: [] for name in emulator.nodes}
+    for link in collect_links(emulator):
+        if link.node1.name in adjacency and link.node2.name in adjacency:
+            adjacency[link.node1.name].append(link.node2.name)
+            adjacency[link.node2.name].append(link.node1.name)
+
+    order = []
+    visited = set()
+    for root in emulator.nodes:
+        if root in visited:
+            continue
+        visited.add(root)
+        pending = deque([root])
+        while pending:
+            name = pending.popleft()
+            order.append(name)
+            for neighbor in adjacency[name]:
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    pending.append(neighbor)
+
+    block = -(-len(order) // partition_count) if order else 1
+    return {name: index // block for index, name in enumerate(order)}
+
+class _SharedPickler(pickle.Pickler):
+    """
+    ワーカーとコーディネータの間でイベントや状態を送るための pickler。
+    fork の前から存在する共有オブジェクト（エミュレータ、ノード、リンク、コントローラなど）は実体を送らず
+    共有リストの番号で表すため、受信側では自プロセスの同じオブジェクトを参照します。
+    値として送った乱数ストリームは streams に記録します（受信側で乱数サービスに登録し直すため）。
+    """
+
+    def __init__(self, file, shared_ids):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.shared_ids = shared_ids  # id(共有オブジェクト) -> 共有リストの番号
+        self.streams = {}  # id(乱数ストリーム) -> RandomStream
+
+    def persistent_id(self, obj):
+        index = self.shared_ids.get(id(obj))
+        if index is not None:
+            return index
+        if type(obj) is RandomStream:
+            self.streams[id(obj)] = obj
+        return None
+
+class _SharedUnpickler(pickle.Unpickler):
+    # 共有リストの番号を自プロセスの共有オブジェクトに戻す unpickler
+    def __init__(self, file, shared):
+        super().__init__(file)
+        self.shared = shared
+
+    def persistent_load(self, index):
+        return self.shared[index]
+
+def _dumps(shared_ids, *objects):
+    # 共有オブジェクトを番号に置き換えて objects を順に pickle する（オブジェクト間の参照は保たれる）
+    buffer = io.BytesIO()
+    pickler = _SharedPickler(buffer, shared_ids)
+    for obj in objects:
+        pickler.dump(obj)
+    return buffer.getvalue(), pickler
+
+def _loads(shared, payload, count=1):
+    # _dumps で pickle した count 個のオブジェクトを復元する
+    unpickler = _SharedUnpickler(io.BytesIO(payload), shared)
+    return [unpickler.load() for _ in range(count)]
+
+def _callback_owner(callback):
+    # TIMER イベントの関数（束縛メソッドや functools.partial）を所有するオブジェクトを返す
+    while isinstance(callback, functools.partial):
+        callback = callback.func
+    return getattr(callback, "__self__", None)
+
+def _shared_objects(emulator, timer_owners):
+    """
+    ワーカーとの間で実体を送らずに参照として扱うオブジェクトのリストを返します。
+    """
+    objects = [emulator, emulator.random, emulator.addresses, emulator.packet_pool]
+    objects.extend(emulator.nodes.values())
+    for link in collect_links(emulator):
+        objects.append(link)
+        objects.extend(getattr(link, "ports", {}).values())
+        for egress in getattr(link, "egress_queues", {}).values():
+            objects.append(egress)
+            if egress.tap is not None:
+                objects.append(egress.tap)
+    for node in emulator.nodes.values():
+        controller = getattr(node, "controller", None)
+        if controller is not None:
+            objects.append(controller)
+        objects.extend(getattr(node, "port_taps", {}).values())
+    objects.extend(timer_owners)
+    unique = {}
+    for obj in objects:
+        unique.setdefault(id(obj), obj)
+    return list(unique.values())
+
+class _CausalKeys:
+    """
+    ワーカーのイベントキューで通し番号の代わりに使用する順序キー (親の時刻, 親の処理順, 番号)。
+
+    逐次実行では同一時刻のイベントは追加された順に取り出されます。追加された順は、追加したイベント（親）が
+    処理された順と、親の処理中に追加された順で決まるため、キーに親の時刻と処理順を含めることで
+    逐次実行の通し番号と同じ順序になります。時間窓の中では親の処理順としてワーカー内の処理の番号を使い、
+    時間窓の終了時に全パーティションで共通の順位に置き換えます（_PartitionQueue.ancestors と compact）。
+    """
+
+    def __init__(self):
+        self.time = float("-inf")  # 処理中のイベントの時刻
+        self.index = None  # 処理中のイベントのこの時間窓での処理の番号
+        self.count = itertools.count()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return (self.time, self.index, next(self.count))
+
+class _PartitionQueue:
+    """
+    ワーカープロセス内で使用するイベントキュー。
+    担当外のノードに対するイベントは送信箱に振り分け、担当ノードのイベントのみを内部のキューに格納します。
+
+    順序キーは、前の時間窓までに確定したもの（親の時刻が window_start より前で、順位は全パーティション共通）と、
+    この時間窓で作成したもの（親の時刻が window_start 以降で、順位はこのワーカー内の処理の番号）の 2 種類です。
+    後者は他のワーカーに送る前に前者に置き換えるため、同じキューで比較されるのは同じワーカーのものに限られ、
+    2 種類のキーどうしは親の時刻だけで順序が決まります。
+    """
+
+    def __init__(self, inner, owner, index, window_start):
+        self.inner = inner
+        self.owner = owner
+        self.index = index
+        self.keys = _CausalKeys()
+        inner._counter = self.keys  # 内部のキューの通し番号を順序キーに置き換える
+        self.outbox = {}  # 宛先パーティション -> [時刻, 順序キー, イベント] の組のリスト
+        self.window_start = window_start  # 現在の時間窓の開始時刻
+        self.processed = []  # この時間窓で処理したイベントの (時刻, 順序キー)
+        self.created = []  # この時間窓で作成した組（送信箱のものを含む）
+
+    def push(self, event):
+        node = event.node
+        if node is not None and self.owner[node.name] != self.index:
+            entry = [event.time, next(self.keys), event]
+            self.outbox.setdefault(self.owner[node.name], []).append(entry)
+            self.created.append(entry)
+            return None
+        entry = self.inner.push(event)
+        self.created.append(entry)
+        return entry
+
+    def begin(self, time, key):
+        # 取り出したイベントの処理を始める（処理中に追加されるイベントのキーの親になる）
+        self.keys.time = time
+        self.keys.index = len(self.processed)
+        self.processed.append((time, key))
+
+    def ancestors(self):
+        """
+        この時間窓で作成され未処理のまま残っている組について、親をたどった処理済みのイベントを返します。
+
+        Returns:
+            list: (時刻, 確定した順序キー, 親の位置, 番号) のリスト。親はリスト内で子より前にあり、
+                順序キーが前の時間窓までに確定したものは親の位置が -1、それ以外は確定した順序キーが None です。
+        """
+        processed = self.processed
+        start = self.window_start
+        positions = {}  # 処理の番号 -> 返すリスト内の位置
+        nodes = []
+        live = []
+        for entry in self.created:
+            if entry[2] is None:
+                continue
+            index = entry[1][1]
+            chain = []
+            while index not in positions:
+                chain.append(index)
+                key = processed[index][1]
+                if key[0] < start:
+                    break
+                index = key[1]
+            for index in reversed(chain):
+                time, key = processed[index]
+                if key[0] < start:
+                    nodes.append((time, key, -1, 0))
+                else:
+                    nodes.append((time, None, positions[key[1]], key[2]))
+                positions[index] = len(nodes) - 1
+            live.append((entry, positions[entry[1][1]]))
+        self.created = live
+        return nodes
+
+    def compact(self, ranks, window_end):
+        """
+        この時間窓で作成したキーの親の処理順を、全パーティションで共通の順位に置き換えます。
+        同じワーカーのキーどうしの順序は変わらず、他の時間窓のキーとは親の時刻で順序が決まるため、
+        キューのヒープの順序も保たれます。
+
+        Args:
+            ranks (list): ancestors が返した各イベントの全パーティションでの順位。
+            window_end (float): 終了した時間窓の終端（次の時間窓の開始時刻）。
+        """
+        for entry, position in self.created:
+            key = entry[1]
+            entry[1] = (key[0], ranks[position], key[2])
+        self.created = []
+        self.processed = []
+        self.window_start = window_end
+
+    def push_many(self, events):
+        return [self.push(event) for event in events]
+
+    def cancel(self, handle):
+        return handle is not None and self.inner.cancel(handle)
+
+    def pop(self):
+        return self.inner.pop()
+
+    def peek_time(self):
+        return self.inner.peek_time()
+
+    def is_empty(self):
+        return self.inner.is_empty()
+
+    def __len__(self):
+        return len(self.inner)
+
+def _worker_main(emulator, index, owner, shared, owned, initial_entries, conn):
+    """
+    ワーカープロセスの本体。コーディネータから指示された時間窓ごとに担当ノードのイベントを処理します。
+    fork の前に取り出したイベントの組（ハンドル）をそのまま内部のキューに移すため、
+    ノードなどが保持しているタイマーのハンドルはワーカーでも有効です。
+    """
+    try:
+        shared_ids = {id(obj): position for position, obj in enumerate(shared)}
+        queue = _PartitionQueue(type(emulator.event_queue)(), owner, index, emulator.current_time)
+        emulator.event_queue = queue
+        for entry in initial_entries:
+            queue.inner.push_entry(entry)
+        conn.send(("ready", queue.peek_time()))
+
+        while True:
+            message = conn.recv()
+            if message[0] == "run":
+                _, window_end, inclusive, incoming = message
+                for payload in incoming:
+                    for entry in _loads(shared, payload)[0]:
+                        queue.inner.push_entry(entry)
+                # 時間窓の終端より前のイベントを処理（最後の窓のみ終端時刻を含む）
+                while len(queue):
+                    time = queue.peek_time()
+                    if time > window_end or (time == window_end and not inclusive):
+                        break
+                    time, key, event = queue.inner.pop_entry()
+                    emulator.current_time = time
+                    queue.begin(time, key)
+                    emulator.process_event(event)
+                # 作成したキーを全パーティションで共通の順位に置き換えてから送信箱を送る
+                conn.send(("ancestors", queue.ancestors()))
+                queue.compact(conn.recv()[1], window_end)
+                outbox = {
+                    destination: (min(entry[0] for entry in entries), _dumps(shared_ids, entries)[0])
+                    for destination, entries in queue.outbox.items()
+                }
+                queue.outbox = {}
+                conn.send(("done", outbox, queue.peek_time(), emulator.current_time))
+            elif message[0] == "finish":
+                # 担当オブジェクトの全状態と未処理のイベントの組を 1 つの pickle にまとめて送る
+                # （状態が保持しているタイマーのハンドルと未処理のイベントの組は同じオブジェクトとして復元される）
+                states = [(position, vars(shared[position])) for position in owned]
+                buffer = io.BytesIO()
+                pickler = _SharedPickler(buffer, shared_ids)
+                pickler.dump(states)
+                pickler.dump(queue.inner.drain_entries())
+                pickler.dump(list(pickler.streams.values()))
+                conn.send(("result", buffer.getvalue()))
+                return
+    except Exception:
+        conn.send(("error", traceback.format_exc()))
+    finally:
+        conn.close()
+
+class ParallelSimulation:
+    """
+    保守的な並列離散イベントシミュレーション（窓同期方式）。
+
+    ノードを複数のワーカープロセスに分割し、各プロセスが独自のイベントキューで担当ノードの
+    イベントを処理します。分割をまたぐリンクの最小遅延をルックアヘッド L とし、全体で最も早い
+    イベント時刻 T から [T, T + L) の時間窓を各プロセスが並列に処理します。窓内で発生した
+    他パーティション宛てのイベントは必ず T + L 以降の時刻を持つため、窓の終了時にパイプ経由で
+    交換すれば因果関係が崩れることはありません。同一時刻のイベントは、他のパーティションから届いたものも含めて
+    逐次実行と同じ順（逐次実行でキューに追加される順）に処理されます（_CausalKeys を参照）。
+
+    ワーカーは os.fork によって作成されるため、トポロジやコントローラは各プロセスに複製されます。
+    実行後、各ワーカーが担当したノード（フローテーブル、カウンタ、キャッシュ、グループを含む全状態）、
+    送信キュー、TIMER イベントを所有するオブジェクト（トラフィック生成器など）の状態と、未処理のイベントを
+    元のエミュレータに書き戻すため、続けて逐次実行しても逐次実行のみの場合と同じ状態から再開できます。
+    コントローラ自身の属性はパーティションごとに独立して更新され、書き戻されません
+    （コントローラが設定したフローエントリはスイッチの状態として書き戻されます）。
+    """
+
+    def __init__(self, emulator, workers=None, partition=None):
+        """
+        並列シミュレーションを初期化します。
+
+        Args:
+            emulator (Emulator): 対象のエミュレータ。
+            workers (int): ワーカープロセス数。省略時は CPU 数（ノード数が上限）。
+            partition (dict): ノード名 -> パーティション番号の辞書（オプション）。
+                省略した場合は partition_nodes で自動的に分割します。
+        """
+        self.emulator = emulator
+        if partition is None:
+            workers = workers or os.cpu_count() or 1
+            workers = max(1, min(workers, len(emulator.nodes)))
+            partition = partition_nodes(emulator, workers)
+        self.partition = partition
+        self.workers = max(partition.values()) + 1 if partition else 1
+        self.lookahead = self._compute_lookahead()
+
+    def _compute_lookahead(self):
+        """
+        分割をまたぐリンクの最小遅延（秒）を求めます。該当するリンクが無い場合は無限大です。
+        """
+        lookahead = float("inf")
+        for link in collect_links(self.emulator):
+            if self.partition[link.node1.name] != self.partition[link.node2.name]:
+                lookahead = min(lookahead, link.delay / 1000.0)
+        if lookahead <= 0:
+            raise ValueError("分割をまたぐリンクの遅延が 0 のため、保守的な並列実行ができません。")
+        return lookahead
+
+    def run(self, duration):
+        """
+        指定された期間のシミュレーションを並列に実行します。
+
+        Args:
+            duration (float): シミュレーション期間（秒）。
+        """
+        emulator = self.emulator
+        end_time = emulator.current_time + duration
+        if self.workers == 1 or "fork" not in multiprocessing.get_all_start_methods():
+            emulator.run_simulation(duration)
+            return
+
+        # 初期イベントの組を担当パーティションに振り分ける（ノードを持たないイベントは 0 番が担当）。
+        # 組は無効化せずに移すため、コンポーネントが保持しているハンドルはワーカーでも有効なままになる
+        initial = [[] for _ in range(self.workers)]
+        timer_owners = {}
+        for order, entry in enumerate(emulator.event_queue.drain_entries()):
+            event = entry[2]
+            index = self.partition[event.node.name] if event.node is not None else 0
+            # fork 前のイベントは元のキューの順に、ワーカーで作成されるどのイベントよりも先に取り出されるようにする
+            entry[1] = (float("-inf"), order, 0)
+            initial[index].append(entry)
+            owner = _callback_owner(event.callback)
+            if owner is not None and owner is not emulator and getattr(owner, "name", None) not in emulator.nodes:
+                timer_owners.setdefault(id(owner), (owner, index))
+        shared = _shared_objects(emulator, [owner for owner, _ in timer_owners.values()])
+        positions = {id(obj): position for position, obj in enumerate(shared)}
+        # ワーカーごとに状態を書き戻すオブジェクト（担当ノード、その送信キュー、TIMER の所有者）
+        owned = [[] for _ in range(self.workers)]
+        for name, node in emulator.nodes.items():
+            owned[self.partition[name]].append(positions[id(node)])
+        for link in collect_links(emulator):
+            for egress in getattr(link, "egress_queues", {}).values():
+                if egress.src_node.name in self.partition:
+                    owned[self.partition[egress.src_node.name]].append(positions[id(egress)])
+        for owner, index in timer_owners.values():
+            owned[index].append(positions[id(owner)])
+
+        context = multiprocessing.get_context("fork")
+        connections = []
+        processes = []
+        for index in range(self.workers):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_worker_main,
+                args=(emulator, index, self.partition, shared, owned[index], initial[index], child_conn),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            connections.append(parent_conn)
+            processes.append(process)
+
+        try:
+            next_times = [self._receive(conn)[1] for conn in connections]
+            pending = [[] for _ in range(self.workers)]  # 宛先ごとの (最も早い時刻, pickle した組のリスト)
+            current_time = emulator.current_time
+            while True:
+                candidates = [t for t in next_times if t is not None]
+                candidates += [time for inbox in pending for time, _ in inbox]
+                if not candidates or min(candidates) > end_time:
+                    break
+                window_end = min(min(candidates) + self.lookahead, end_time)
+                inclusive = window_end == end_time
+                for index, conn in enumerate(connections):
+                    conn.send(("run", window_end, inclusive, [payload for _, payload in pending[index]]))
+                pending = [[] for _ in range(self.workers)]
+                self._rank_ancestors(connections)
+                for index, conn in enumerate(connections):
+                    _, outbox, next_time, worker_time = self._receive(conn)
+                    next_times[index] = next_time
+                    current_time = max(current_time, worker_time)
+                    for destination, item in outbox.items():
+                        pending[destination].append(item)
+
+            for conn in connections:
+                conn.send(("finish",))
+            results = [self._receive(conn)[1] for conn in connections]
+        finally:
+            for process in processes:
+                process.join()
+
+        self._merge_results(shared, results, pending, current_time)
+
+    def _rank_ancestors(self, connections):
+        """
+        各ワーカーの ancestors をまとめ、逐次実行での処理順に並べた順位を各ワーカーに返します。
+        親の順位が決まった時点で子を候補に加えるため、親をたどる比較を繰り返さずに並べられます。
+        """
+        nodes = [self._receive(conn)[1] for conn in connections]
+        heap = []
+        children = []
+        for worker, worker_nodes in enumerate(nodes):
+            worker_children = [[] for _ in worker_nodes]
+            for position, (time, key, parent, _) in enumerate(worker_nodes):
+                if parent < 0:
+                    heap.append((time,) + key + (worker, position))
+                else:
+                    worker_children[parent].append(position)
+            children.append(worker_children)
+        heapq.heapify(heap)
+        ranks = [[None] * len(worker_nodes) for worker_nodes in nodes]
+        rank = 0
+        while heap:
+            time, _, _, _, worker, position = heapq.heappop(heap)
+            ranks[worker][position] = rank
+            for child in children[worker][position]:
+                # 確定したキーの親の時刻は時間窓の開始より前のため、同じ時刻の候補とは 2 番目の要素で順序が決まる
+                heapq.heappush(heap, (nodes[worker][child][0], time, rank, nodes[worker][child][3], worker, child))
+            rank += 1
+        for conn, worker_ranks in zip(connections, ranks):
+            conn.send(("ranks", worker_ranks))
+
+    def _receive(self, conn):
+        message = conn.recv()
+        if message[0] == "error":
+            raise RuntimeError(f"並列シミュレーションのワーカーでエラーが発生しました:\n{message[1]}")
+        return message
+
+    def _merge_results(self, shared, results, pending, current_time):
+        """
+        ワーカーが担当したオブジェクトの状態と未処理のイベントを元のエミュレータに書き戻します。
+        未処理のイベントは (時刻, 順序キー) の順に並べ、元のキューの通し番号を振り直して追加します。
+        """
+        emulator = self.emulator
+        entries = []
+        for inbox in pending:
+            for _, payload in inbox:
+                entries.extend(_loads(shared, payload)[0])
+        merged_nodes = []
+        for payload in results:
+            states, remaining, streams = _loads(shared, payload, 3)
+            entries.extend(remaining)
+            for position, state in states:
+                obj = shared[position]
+                vars(obj).update(state)
+                if getattr(obj, "name", None) in emulator.nodes and emulator.nodes[obj.name] is obj:
+                    merged_nodes.append(obj)
+            # ワーカーで進んだ乱数ストリームを引き継ぎ、以降の逐次実行でも同じ系列を使う
+            for stream in streams:
+                emulator.random.streams[stream.name] = stream
+        # ワーカーで登録されたアドレス ID はプロセスごとに異なるため、元のエミュレータのレジストリで登録し直す
+        for node in merged_nodes:
+            if hasattr(node, "set_emulator"):
+                node.set_emulator(emulator)
+        entries.sort(key=lambda entry: (entry[0], entry[1]))
+        queue = emulator.event_queue
+        for entry in entries:
+            queue.push_entry(entry, renumber=True)
+        emulator.current_time = current_time
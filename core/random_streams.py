@@ -0,0 +1,116 @@
+import hashlib
+import math
+import random
+import secrets
+
+try:
+    import numpy as np
+except ImportError:  # NumPy が無い環境では標準ライブラリの random.Random を使用する
+    np = None
+
+DEFAULT_BLOCK_SIZE = 4096
+
+def _stream_key(name):
+    # 名前から安定した 64 ビットの整数を求める（hash() はプロセスごとに変わるため使用しない）
+    return int.from_bytes(hashlib.sha256(name.encode("utf-8")).digest()[:8], "little")
+
+class RandomStream:
+    """
+    名前の付いた一様乱数のストリーム。
+
+    NumPy の Generator を使用する場合は乱数をブロック単位でまとめて生成し、バッファから 1 つずつ返すため、
+    パケットごとの乱数生成を Python レベルの呼び出し 1 回とリストの参照だけで済ませます。
+    random.Random を使用する場合（NumPy が無い環境）はまとめて生成しても速くならないため、
+    必要になった時点で 1 つずつ生成します。
+    """
+
+    def __init__(self, name, generator, block_size=DEFAULT_BLOCK_SIZE):
+        """
+        乱数ストリームを初期化します。
+
+        Args:
+            name (str): ストリームの名前。
+            generator: numpy.random.Generator または random.Random。
+            block_size (int): NumPy の Generator で一度に生成する乱数の数。
+        """
+        self.name = name
+        self.generator = generator
+        self.block_size = block_size
+        # ブロック単位で生成するのは NumPy の Generator の場合のみ
+        self.vectorized = np is not None and isinstance(generator, np.random.Generator)
+        self._buffer = []
+        self._index = 0
+
+    def _refill(self):
+        self._buffer = self.generator.random(self.block_size).tolist()
+        self._index = 0
+
+    def random(self):
+        """
+        [0, 1) の一様乱数を返します。
+
+        Returns:
+            float: 一様乱数。
+        """
+        if not self.vectorized:
+            return self.generator.random()
+        index = self._index
+        if index >= len(self._buffer):
+            self._refill()
+            index = 0
+        self._index = index + 1
+        return self._buffer[index]
+
+    def uniform(self, low, high):
+        # [low, high) の一様乱数を返す
+        return low + (high - low) * self.random()
+
+    def expovariate(self, rate):
+        # 平均 1 / rate の指数分布に従う乱数を返す（逆関数法）
+        return -math.log(1.0 - self.random()) / rate
+
+class RandomService:
+    """
+    エミュレータが所有する乱数サービス。
+    リンクやトラフィック源などのコンポーネントごとに、名前から決まる独立した乱数ストリームを提供します。
+
+    NumPy が利用できる場合は、基準のシードとストリーム名から作った SeedSequence（spawn_key に名前の
+    ハッシュを使用）で PCG64 の Generator を作成します。ストリームの系列は名前だけで決まるため、
+    トポロジにノードやリンクを追加しても既存のコンポーネントの乱数系列は変わりません。
+    NumPy が無い場合は、シードと名前から作った整数で random.Random を初期化します。
+    """
+
+    def __init__(self, seed=None, block_size=DEFAULT_BLOCK_SIZE):
+        """
+        乱数サービスを初期化します。
+
+        Args:
+            seed (int): 基準のシード。省略した場合は OS の乱数から生成し、seed 属性に記録します。
+            block_size (int): 各ストリームが一度に生成する乱数の数（NumPy を使用する場合のみ）。
+        """
+        self.seed = seed if seed is not None else secrets.randbits(64)
+        self.block_size = block_size
+        self.streams = {}  # ストリーム名 -> RandomStream
+
+    def stream(self, name):
+        """
+        名前に対応する乱数ストリームを返します（初回呼び出し時に作成します）。
+
+        Args:
+            name (str): ストリームの名前（例: "link:Host1->Switch1"）。
+
+        Returns:
+            RandomStream: 乱数ストリーム。
+        """
+        stream = self.streams.get(name)
+        if stream is None:
+            stream = RandomStream(name, self._make_generator(name), self.block_size)
+            self.streams[name] = stream
+        return stream
+
+    def _make_generator(self, name):
+        key = _stream_key(name)
+        if np is not None:
+            sequence = np.random.SeedSequence(self.seed, spawn_key=(key,))
+            return np.random.Generator(np.random.PCG64(sequence))
+        return random.Random(_stream_key(f"{self.seed}:{name}") ^ key)
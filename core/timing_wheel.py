@@ -0,0 +1,185 @@
+import math
+
+# ティックへの変換で浮動小数点の誤差を吸収するための許容量
+_TICK_EPSILON = 1e-9
+
+class _Timer:
+    # タイミングホイールに登録されたタイマー（cancel に渡すハンドル）
+    __slots__ = ("expiry_tick", "item", "level", "slot")
+
+    def __init__(self, expiry_tick, item):
+        self.expiry_tick = expiry_tick
+        self.item = item
+        self.level = None
+        self.slot = None  # 登録先のスロット（取り消し済み・期限切れの場合は None）
+
+class TimingWheel:
+    """
+    階層型タイミングホイール（Varghese & Lauck）。
+
+    時刻を tick 秒単位のティックに丸め、wheel_size 個のスロットを持つホイールを levels 段重ねて管理します。
+    段 l のスロットは wheel_size^l ティックの幅を持ち、下の段が 1 周するたびに上の段の 1 スロット分の
+    タイマーを下の段へ振り分け直します（カスケード）。登録と取り消しはタイマー数に依存せず O(1) で、
+    イベントキューのように 1 タイマーごとにヒープの要素を持つ必要がありません。
+    """
+
+    def __init__(self, tick=0.01, wheel_size=64, levels=4):
+        """
+        タイミングホイールを初期化します。
+
+        Args:
+            tick (float): 1 ティックの長さ（秒）。期限はこの単位に切り上げられます。
+            wheel_size (int): 各段のスロット数（2 のべき乗）。
+            levels (int): 段数。tick * wheel_size^levels 秒より先の期限は最上段に置き、カスケードの際に振り分け直します。
+
+        Raises:
+            ValueError: wheel_size が 2 のべき乗でない場合、または tick や levels が正でない場合に発生。
+        """
+        if wheel_size < 2 or wheel_size & (wheel_size - 1):
+            raise ValueError(f"wheel_size は 2 以上の 2 のべき乗である必要があります: {wheel_size}")
+        if tick <= 0 or levels < 1:
+            raise ValueError("tick と levels は正の値である必要があります。")
+        self.tick = tick
+        self.wheel_size = wheel_size
+        self.levels = levels
+        self.bits = wheel_size.bit_length() - 1
+        self.mask = wheel_size - 1
+        # 各段のスロット（挿入順を保つため、タイマーをキーとする辞書）
+        self.slots = [[{} for _ in range(wheel_size)] for _ in range(levels)]
+        self.counts = [0] * levels  # 段ごとのタイマー数
+        self.current_tick = 0  # 処理済みの最後のティック
+        self.count = 0
+
+    def _place(self, timer):
+        # 期限までのティック数から段とスロットを決めてタイマーを登録する
+        delta = timer.expiry_tick - self.current_tick
+        level = 0
+        while level < self.levels - 1 and delta >= 1 << (self.bits * (level + 1)):
+            level += 1
+        shift = self.bits * level
+        if delta >= 1 << (shift + self.bits):
+            # ホイール全体の範囲を超える期限は最上段の最も遠いスロットに置く
+            index = ((self.current_tick >> shift) - 1) & self.mask
+        else:
+            index = (timer.expiry_tick >> shift) & self.mask
+        slot = self.slots[level][index]
+        slot[timer] = None
+        timer.level = level
+        timer.slot = slot
+        self.counts[level] += 1
+
+    def add(self, expiry_time, item):
+        """
+        タイマーを登録します。
+
+        Args:
+            expiry_time (float): 期限（シミュレーション時刻の秒）。
+            item: 期限切れの際に advance が返す値。
+
+        Returns:
+            _Timer: cancel に渡すことのできるハンドル。
+        """
+        expiry_tick = max(math.ceil(expiry_time / self.tick - _TICK_EPSILON), self.current_tick + 1)
+        timer = _Timer(expiry_tick, item)
+        self._place(timer)
+        self.count += 1
+        return timer
+
+    def cancel(self, timer):
+        """
+        タイマーを取り消します。
+
+        Args:
+            timer (_Timer): add が返したハンドル。
+
+        Returns:
+            bool: 取り消した場合は True、既に期限切れまたは取り消し済みの場合は False。
+        """
+        if timer is None or timer.slot is None:
+            return False
+        del timer.slot[timer]
+        timer.slot = None
+        self.counts[timer.level] -= 1
+        self.count -= 1
+        return True
+
+    def _take(self, slot, level):
+        # スロットのタイマーをすべて取り出す
+        timers = list(slot)
+        slot.clear()
+        self.counts[level] -= len(timers)
+        return timers
+
+    def advance(self, now):
+        """
+        ホイールを現在時刻まで進め、期限切れになったタイマーの値を返します。
+        下の段が空の区間は次のカスケードの位置まで一度に進めます。
+
+        Args:
+            now (float): 現在のシミュレーション時刻（秒）。
+
+        Returns:
+            list: 期限切れになったタイマーの値（期限の早い順）。
+        """
+        target = math.floor(now / self.tick + _TICK_EPSILON)
+        expired = []
+        while self.current_tick < target:
+            level = 0
+            while level < self.levels and not self.counts[level]:
+                level += 1
+            if level == self.levels:
+                self.current_tick = target
+                break
+            if level:
+                # 空の段を飛ばし、次にカスケードが起きるティックの直前まで進める
+                shift = self.bits * level
+                boundary = ((self.current_tick >> shift) + 1) << shift
+                if boundary > target:
+                    self.current_tick = target
+                    break
+                self.current_tick = boundary - 1
+            tick = self.current_tick = self.current_tick + 1
+            # 上の段が 1 スロット分進む位置では、そのスロットのタイマーを下の段へ振り分け直す
+            for upper in range(1, self.levels):
+                shift = self.bits * upper
+                if tick & ((1 << shift) - 1):
+                    break
+                for timer in self._take(self.slots[upper][(tick >> shift) & self.mask], upper):
+                    self._place(timer)
+            for timer in self._take(self.slots[0][tick & self.mask], 0):
+                if timer.expiry_tick <= tick:
+                    timer.slot = None
+                    self.count -= 1
+                    expired.append(timer.item)
+                else:
+                    self._place(timer)
+        return expired
+
+    def next_expiry_time(self):
+        """
+        次に advance を呼び出すべき時刻を返します。
+        最下段のタイマーは期限そのもの、上の段のタイマーはカスケードする時刻を返すため、
+        実際の期限より早い時刻になることがあります。
+
+        Returns:
+            float: 時刻（秒）。タイマーが無い場合は None。
+        """
+        if not self.count:
+            return None
+        earliest = None
+        for level in range(self.levels):
+            if not self.counts[level]:
+                continue
+            shift = self.bits * level
+            base = self.current_tick >> shift
+            slots = self.slots[level]
+            for offset in range(1, self.wheel_size + 1):
+                if slots[(base + offset) & self.mask]:
+                    tick = (base + offset) << shift
+                    if earliest is None or tick < earliest:
+                        earliest = tick
+                    break
+        return earliest * self.tick
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,197 @@
+import itertools
+import json
+import struct
+
+# トレースのレベル（数値が大きいほど詳細）
+LEVEL_OFF = 0  # 何も記録しない（既定）
+LEVEL_DROP = 1  # パケットの破棄
+LEVEL_CONTROL = 2  # テーブルミス、Packet-In、Flow-Mod などの制御イベント
+LEVEL_PACKET = 3  # パケットごとの送受信
+LEVEL_NAMES = {"off": LEVEL_OFF, "drop": LEVEL_DROP, "control": LEVEL_CONTROL, "packet": LEVEL_PACKET}
+
+# イベントの種類
+TRACE_SEND = 1  # ノードがパケットを送信した
+TRACE_RECEIVE = 2  # ノードがパケットを受信した
+TRACE_LINK_LOSS = 3  # リンクのパケット損失
+TRACE_QUEUE_DROP = 4  # リンクの送信キューが満杯
+TRACE_LINK_DOWN = 5  # ダウンしたリンクへの送信
+TRACE_BUFFER_DROP = 6  # スイッチの受信バッファが満杯
+TRACE_INVALID_PORT = 7  # 存在しないポートへの送信
+TRACE_NO_CONTROLLER = 8  # コントローラが設定されていないスイッチのテーブルミス
+TRACE_CONTROLLER_REJECT = 9  # コントローラがフローを設定しなかった
+TRACE_TABLE_MISS = 10  # フローテーブルのテーブルミス
+TRACE_PACKET_IN = 11  # コントローラへの Packet-In
+TRACE_FLOW_MOD = 12  # フローエントリの設定
+EVENT_NAMES = {
+    TRACE_SEND: "send",
+    TRACE_RECEIVE: "receive",
+    TRACE_LINK_LOSS: "link_loss",
+    TRACE_QUEUE_DROP: "queue_drop",
+    TRACE_LINK_DOWN: "link_down",
+    TRACE_BUFFER_DROP: "buffer_drop",
+    TRACE_INVALID_PORT: "invalid_port",
+    TRACE_NO_CONTROLLER: "no_controller",
+    TRACE_CONTROLLER_REJECT: "controller_reject",
+    TRACE_TABLE_MISS: "table_miss",
+    TRACE_PACKET_IN: "packet_in",
+    TRACE_FLOW_MOD: "flow_mod",
+}
+
+# 1 レコードの形式: 時刻, ノード番号, イベントの種類, ポート番号（無い場合は -1）, パケット ID（無い場合は 0）, バイト数
+RECORD = struct.Struct("<dIHiQI")
+NO_PORT = -1
+
+class Tracer:
+    """
+    構造化されたトレースを固定長のバイナリレコードとしてリングバッファに記録します。
+
+    レベルの判定は configure の時点で属性（drops、control、packets）に変換されるため、
+    呼び出し側は `if tracer.packets:` のように属性を 1 回参照するだけで無効なトレースポイントを読み飛ばせます。
+    記録時も文字列を組み立てず、ノード名は番号に変換して事前に確保したバッファに書き込みます。
+    バッファが一杯になると古いレコードから上書きし、テキストや JSONL への変換は記録後に行います。
+    並列実行のワーカーはプロセスごとのトレーサに記録するため、親プロセスのバッファには含まれません。
+    """
+
+    def __init__(self, level=LEVEL_OFF, capacity=65536):
+        """
+        トレーサを初期化します。
+
+        Args:
+            level (int or str): トレースのレベル（LEVEL_* または "off"、"drop"、"control"、"packet"）。
+            capacity (int): リングバッファに保持するレコード数。
+        """
+        self.node_ids = {}  # ノード名 -> ノード番号
+        self.node_names = []  # ノード番号 -> ノード名
+        self.packet_ids = itertools.count(1)  # パケット ID の発行元（0 はパケット無しを表す）
+        self.configure(level, capacity)
+
+    def configure(self, level, capacity=None):
+        """
+        トレースのレベルを設定します。容量を指定した場合はリングバッファを確保し直します（記録済みのレコードは破棄）。
+
+        Args:
+            level (int or str): トレースのレベル。
+            capacity (int): リングバッファに保持するレコード数（オプション）。
+
+        Raises:
+            ValueError: 未対応のレベルや 1 未満の容量を指定した場合に発生。
+        """
+        if isinstance(level, str):
+            if level not in LEVEL_NAMES:
+                raise ValueError(f"未対応のトレースのレベルです: {level}")
+            level = LEVEL_NAMES[level]
+        if capacity is not None:
+            if capacity < 1:
+                raise ValueError(f"リングバッファの容量は 1 以上である必要があります: {capacity}")
+            self.capacity = capacity
+            self.buffer = bytearray(capacity * RECORD.size)
+            self.written = 0  # これまでに書き込んだレコード数（上書きしたものを含む）
+        self.level = level
+        # トレースポイントで参照する判定結果（レベルの比較はここで一度だけ行う）
+        self.drops = level >= LEVEL_DROP
+        self.control = level >= LEVEL_CONTROL
+        self.packets = level >= LEVEL_PACKET
+
+    def clear(self):
+        # 記録済みのレコードを破棄する
+        self.written = 0
+
+    def node_id(self, name):
+        # ノード名をノード番号に変換する（初めてのノードには番号を割り当てる）
+        node_id = self.node_ids.get(name)
+        if node_id is None:
+            node_id = self.node_ids[name] = len(self.node_names)
+            self.node_names.append(name)
+        return node_id
+
+    def record(self, event_type, node, packet=None, port=NO_PORT):
+        """
+        レコードを 1 件リングバッファに書き込みます。呼び出し側でレベルを確認してから呼び出してください。
+
+        Args:
+            event_type (int): イベントの種類（TRACE_*）。
+            node (Node): イベントが発生したノード（仮想時刻はノードのエミュレータから取得）。
+            packet (Packet): 対象のパケット（オプション）。初めて記録するパケットには ID を割り当てます。
+            port (int): ポート番号（オプション）。
+        """
+        emulator = node.emulator
+        time = emulator.current_time if emulator is not None else 0.0
+        packet_id = 0
+        size = 0
+        if packet is not None:
+            packet_id = packet.packet_id
+            if packet_id is None:
+                packet_id = packet.packet_id = next(self.packet_ids)
+            size = packet.size_bytes
+        offset = self.written % self.capacity * RECORD.size
+        RECORD.pack_into(self.buffer, offset, time, self.node_id(node.name), event_type, port, packet_id, size)
+        self.written += 1
+
+    @property
+    def overwritten(self):
+        # 容量を超えて上書きされたレコード数
+        return max(0, self.written - self.capacity)
+
+    def records(self):
+        """
+        リングバッファに残っているレコードを古い順に返します。
+
+        Returns:
+            list: (時刻, ノード名, イベント名, ポート番号, パケット ID, バイト数) のタプルのリスト。
+                ポート番号が無い場合は None、パケットが無い場合はパケット ID が None。
+        """
+        count = min(self.written, self.capacity)
+        start = self.written - count
+        records = []
+        for index in range(start, start + count):
+            time, node_id, event_type, port, packet_id, size = RECORD.unpack_from(
+                self.buffer, index % self.capacity * RECORD.size
+            )
+            records.append((
+                time, self.node_names[node_id], EVENT_NAMES.get(event_type, str(event_type)),
+                None if port == NO_PORT else port, packet_id or None, size,
+            ))
+        return records
+
+    def format_text(self):
+        """
+        レコードを 1 行ずつのテキストに変換します。
+
+        Returns:
+            list: "時刻 ノード名 イベント名 port=... packet=... bytes=..." の形式の文字列のリスト。
+        """
+        lines = []
+        for time, node, event, port, packet_id, size in self.records():
+            line = f"{time:.9f} {node} {event}"
+            if port is not None:
+                line += f" port={port}"
+            if packet_id is not None:
+                line += f" packet={packet_id} bytes={size}"
+            lines.append(line)
+        return lines
+
+    def write_text(self, file_path):
+        """
+        レコードをテキストファイルに書き出します。
+
+        Args:
+            file_path (str): 出力するファイルのパス。
+        """
+        with open(file_path, "w", encoding="utf-8") as file:
+            for line in self.format_text():
+                file.write(line + "\n")
+
+    def write_jsonl(self, file_path):
+        """
+        レコードを JSON Lines 形式で書き出します（1 行に 1 レコードの辞書）。
+
+        Args:
+            file_path (str): 出力するファイルのパス。
+        """
+        with open(file_path, "w", encoding="utf-8") as file:
+            for time, node, event, port, packet_id, size in self.records():
+                record = {"time": time, "node": node, "event": event, "port": port, "packet_id": packet_id, "bytes": size}
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+# プロセス全体で共有するトレーサ（既定では無効）
+tracer = Tracer()
@@ -0,0 +1,300 @@
+import socket
+import struct
+from array import array
+from core.packet import Packet
+
+# Ethernet / IPv4 / TCP / UDP ヘッダのレイアウト（ネットワークバイトオーダー）
+ETHERNET_HEADER = struct.Struct("!6s6sH")  # 宛先 MAC, 送信元 MAC, EtherType
+IPV4_HEADER = struct.Struct("!BBHHHBBH4s4s")  # バージョン/IHL, TOS, 全長, ID, フラグ/オフセット, TTL, プロトコル, チェックサム, 送信元, 宛先
+TCP_HEADER = struct.Struct("!HHIIBBHHH")  # 送信元ポート, 宛先ポート, シーケンス番号, ACK 番号, オフセット, フラグ, ウィンドウ, チェックサム, 緊急ポインタ
+UDP_HEADER = struct.Struct("!HHHH")  # 送信元ポート, 宛先ポート, 長さ, チェックサム
+
+ETHERTYPE_IPV4 = 0x0800
+IP_OFFSET = ETHERNET_HEADER.size
+L4_OFFSET = IP_OFFSET + IPV4_HEADER.size
+
+# プロトコル名 <-> IP プロトコル番号
+PROTOCOL_NUMBERS = {"ICMP": 1, "TCP": 6, "UDP": 17}
+PROTOCOL_NAMES = {number: name for name, number in PROTOCOL_NUMBERS.items()}
+UNKNOWN_PROTOCOL = 253  # 対応表に無いプロトコル（RFC 3692 の実験用番号）
+
+_ZERO_MAC = bytes(6)
+_ZERO_IP = bytes(4)
+
+def _mac_bytes(mac_address):
+    # "00:11:22:33:44:55" 形式の MAC アドレスを 6 バイトに変換する（解釈できない場合は 0）
+    if not mac_address:
+        return _ZERO_MAC
+    try:
+        value = bytes.fromhex(mac_address.replace(":", "").replace("-", ""))
+    except (ValueError, AttributeError):
+        return _ZERO_MAC
+    return value if len(value) == 6 else _ZERO_MAC
+
+def _ip_bytes(ip_address):
+    # IPv4 アドレスを 4 バイトに変換する（解釈できない場合は 0.0.0.0）
+    try:
+        return socket.inet_aton(ip_address)
+    except (OSError, TypeError):
+        return _ZERO_IP
+
+def payload_bytes(payload):
+    # ペイロードをフレームに書き込むバイト列に変換する（文字列は UTF-8）
+    if payload is None:
+        return b""
+    if isinstance(payload, str):
+        return payload.encode("utf-8")
+    return bytes(payload)
+
+def lookup_protocol_number(protocol):
+    # プロトコル名を IP プロトコル番号に変換する（大文字・小文字は区別しない）
+    if not protocol:
+        return UNKNOWN_PROTOCOL
+    return PROTOCOL_NUMBERS.get(str(protocol).upper(), UNKNOWN_PROTOCOL)
+
+def _l4_header(protocol_number):
+    if protocol_number == 6:
+        return TCP_HEADER
+    if protocol_number == 17:
+        return UDP_HEADER
+    return None
+
+def header_length(packet):
+    """
+    パケットをエンコードしたフレームのヘッダ部分（Ethernet から TCP/UDP まで）のバイト数を返します。
+
+    Args:
+        packet (Packet): 対象のパケット。
+
+    Returns:
+        int: ヘッダのバイト数。
+    """
+    header = _l4_header(lookup_protocol_number(packet.protocol))
+    return L4_OFFSET + (header.size if header else 0)
+
+def encoded_length(packet):
+    """
+    パケットをエンコードしたフレームのバイト数を返します。
+
+    Args:
+        packet (Packet): 対象のパケット。
+
+    Returns:
+        int: Ethernet ヘッダからペイロードまでのバイト数。
+    """
+    return header_length(packet) + len(payload_bytes(packet.payload))
+
+def encode_into(packet, buffer, offset=0, payload=None):
+    """
+    パケットを Ethernet/IPv4/TCP・UDP のフレームとして buffer の offset の位置に書き込みます。
+
+    IPv4 の全長フィールドには、ペイロードの実データではなく size_bytes をペイロード長として記録します。
+    そのため、ペイロードを省略したパケットもサイズを保ったまま往復でき、書き込まれるペイロードは
+    全長に対して切り詰められたものとして扱われます。チェックサムは計算せず 0 とします。
+
+    Args:
+        packet (Packet): エンコードするパケット。
+        buffer (bytearray): 書き込み先のバッファ。
+        offset (int): 書き込みを開始する位置。
+        payload (bytes): 書き込むペイロード（省略時は packet.payload をエンコードしたもの）。
+
+    Returns:
+        int: 書き込んだバイト数。
+    """
+    if payload is None:
+        payload = payload_bytes(packet.payload)
+    protocol_number = lookup_protocol_number(packet.protocol)
+    header = _l4_header(protocol_number)
+    l4_size = header.size if header else 0
+    total_length = min(0xFFFF, IPV4_HEADER.size + l4_size + max(packet.size_bytes, len(payload)))
+
+    ETHERNET_HEADER.pack_into(buffer, offset, _mac_bytes(packet.dst_mac), _mac_bytes(packet.src_mac), ETHERTYPE_IPV4)
+    IPV4_HEADER.pack_into(
+        buffer, offset + IP_OFFSET, 0x45, 0, total_length, 0, 0, packet.ttl & 0xFF, protocol_number, 0,
+        _ip_bytes(packet.src), _ip_bytes(packet.dst),
+    )
+    position = offset + L4_OFFSET
+    if header is TCP_HEADER:
+        TCP_HEADER.pack_into(buffer, position, packet.src_port, packet.dst_port, 0, 0, 0x50, 0, 0xFFFF, 0, 0)
+    elif header is UDP_HEADER:
+        UDP_HEADER.pack_into(buffer, position, packet.src_port, packet.dst_port, min(0xFFFF, total_length - IPV4_HEADER.size), 0)
+    position += l4_size
+    buffer[position:position + len(payload)] = payload
+    return position + len(payload) - offset
+
+def encode(packet):
+    """
+    パケットを 1 つのフレームにエンコードします。
+
+    Args:
+        packet (Packet): エンコードするパケット。
+
+    Returns:
+        bytearray: エンコードしたフレーム。
+    """
+    payload = payload_bytes(packet.payload)
+    buffer = bytearray(header_length(packet) + len(payload))
+    encode_into(packet, buffer, 0, payload)
+    return buffer
+
+def encode_batch(packets):
+    """
+    複数のパケットを 1 つの連続したバッファにまとめてエンコードします。
+    バッファは必要なサイズを先に求めて一度だけ確保します。
+
+    Args:
+        packets (list): エンコードするパケットのリスト。
+
+    Returns:
+        tuple: (バッファ, 各フレームの境界位置)。境界位置は長さ len(packets) + 1 の array で、
+            i 番目のフレームは buffer[offsets[i]:offsets[i + 1]] です。
+    """
+    payloads = [payload_bytes(packet.payload) for packet in packets]
+    offsets = array("L", [0])
+    total = 0
+    for packet, payload in zip(packets, payloads):
+        total += header_length(packet) + len(payload)
+        offsets.append(total)
+    buffer = bytearray(total)
+    for index, (packet, payload) in enumerate(zip(packets, payloads)):
+        encode_into(packet, buffer, offsets[index], payload)
+    return buffer, offsets
+
+def decode(buffer, offset=0, length=None):
+    """
+    バッファ内のフレームをコピーせずに参照する PacketView を返します。
+
+    Args:
+        buffer (bytes-like): フレームを含むバッファ。
+        offset (int): フレームの開始位置。
+        length (int): フレームのバイト数（省略時はバッファの末尾まで）。
+
+    Returns:
+        PacketView: フレームのビュー。
+    """
+    view = memoryview(buffer)
+    end = len(view) if length is None else offset + length
+    return PacketView(view[offset:end])
+
+def decode_batch(buffer, offsets):
+    """
+    encode_batch でエンコードしたバッファを PacketView のリストに変換します。
+
+    Args:
+        buffer (bytes-like): encode_batch が返したバッファ。
+        offsets (array): encode_batch が返した境界位置。
+
+    Returns:
+        list: PacketView のリスト。
+    """
+    view = memoryview(buffer)
+    return [PacketView(view[offsets[index]:offsets[index + 1]]) for index in range(len(offsets) - 1)]
+
+class PacketView:
+    """
+    エンコードされたフレームの読み取り専用ビュー。
+    各フィールドは参照されたときに memoryview から struct.unpack_from で取り出すため、
+    使用しないフィールドやペイロードはコピーされません。
+    """
+
+    __slots__ = ("frame",)
+
+    def __init__(self, frame):
+        """
+        ビューを初期化します。
+
+        Args:
+            frame (memoryview): 1 つのフレームを指す memoryview。
+        """
+        self.frame = frame
+
+    @property
+    def dst_mac(self):
+        return bytes(self.frame[0:6]).hex(":")
+
+    @property
+    def src_mac(self):
+        return bytes(self.frame[6:12]).hex(":")
+
+    @property
+    def ttl(self):
+        return self.frame[IP_OFFSET + 8]
+
+    @property
+    def protocol_number(self):
+        return self.frame[IP_OFFSET + 9]
+
+    @property
+    def protocol(self):
+        number = self.frame[IP_OFFSET + 9]
+        return PROTOCOL_NAMES.get(number, str(number))
+
+    @property
+    def src(self):
+        return socket.inet_ntoa(self.frame[IP_OFFSET + 12:IP_OFFSET + 16])
+
+    @property
+    def dst(self):
+        return socket.inet_ntoa(self.frame[IP_OFFSET + 16:IP_OFFSET + 20])
+
+    @property
+    def _l4_size(self):
+        header = _l4_header(self.frame[IP_OFFSET + 9])
+        return header.size if header else 0
+
+    @property
+    def l4_offset(self):
+        # TCP/UDP ヘッダの開始位置（IPv4 ヘッダの IHL から求めるため、オプション付きのヘッダにも対応）
+        return IP_OFFSET + (self.frame[IP_OFFSET] & 0x0F) * 4
+
+    @property
+    def has_ports(self):
+        # ポート番号を持つプロトコル（TCP/UDP）かどうか
+        return self._l4_size != 0
+
+    @property
+    def src_port(self):
+        if self._l4_size == 0:
+            return 0
+        return struct.unpack_from("!H", self.frame, self.l4_offset)[0]
+
+    @property
+    def dst_port(self):
+        if self._l4_size == 0:
+            return 0
+        return struct.unpack_from("!H", self.frame, self.l4_offset + 2)[0]
+
+    @property
+    def size_bytes(self):
+        # IPv4 の全長からヘッダを除いた長さ（パケットの size_bytes）
+        total_length = struct.unpack_from("!H", self.frame, IP_OFFSET + 2)[0]
+        return total_length - (self.l4_offset - IP_OFFSET) - self._l4_size
+
+    @property
+    def payload(self):
+        # ペイロード部分の memoryview（コピーしない）
+        return self.frame[self.l4_offset + self._l4_size:]
+
+    def __len__(self):
+        return len(self.frame)
+
+    def to_packet(self):
+        """
+        ビューの内容から Packet を生成します。ペイロードは UTF-8 の文字列として復元します。
+
+        Returns:
+            Packet: 復元したパケット。
+        """
+        payload = self.payload
+        return Packet(
+            src=self.src,
+            dst=self.dst,
+            payload=bytes(payload).decode("utf-8", errors="replace") if len(payload) else None,
+            protocol=self.protocol,
+            src_mac=self.src_mac,
+            dst_mac=self.dst_mac,
+            src_port=self.src_port,
+            dst_port=self.dst_port,
+            ttl=self.ttl,
+            size_bytes=self.size_bytes,
+        )
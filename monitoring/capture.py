@@ -0,0 +1,252 @@
+import os
+import queue
+import struct
+import threading
+from core.wire import encode, encode_into, header_length, payload_bytes
+
+PCAP_MAGIC_NANOSECONDS = 0xA1B23C4D  # タイムスタンプをナノ秒で記録する pcap 形式
+LINKTYPE_ETHERNET = 1
+PCAP_GLOBAL_HEADER = struct.Struct("<IHHiIII")  # マジック, メジャー, マイナー, タイムゾーン, 精度, snaplen, リンク種別
+PCAP_RECORD_HEADER = struct.Struct("<IIII")  # 秒, ナノ秒, 記録長, 元の長さ
+
+class PacketFilter:
+    """
+    キャプチャするパケットを選択する簡易フィルタ。
+    送信元、宛先、ホスト（送信元または宛先）、プロトコルの条件をすべて満たすパケットに一致します。
+    """
+
+    def __init__(self, src=None, dst=None, host=None, protocol=None):
+        """
+        フィルタを初期化します。
+
+        Args:
+            src (str): 送信元 IP アドレス（オプション）。
+            dst (str): 宛先 IP アドレス（オプション）。
+            host (str): 送信元または宛先の IP アドレス（オプション）。
+            protocol (str): プロトコル名（例: "TCP"、オプション）。大文字と小文字は区別しません。
+        """
+        self.src = src
+        self.dst = dst
+        self.host = host
+        self.protocol = protocol.upper() if protocol else None
+
+    @classmethod
+    def parse(cls, expression):
+        """
+        "src 10.0.0.1 and tcp" のような BPF に似た式からフィルタを作成します。
+        使用できる条件は "src ADDR"、"dst ADDR"、"host ADDR"、"proto NAME"、"tcp"、"udp"、"icmp" で、
+        "and" で連結します。
+
+        Args:
+            expression (str): フィルタ式。
+
+        Returns:
+            PacketFilter: 作成したフィルタ。
+
+        Raises:
+            ValueError: 式を解釈できない場合に発生。
+        """
+        fields = {}
+        tokens = [token for token in expression.split() if token.lower() != "and"]
+        index = 0
+        while index < len(tokens):
+            token = tokens[index].lower()
+            if token in ("tcp", "udp", "icmp"):
+                fields["protocol"] = token
+                index += 1
+            elif token in ("src", "dst", "host", "proto") and index + 1 < len(tokens):
+                fields["protocol" if token == "proto" else token] = tokens[index + 1]
+                index += 2
+            else:
+                raise ValueError(f"フィルタ式を解釈できません: {expression}")
+        return cls(**fields)
+
+    def matches(self, packet):
+        """
+        パケットがフィルタの条件に一致するかを返します。
+
+        Args:
+            packet (Packet): 判定するパケット。
+
+        Returns:
+            bool: 一致する場合は True。
+        """
+        if self.src is not None and packet.src != self.src:
+            return False
+        if self.dst is not None and packet.dst != self.dst:
+            return False
+        if self.host is not None and packet.src != self.host and packet.dst != self.host:
+            return False
+        if self.protocol is not None and str(packet.protocol).upper() != self.protocol:
+            return False
+        return True
+
+class CaptureTap:
+    """
+    リンクの送信方向やスイッチのポートを通過したパケットを pcap ファイルに記録するキャプチャタップ。
+
+    レコードは固定サイズのバッファ（チャンク）を環状に使い回して書き込み、満杯になったチャンクを
+    バックグラウンドのスレッドがまとめてファイルに書き出します。書き出しが追いつかず空きチャンクが
+    無い場合はレコードを破棄して dropped に数えるため、混雑したリンクでもメモリ使用量は
+    chunk_size * chunk_count で一定です。タイムスタンプにはシミュレーションの仮想時刻を使用します。
+    """
+
+    def __init__(self, file_path, snaplen=65535, packet_filter=None, chunk_size=1 << 20, chunk_count=4):
+        """
+        キャプチャタップを初期化し、pcap ファイルを作成します。
+
+        Args:
+            file_path (str): 出力する pcap ファイルのパス。
+            snaplen (int): 1 パケットあたりに記録する最大バイト数（超えた部分は切り詰めます）。
+            packet_filter (PacketFilter or str): 記録するパケットを選択するフィルタ（オプション）。
+            chunk_size (int): 1 つのチャンクのバイト数。
+            chunk_count (int): チャンクの数。
+
+        Raises:
+            ValueError: チャンクが 1 つのレコードを格納できない大きさの場合に発生。
+        """
+        if chunk_size < PCAP_RECORD_HEADER.size + snaplen:
+            raise ValueError("chunk_size は snaplen に 16 バイトを加えた値以上である必要があります。")
+        if isinstance(packet_filter, str):
+            packet_filter = PacketFilter.parse(packet_filter)
+        self.file_path = file_path
+        self.snaplen = snaplen
+        self.packet_filter = packet_filter
+        self.chunk_size = chunk_size
+        # 統計情報の初期化
+        self.captured_packets = 0  # 記録したパケット数
+        self.filtered_packets = 0  # フィルタで除外したパケット数
+        self.dropped_packets = 0  # 空きチャンクが無く破棄したパケット数
+
+        folder = os.path.dirname(file_path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        self.file = open(file_path, "wb")
+        self.file.write(PCAP_GLOBAL_HEADER.pack(PCAP_MAGIC_NANOSECONDS, 2, 4, 0, 0, snaplen, LINKTYPE_ETHERNET))
+
+        self.free_chunks = queue.Queue()  # 書き込み可能なチャンク
+        for _ in range(chunk_count - 1):
+            self.free_chunks.put(bytearray(chunk_size))
+        self.full_chunks = queue.Queue()  # ファイルへの書き出しを待つ (チャンク, 使用バイト数)
+        self.chunk = bytearray(chunk_size)  # 現在書き込み中のチャンク
+        self.used = 0  # 現在のチャンクの使用バイト数
+        self.closed = False
+        self.writer = threading.Thread(target=self._write_chunks, daemon=True)
+        self.writer.start()
+
+    def capture(self, packet, timestamp):
+        """
+        パケットを 1 つ記録します。
+
+        Args:
+            packet (Packet): 記録するパケット。
+            timestamp (float): シミュレーション時刻（秒）。
+        """
+        if self.packet_filter is not None and not self.packet_filter.matches(packet):
+            self.filtered_packets += 1
+            return
+
+        payload = payload_bytes(packet.payload)
+        headers = header_length(packet)
+        frame_length = headers + len(payload)
+        original_length = headers + max(packet.size_bytes, len(payload))
+        captured_length = min(frame_length, self.snaplen)
+        record_length = PCAP_RECORD_HEADER.size + captured_length
+
+        chunk = self.chunk
+        if chunk is None or self.used + record_length > self.chunk_size:
+            chunk = self._next_chunk()
+            if chunk is None:
+                self.dropped_packets += 1
+                return
+
+        offset = self.used
+        seconds = int(timestamp)
+        PCAP_RECORD_HEADER.pack_into(chunk, offset, seconds, int((timestamp - seconds) * 1e9), captured_length, original_length)
+        if captured_length == frame_length:
+            encode_into(packet, chunk, offset + PCAP_RECORD_HEADER.size, payload)
+        else:
+            chunk[offset + PCAP_RECORD_HEADER.size:offset + record_length] = encode(packet)[:captured_length]
+        self.used = offset + record_length
+        self.captured_packets += 1
+
+    def _next_chunk(self):
+        # 使用中のチャンクを書き出し待ちにし、空きチャンクに切り替える（空きが無い場合は None）
+        if self.chunk is not None and self.used:
+            self.full_chunks.put((self.chunk, self.used))
+            self.chunk = None
+        elif self.chunk is not None:
+            return self.chunk
+        try:
+            self.chunk = self.free_chunks.get_nowait()
+        except queue.Empty:
+            return None
+        self.used = 0
+        return self.chunk
+
+    def _write_chunks(self):
+        # バックグラウンドのスレッド: 満杯のチャンクをファイルに書き出し、空きチャンクとして戻す
+        while True:
+            item = self.full_chunks.get()
+            if item is None:
+                return
+            chunk, used = item
+            self.file.write(memoryview(chunk)[:used])
+            self.free_chunks.put(chunk)
+
+    def close(self):
+        """
+        書き込み中のチャンクを書き出し、ファイルを閉じます。
+        """
+        if self.closed:
+            return
+        self.closed = True
+        if self.chunk is not None and self.used:
+            self.full_chunks.put((self.chunk, self.used))
+            self.chunk = None
+        self.full_chunks.put(None)
+        self.writer.join()
+        self.file.close()
+
+    def get_stats(self):
+        """
+        キャプチャの統計情報を返します。
+
+        Returns:
+            dict: 記録、除外、破棄したパケット数。
+        """
+        return {
+            "captured_packets": self.captured_packets,
+            "filtered_packets": self.filtered_packets,
+            "dropped_packets": self.dropped_packets,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def read_pcap(file_path):
+    """
+    CaptureTap が出力した pcap ファイルのレコードを順に返します。
+
+    Args:
+        file_path (str): pcap ファイルのパス。
+
+    Yields:
+        tuple: (タイムスタンプ（秒）, 元の長さ, フレームのバイト列)。
+
+    Raises:
+        ValueError: 対応していない形式のファイルの場合に発生。
+    """
+    with open(file_path, "rb") as file:
+        header = file.read(PCAP_GLOBAL_HEADER.size)
+        if len(header) < PCAP_GLOBAL_HEADER.size or PCAP_GLOBAL_HEADER.unpack(header)[0] != PCAP_MAGIC_NANOSECONDS:
+            raise ValueError(f"対応していない pcap ファイルです: {file_path}")
+        while True:
+            record = file.read(PCAP_RECORD_HEADER.size)
+            if len(record) < PCAP_RECORD_HEADER.size:
+                return
+            seconds, nanoseconds, captured_length, original_length = PCAP_RECORD_HEADER.unpack(record)
+            yield seconds + nanoseconds / 1e9, original_length, file.read(captured_length)
@@ -0,0 +1,61 @@
+import argparse
+import json
+from utils.sweep import load_scenario, expand_grid, sample_random, sample_latin_hypercube, run_sweep, save_table_csv
+
+def parse_value(text):
+    # 数値や真偽値は JSON として解釈し、それ以外は文字列として扱う
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+def parse_grid(items):
+    # "name=v1,v2,..." の形式をパラメータ名 -> 値のリストに変換する
+    grid = {}
+    for item in items:
+        name, values = item.split("=", 1)
+        grid[name] = [parse_value(value) for value in values.split(",")]
+    return grid
+
+def parse_ranges(items):
+    # "name=low:high" の形式をパラメータ名 -> (下限, 上限) に変換する
+    space = {}
+    for item in items:
+        name, bounds = item.split("=", 1)
+        low, high = bounds.split(":", 1)
+        space[name] = (float(low), float(high))
+    return space
+
+def main():
+    parser = argparse.ArgumentParser(description="ネットワーク設定のパラメータスイープを複数プロセスで実行します。")
+    parser.add_argument("--network", default="config/network_config.json", help="network_config.json のパス")
+    parser.add_argument("--controllers", default="config/controller_config.json", help="controller_config.json のパス")
+    parser.add_argument("--duration", type=float, default=5.0, help="各実行のシミュレーション期間（秒）")
+    parser.add_argument("--grid", action="append", default=[], help="グリッド（例: bandwidth=10,100,1000）")
+    parser.add_argument("--range", action="append", default=[], dest="ranges", help="サンプリング範囲（例: delay=1:20）")
+    parser.add_argument("--random", type=int, default=0, help="一様乱数によるサンプル数")
+    parser.add_argument("--lhs", type=int, default=0, help="ラテン超方格法によるサンプル数")
+    parser.add_argument("--workers", type=int, default=None, help="ワーカープロセス数（省略時は CPU 数）")
+    parser.add_argument("--seed", type=int, default=0, help="乱数シードの基準値")
+    parser.add_argument("--output", default="results/sweep.jsonl", help="結果を追記する JSON Lines ファイル")
+    parser.add_argument("--csv", default=None, help="集計表を保存する CSV ファイル（オプション）")
+    parser.add_argument("--no-resume", action="store_true", help="既存の結果を破棄して最初から実行する")
+    args = parser.parse_args()
+
+    scenario = load_scenario(args.network, args.controllers, args.duration)
+    space = parse_ranges(args.ranges)
+    if args.lhs:
+        parameter_sets = sample_latin_hypercube(space, args.lhs, args.seed)
+    elif args.random:
+        parameter_sets = sample_random(space, args.random, args.seed)
+    else:
+        parameter_sets = expand_grid(parse_grid(args.grid))
+
+    rows = run_sweep(scenario, parameter_sets, args.output, workers=args.workers, base_seed=args.seed, resume=not args.no_resume)
+    for row in rows:
+        print(f"実行 {row['run_id']}: {row['params']} -> {row['metrics']}")
+    if args.csv:
+        save_table_csv(rows, args.csv)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from core.emulator import Emulator
+from core.packet import Packet
+from components.host import Host
+from components.switch import Switch
+from components.link import Link
+from controller.custom_controller import CustomController
+
+def build_network():
+    emulator = Emulator()
+    host1 = Host("Host1", "10.0.0.1", "00:00:00:00:00:01")
+    host2 = Host("Host2", "10.0.0.2", "00:00:00:00:00:02")
+    switch = Switch("Switch1")
+    for node in (host1, host2, switch):
+        emulator.add_node(node)
+    Link(host1, switch, delay=1)
+    Link(host2, switch, delay=1)
+    CustomController().add_switch(switch)
+    for i in range(20):
+        host1.send_packet(Packet("10.0.0.1", "10.0.0.2", "x" * (10 + i)), 0)
+    return emulator
+
+def send_burst(emulator, count):
+    host1 = emulator.get_node_by_name("Host1")
+    for _ in range(count):
+        host1.send_packet(Packet("10.0.0.1", "10.0.0.2", "y" * 100), 0)
+    emulator.run_simulation(1)
+    return emulator.get_node_by_name("Host2").get_packets_received()
+
+class TestCheckpoint(unittest.TestCase):
+
+    def test_checkpoint_and_restore(self):
+        emulator = build_network()
+        emulator.run_simulation(0.002)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "warm.ckpt")
+            emulator.checkpoint(path)
+            restored = Emulator.restore(path)
+
+        self.assertEqual(restored.current_time, emulator.current_time)
+        self.assertEqual(len(restored.event_queue), len(emulator.event_queue))
+        switch = restored.get_node_by_name("Switch1")
+        self.assertIn(("10.0.0.1", "10.0.0.2"), switch.flow_table)
+        self.assertIs(switch.emulator, restored)
+
+        # 復元したエミュレータは元と同じ結果で実行を続けられる
+        emulator.run_simulation(1)
+        restored.run_simulation(1)
+        self.assertEqual(restored.get_node_by_name("Host2").get_packets_received(),
+                         emulator.get_node_by_name("Host2").get_packets_received())
+
+    def test_fork_runs_independent_branches(self):
+        emulator = build_network()
+        emulator.run_simulation(1)
+        results = emulator.fork(send_burst, [0, 5])
+        self.assertEqual(results, [20, 25])
+        # 分岐での変更は元のエミュレータに影響しない
+        self.assertEqual(emulator.get_node_by_name("Host2").get_packets_received(), 20)
+
+if __name__ == '__main__':
+    unittest.main()
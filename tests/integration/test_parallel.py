@@ -0,0 +1,136 @@
+import multiprocessing
+import unittest
+from core.emulator import Emulator
+from core.packet import Packet
+from components.host import Host
+from components.switch import Switch
+from components.link import Link
+from controller.base_controller import BaseController
+from traffic.traffic_generator import TrafficGenerator
+
+class ReactiveController(BaseController):
+    # 宛先に応じてアイドルタイムアウト付きのフローを設定するコントローラ
+    def handle_packet_in(self, packet, switch, in_port, buffer_id=None):
+        out_port = 1 if packet.dst == "10.0.0.2" else 0
+        self.send_flow_mod(switch, (packet.src, packet.dst), {"out_port": out_port}, idle_timeout=0.004,
+                           buffer_id=buffer_id)
+
+def build_chain(reactive=False):
+    # Host1 - Switch1 - Switch2 - Switch3 - Host2 の直線トポロジ
+    emulator = Emulator()
+    controller = ReactiveController()
+    host1 = Host("Host1", "10.0.0.1", "00:00:00:00:00:01")
+    host2 = Host("Host2", "10.0.0.2", "00:00:00:00:00:02")
+    switches = [Switch(f"Switch{i}") for i in range(1, 4)]
+    for node in [host1, host2] + switches:
+        emulator.add_node(node)
+    chain = [host1] + switches + [host2]
+    for node1, node2 in zip(chain, chain[1:]):
+        Link(node1, node2, delay=2, buffer_size=100)
+    for switch in switches:
+        if reactive:
+            controller.add_switch(switch)
+        else:
+            switch.install_flow(("10.0.0.1", "10.0.0.2"), {"out_port": 1})
+            switch.install_flow(("10.0.0.2", "10.0.0.1"), {"out_port": 0})
+    for i in range(50):
+        host1.send_packet(Packet("10.0.0.1", "10.0.0.2", "x" * (100 + i)), 0)
+        host2.send_packet(Packet("10.0.0.2", "10.0.0.1", "y" * (60 + i)), 0)
+    return emulator
+
+def build_bottleneck():
+    # HostA と HostB が同じ時刻に送信したパケットが Switch1 - Switch2 の狭いリンクで競合するトポロジ
+    emulator = Emulator()
+    host_a = Host("HostA", "10.0.0.1", "00:00:00:00:00:01")
+    host_b = Host("HostB", "10.0.0.2", "00:00:00:00:00:02")
+    host_c = Host("HostC", "10.0.0.3", "00:00:00:00:00:03")
+    switch1 = Switch("Switch1")
+    switch2 = Switch("Switch2")
+    for node in (host_a, host_b, host_c, switch1, switch2):
+        emulator.add_node(node)
+    Link(host_a, switch1, delay=2)
+    Link(host_b, switch1, delay=2)
+    bottleneck = Link(switch1, switch2, bandwidth=1, delay=2, buffer_bytes=1200)
+    Link(switch2, host_c, delay=2)
+    for src in ("10.0.0.1", "10.0.0.2"):
+        switch1.install_flow((src, "10.0.0.3"), {"out_port": 2})
+        switch2.install_flow((src, "10.0.0.3"), {"out_port": 1})
+    # HostB の生成器を先に開始する（同じ時刻のイベントは逐次実行では HostB が先に処理される）
+    generators = [
+        TrafficGenerator(host_b, "10.0.0.3", interval=0.1, size_bytes=1000),
+        TrafficGenerator(host_a, "10.0.0.3", interval=0.1, size_bytes=1000),
+    ]
+    for generator in generators:
+        generator.start()
+    return emulator, bottleneck
+
+def flow_counts(emulator, bottleneck):
+    # Switch2 のフローごとのパケット数と狭いリンクのテールドロップ数
+    flows = sorted((str(stats["match"]), stats["packet_count"]) for stats in emulator.get_node_by_name("Switch2").get_flow_stats())
+    return flows, [egress.dropped_packets for egress in bottleneck.egress_queues.values()]
+
+def switch_state(emulator):
+    # スイッチのフロー統計、Packet-In、テーブルミスのバッファの状態
+    return {
+        name: (
+            sorted((str(stats["match"]), stats["packet_count"], stats["byte_count"]) for stats in node.get_flow_stats()),
+            node.packet_ins, node.coalesced_packets, node.buffered_packets, node.microflow_cache.get_stats(),
+        )
+        for name, node in emulator.nodes.items() if isinstance(node, Switch)
+    }
+
+def counters(emulator):
+    return {name: (node.received_packets, node.received_bytes, node.sent_packets) for name, node in emulator.nodes.items()}
+
+@unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "os.fork が利用できません")
+class TestParallelSimulation(unittest.TestCase):
+
+    def test_parallel_matches_sequential(self):
+        sequential = build_chain()
+        sequential.run_simulation(0.01)
+
+        parallel = build_chain()
+        parallel.run_parallel(0.01, workers=3)
+
+        self.assertEqual(counters(parallel), counters(sequential))
+        self.assertEqual(parallel.current_time, sequential.current_time)
+        # 期間外のイベントは元のエミュレータに戻され、続けて逐次実行できる
+        self.assertEqual(len(parallel.event_queue), len(sequential.event_queue))
+        sequential.run_simulation(1)
+        parallel.run_simulation(1)
+        self.assertEqual(counters(parallel), counters(sequential))
+
+    def test_parallel_matches_sequential_with_reactive_controller(self):
+        sequential = build_chain(reactive=True)
+        sequential.run_simulation(0.01)
+
+        parallel = build_chain(reactive=True)
+        parallel.run_parallel(0.01, workers=3)
+
+        # コントローラが設定したフローやカウンタ、キャッシュの状態も書き戻される
+        self.assertEqual(switch_state(parallel), switch_state(sequential))
+        self.assertEqual(counters(parallel), counters(sequential))
+        self.assertEqual(len(parallel.event_queue), len(sequential.event_queue))
+        # アイドルタイムアウトのタイマーのハンドルも有効なまま引き継がれ、フローは同じように削除される
+        sequential.run_simulation(1)
+        parallel.run_simulation(1)
+        self.assertEqual(switch_state(parallel), switch_state(sequential))
+        self.assertTrue(all(not state[0] for state in switch_state(parallel).values()))
+
+    def test_same_time_arrivals_from_different_partitions_keep_sequential_order(self):
+        partition = {"HostA": 0, "Switch1": 1, "Switch2": 1, "HostC": 1, "HostB": 2}
+        sequential, sequential_link = build_bottleneck()
+        sequential.run_simulation(0.5)
+
+        parallel, parallel_link = build_bottleneck()
+        parallel.run_parallel(0.5, partition=partition)
+
+        # 別のパーティションから同じ時刻に届いたパケットも逐次実行と同じ順に処理され、同じフローが破棄される
+        self.assertEqual(flow_counts(parallel, parallel_link), flow_counts(sequential, sequential_link))
+        self.assertEqual(counters(parallel), counters(sequential))
+        sequential.run_simulation(0.5)
+        parallel.run_simulation(0.5)
+        self.assertEqual(flow_counts(parallel, parallel_link), flow_counts(sequential, sequential_link))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from utils.sweep import load_scenario, expand_grid, sample_latin_hypercube, apply_parameters, run_sweep, load_results
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.scenario = load_scenario('config/network_config.json', 'config/controller_config.json', duration=1.0)
+
+    def test_expand_grid_and_apply_parameters(self):
+        parameter_sets = expand_grid({"bandwidth": [10, 100], "interval": [0.5]})
+        self.assertEqual(parameter_sets, [{"bandwidth": 10, "interval": 0.5}, {"bandwidth": 100, "interval": 0.5}])
+        scenario = apply_parameters(self.scenario, parameter_sets[0])
+        self.assertTrue(all(link["bandwidth"] == 10 for link in scenario["network"]["links"]))
+        self.assertEqual(scenario["network"]["traffic"][0]["interval"], 0.5)
+        # 基準のシナリオは変更されない
+        self.assertEqual(self.scenario["network"]["links"][0]["bandwidth"], 100)
+
+    def test_latin_hypercube_covers_each_stratum(self):
+        samples = sample_latin_hypercube({"delay": (0.0, 10.0)}, 5, seed=1)
+        self.assertEqual(sorted(int(sample["delay"] // 2) for sample in samples), [0, 1, 2, 3, 4])
+
+    def test_run_sweep_resumes(self):
+        parameter_sets = expand_grid({"delay": [1, 20]})
+        with tempfile.TemporaryDirectory() as folder:
+            output_path = os.path.join(folder, "sweep.jsonl")
+            rows = run_sweep(self.scenario, parameter_sets, output_path, workers=2)
+            self.assertEqual([row["run_id"] for row in rows], [0, 1])
+            self.assertTrue(all(row["metrics"]["packets_received"] > 0 for row in rows))
+
+            # 完了済みの実行は再実行されない
+            rows = run_sweep(self.scenario, parameter_sets, output_path, workers=2)
+            self.assertEqual(len(rows), 2)
+            self.assertEqual(len(load_results(output_path)), 2)
+
+    def test_resume_checks_scenario_and_repairs_truncated_line(self):
+        parameter_sets = expand_grid({"delay": [1, 20]})
+        with tempfile.TemporaryDirectory() as folder:
+            output_path = os.path.join(folder, "sweep.jsonl")
+            run_sweep(self.scenario, parameter_sets[:1], output_path, workers=1)
+            # 書き込みの途中で中断された行
+            with open(output_path, "a", encoding="utf-8") as file:
+                file.write('{"run_id": 1, "se')
+
+            # シミュレーション期間が異なるシナリオの結果は再利用しない
+            scenario = dict(self.scenario, duration=0.5)
+            rows = run_sweep(scenario, parameter_sets, output_path, workers=2)
+            self.assertEqual([(row["run_id"], row["duration"]) for row in rows], [(0, 0.5), (1, 0.5)])
+            with open(output_path, "r", encoding="utf-8") as file:
+                lines = file.read().splitlines()
+            self.assertEqual(len(lines), 3)
+            self.assertEqual(len(load_results(output_path)), 3)
+
+            # シードが異なる場合も再利用しない
+            rows = run_sweep(scenario, parameter_sets, output_path, workers=2, base_seed=10)
+            self.assertEqual([row["seed"] for row in rows], [10, 11])
+            self.assertEqual(len(load_results(output_path)), 5)
+
+if __name__ == '__main__':
+    unittest.main()
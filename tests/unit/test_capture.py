@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from components.host import Host
+from components.link import Link
+from core.emulator import Emulator
+from core.packet import Packet
+from core.wire import decode
+from monitoring.capture import CaptureTap, PacketFilter, read_pcap
+
+class TestCapture(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "link.pcap")
+        self.emulator = Emulator()
+        self.host1 = Host(name="Host1", ip_address="10.0.0.1", mac_address="00:00:00:00:00:01")
+        self.host2 = Host(name="Host2", ip_address="10.0.0.2", mac_address="00:00:00:00:00:02")
+        self.emulator.add_node(self.host1)
+        self.emulator.add_node(self.host2)
+        self.link = Link(node1=self.host1, node2=self.host2, buffer_bytes=10**6)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_link_tap_writes_pcap_with_virtual_time(self):
+        with CaptureTap(self.path, snaplen=60, packet_filter="dst 10.0.0.2 and tcp") as tap:
+            self.link.add_tap(self.host1, tap)
+            self.emulator.current_time = 1.5
+            self.link.transfer_packet(Packet("10.0.0.1", "10.0.0.2", "x" * 100), self.host1)
+            self.link.transfer_packet(Packet("10.0.0.1", "10.0.0.2", protocol="UDP", size_bytes=10), self.host1)
+        records = list(read_pcap(self.path))
+        self.assertEqual(len(records), 1)
+        timestamp, original_length, frame = records[0]
+        self.assertAlmostEqual(timestamp, 1.5)
+        self.assertEqual((original_length, len(frame)), (154, 60))
+        self.assertEqual(decode(frame).src, "10.0.0.1")
+        self.assertEqual(tap.get_stats()["filtered_packets"], 1)
+
+    def test_ring_accounts_for_every_record(self):
+        tap = CaptureTap(self.path, snaplen=100, chunk_size=200, chunk_count=1)
+        for _ in range(5):
+            tap.capture(Packet("10.0.0.1", "10.0.0.2", "x"), 0.0)
+        tap.close()
+        # 書き出しが追いつかない間のレコードは破棄され、記録または破棄のどちらかに数えられる
+        self.assertEqual(tap.captured_packets + tap.dropped_packets, 5)
+        self.assertEqual(len(list(read_pcap(self.path))), tap.captured_packets)
+
+    def test_filter_expression(self):
+        packet_filter = PacketFilter.parse("host 10.0.0.2 and proto udp")
+        self.assertTrue(packet_filter.matches(Packet("10.0.0.2", "10.0.0.9", protocol="UDP")))
+        self.assertFalse(packet_filter.matches(Packet("10.0.0.2", "10.0.0.9", protocol="TCP")))
+        with self.assertRaises(ValueError):
+            PacketFilter.parse("port 80")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from components.classifier import Classifier
+from components.switch import Switch
+from core.packet import Packet
+
+class TestClassifier(unittest.TestCase):
+    def setUp(self):
+        self.classifier = Classifier()
+        self.classifier.add({"dst": "10.0.0.0/8"}, {"out_port": 1}, priority=10)
+        self.classifier.add({"dst": "10.0.1.0/24"}, {"out_port": 2}, priority=20)
+        self.classifier.add({"dst": "10.0.1.0/24", "protocol": "UDP", "dst_port": 53}, {"out_port": 3}, priority=30)
+        self.classifier.add({"in_port": 4}, {"out_port": 4}, priority=5)
+
+    def test_highest_priority_match_wins(self):
+        self.assertEqual(self.classifier.lookup(Packet("10.9.9.9", "10.2.0.1")).action, {"out_port": 1})
+        self.assertEqual(self.classifier.lookup(Packet("10.9.9.9", "10.0.1.7")).action, {"out_port": 2})
+        dns = Packet("10.9.9.9", "10.0.1.7", protocol="udp", dst_port=53)
+        self.assertEqual(self.classifier.lookup(dns).action, {"out_port": 3})
+        self.assertEqual(self.classifier.lookup(Packet("192.168.0.1", "192.168.0.2"), in_port=4).action, {"out_port": 4})
+        self.assertIsNone(self.classifier.lookup(Packet("192.168.0.1", "192.168.0.2"), in_port=1))
+
+    def test_remove_and_replace(self):
+        self.classifier.add({"dst": "10.0.1.0/24"}, {"out_port": 7}, priority=20)
+        self.assertEqual(len(self.classifier), 4)
+        self.assertEqual(self.classifier.lookup(Packet("10.9.9.9", "10.0.1.7")).action, {"out_port": 7})
+        self.assertIsNotNone(self.classifier.remove({"dst": "10.0.1.0/24"}, priority=20))
+        self.assertEqual(self.classifier.lookup(Packet("10.9.9.9", "10.0.1.7")).action, {"out_port": 1})
+        self.assertIsNone(self.classifier.remove({"dst": "10.0.1.0/24"}, priority=20))
+        with self.assertRaises(ValueError):
+            self.classifier.add({"vlan": 1}, {"out_port": 1})
+
+    def test_switch_prefers_exact_entries(self):
+        switch = Switch("Switch1")
+        switch.install_flow({"dst": "10.0.0.0/24"}, {"out_port": 2}, priority=100)
+        switch.install_flow(("10.0.0.1", "10.0.0.2"), {"out_port": 1})
+        self.assertEqual(switch.lookup_flow(Packet("10.0.0.1", "10.0.0.2"), 0), {"out_port": 1})
+        self.assertEqual(switch.lookup_flow(Packet("10.0.0.3", "10.0.0.2"), 0), {"out_port": 2})
+        self.assertEqual(len(switch.flow_table), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import time
+import unittest
+from core.emulator import Emulator
+from core.event_queue import Event
+
+class TestEmulator(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = Emulator()
+
+    def test_registered_handler_is_dispatched(self):
+        handled = []
+        self.emulator.register_handler("TIMER", handled.append)
+        event = Event(1.0, "TIMER")
+        self.emulator.schedule_event(event)
+        self.emulator.schedule_event(Event(2.0, "UNKNOWN"))
+        self.emulator.run_simulation(duration=5)
+        self.assertEqual(handled, [event])
+        self.assertEqual(self.emulator.current_time, 2.0)
+
+    def test_batch_dispatch_groups_same_time_events(self):
+        emulator = Emulator(batch_dispatch=True)
+        batches = []
+        single = []
+        emulator.register_batch_handler("ARRIVAL", batches.append)
+        emulator.register_handler("TIMER", single.append)
+        emulator.schedule_events([Event(1.0, "ARRIVAL"), Event(1.0, "TIMER"), Event(1.0, "ARRIVAL"), Event(2.0, "ARRIVAL")])
+        emulator.run_simulation(duration=5)
+        self.assertEqual([len(batch) for batch in batches], [2, 1])
+        self.assertEqual(len(single), 1)
+
+    def test_batch_dispatch_respects_max_events(self):
+        emulator = Emulator(batch_dispatch=True)
+        batches = []
+        emulator.register_batch_handler("ARRIVAL", batches.append)
+        emulator.schedule_events([Event(1.0, "ARRIVAL") for _ in range(5)] + [Event(2.0, "ARRIVAL")])
+        self.assertEqual(emulator.run_simulation(duration=5, max_events=3), "max_events")
+        self.assertEqual([len(batch) for batch in batches], [3])
+        # 上限を超えた同一時刻のイベントはキューに残り、次の実行で処理される
+        self.assertEqual(emulator.run_simulation(duration=5, max_events=2), "max_events")
+        self.assertEqual([len(batch) for batch in batches], [3, 2])
+        self.assertEqual(emulator.current_time, 1.0)
+        self.assertEqual(emulator.run_simulation(duration=5), "empty")
+        self.assertEqual([len(batch) for batch in batches], [3, 2, 1])
+
+    def test_run_controls(self):
+        ticks = []
+        def tick():
+            ticks.append(self.emulator.current_time)
+            self.emulator.schedule_timer(1.0, tick)
+        self.emulator.schedule_timer(0, tick)
+
+        self.assertEqual(self.emulator.run_simulation(100, max_events=3), "max_events")
+        self.assertEqual(ticks, [0, 1.0, 2.0])
+        reason = self.emulator.run_simulation(100, stop_when=lambda emulator: emulator.current_time >= 5.0)
+        self.assertEqual(reason, "stop_when")
+        self.assertEqual(self.emulator.current_time, 5.0)
+        self.assertEqual(self.emulator.run_simulation(2.5), "duration")
+        self.assertEqual(self.emulator.run_simulation(100, wall_clock_limit=0), "wall_clock")
+
+    def test_realtime_factor_paces_against_wall_clock(self):
+        self.emulator.schedule_event(Event(0.5, "TIMER", callback=lambda: None))
+        started = time.monotonic()
+        self.assertEqual(self.emulator.run_simulation(1.0, realtime_factor=10), "empty")
+        # 0.5 秒の仮想時間は 10 倍速で約 0.05 秒の実時間になる
+        self.assertGreaterEqual(time.monotonic() - started, 0.045)
+
+if __name__ == '__main__':
+    unittest.main()
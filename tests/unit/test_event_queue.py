@@ -0,0 +1,91 @@
+import random
+import unittest
+from core.event_queue import Event, EventQueue, CalendarQueue
+
+class TestEventQueue(unittest.TestCase):
+
+    def test_same_time_events_are_fifo(self):
+        for queue in (EventQueue(), CalendarQueue()):
+            events = [Event(1.0, "PACKET_ARRIVAL") for _ in range(5)]
+            for event in events:
+                queue.push(event)
+            self.assertEqual([queue.pop() for _ in range(5)], events)
+
+    def test_peek_time_and_len(self):
+        for queue in (EventQueue(), CalendarQueue()):
+            self.assertIsNone(queue.peek_time())
+            queue.push_many([Event(3.0, "A"), Event(1.0, "B"), Event(2.0, "C")])
+            self.assertEqual(len(queue), 3)
+            self.assertEqual(queue.peek_time(), 1.0)
+            self.assertEqual(queue.pop().type, "B")
+            self.assertEqual(len(queue), 2)
+
+    def test_calendar_queue_matches_heap_order(self):
+        rng = random.Random(1)
+        heap, calendar = EventQueue(), CalendarQueue()
+        now = 0.0
+        for _ in range(2000):
+            # 近い将来に集中したイベントと、取り出しを交互に行う
+            if rng.random() < 0.6 or heap.is_empty():
+                event = Event(now + rng.expovariate(1000.0), "E")
+                heap.push(event)
+                calendar.push(event)
+            else:
+                event = heap.pop()
+                self.assertIs(calendar.pop(), event)
+                now = event.time
+        while not heap.is_empty():
+            self.assertIs(calendar.pop(), heap.pop())
+        self.assertTrue(calendar.is_empty())
+
+    def test_drained_entries_keep_handles_valid(self):
+        for source, target in ((EventQueue(), CalendarQueue()), (CalendarQueue(), EventQueue())):
+            first, second, third = Event(2.0, "A"), Event(1.0, "B"), Event(1.0, "C")
+            handles = source.push_many([first, second, third])
+            source.cancel(handles[0])
+            entries = source.drain_entries()
+            self.assertEqual([entry[2] for entry in entries], [second, third])
+            self.assertTrue(source.is_empty())
+            target.push(Event(1.0, "D"))
+            for entry in entries:
+                target.push_entry(entry, renumber=True)
+            # 移した組は元のハンドルで取り消せる
+            self.assertTrue(target.cancel(handles[1]))
+            self.assertEqual([target.pop().type for _ in range(2)], ["D", "C"])
+
+    def test_pop_entry_returns_sequence_number(self):
+        for queue in (EventQueue(), CalendarQueue()):
+            handles = queue.push_many([Event(1.0, "A"), Event(1.0, "B"), Event(0.5, "C")])
+            queue.cancel(handles[2])
+            time, sequence, event = queue.pop_entry()
+            self.assertEqual((time, sequence, event.type), (1.0, handles[0][1], "A"))
+            # 取り出した組は処理済みになり、ハンドルでは取り消せない
+            self.assertFalse(queue.cancel(handles[0]))
+            self.assertEqual(queue.pop_entry()[2].type, "B")
+            self.assertTrue(queue.is_empty())
+
+    def test_cancelled_events_are_skipped(self):
+        for queue in (EventQueue(), CalendarQueue()):
+            first = Event(1.0, "TIMER")
+            second = Event(2.0, "TIMER")
+            handle = queue.push(first)
+            queue.push(second)
+            self.assertTrue(queue.cancel(handle))
+            self.assertFalse(queue.cancel(handle))
+            self.assertEqual(len(queue), 1)
+            self.assertEqual(queue.peek_time(), 2.0)
+            self.assertIs(queue.pop(), second)
+            self.assertTrue(queue.is_empty())
+
+    def test_rescheduled_timers_do_not_grow_queue(self):
+        for queue in (EventQueue(), CalendarQueue()):
+            handle = queue.push(Event(1.0, "TIMER"))
+            for i in range(10000):
+                # タイマーを取り消して再設定する操作を繰り返す
+                queue.cancel(handle)
+                handle = queue.push(Event(1.0 + i * 0.001, "TIMER"))
+            self.assertEqual(len(queue), 1)
+            self.assertLess(queue._size if isinstance(queue, CalendarQueue) else len(queue.queue), 200)
+
+if __name__ == '__main__':
+    unittest.main()
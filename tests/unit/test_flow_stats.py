@@ -0,0 +1,56 @@
+import unittest
+from components.flow_stats import FlowCounters
+from components.switch import Switch
+from controller.base_controller import BaseController
+from core.emulator import Emulator
+from core.packet import Packet
+
+class TestFlowCounters(unittest.TestCase):
+    def test_released_ids_are_reused_with_zeroed_counters(self):
+        counters = FlowCounters()
+        first = counters.allocate(0.0)
+        second = counters.allocate(1.0)
+        counters.record(first, 100)
+        counters.record(second, 50)
+        counters.release(first)
+        self.assertEqual(counters.aggregate(), {"packet_count": 1, "byte_count": 50, "flow_count": 1})
+        self.assertEqual(counters.allocate(2.0), first)
+        self.assertEqual(counters.stats(first, 3.0), {"packet_count": 0, "byte_count": 0, "duration": 1.0})
+
+class TestSwitchFlowStats(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator()
+        self.switch = Switch("Switch1")
+        self.emulator.add_node(self.switch)
+        self.controller = BaseController()
+        self.controller.add_switch(self.switch)
+
+    def test_entries_count_forwarded_packets(self):
+        self.controller.send_flow_mod(self.switch, ("10.0.0.1", "10.0.0.2"), {"out_port": 0})
+        self.controller.send_flow_mod(self.switch, {"dst": "10.0.1.0/24"}, {"out_port": 0}, priority=10)
+        for size in (100, 200):
+            self.switch.receive_packet(Packet("10.0.0.1", "10.0.0.2", size_bytes=size), 0)
+        self.switch.receive_packet(Packet("10.0.0.1", "10.0.1.5", size_bytes=60), 0)
+
+        stats = {str(item["match"]): item for item in self.controller.request_flow_stats(self.switch)}
+        exact = stats[str(("10.0.0.1", "10.0.0.2"))]
+        self.assertEqual((exact["packet_count"], exact["byte_count"], exact["priority"]), (2, 300, None))
+        wildcard = stats[str({"dst": "10.0.1.0/24"})]
+        self.assertEqual((wildcard["packet_count"], wildcard["byte_count"], wildcard["priority"]), (1, 60, 10))
+        self.assertEqual(
+            self.controller.request_aggregate_stats(self.switch),
+            {"packet_count": 3, "byte_count": 360, "flow_count": 2},
+        )
+
+    def test_reinstall_resets_and_remove_releases_counters(self):
+        match = ("10.0.0.1", "10.0.0.2")
+        self.switch.install_flow(match, {"out_port": 0})
+        self.switch.receive_packet(Packet("10.0.0.1", "10.0.0.2", size_bytes=100), 0)
+        self.switch.install_flow(match, {"out_port": 0})
+        self.assertEqual(self.switch.get_flow_stats()[0]["packet_count"], 0)
+        self.switch.receive_packet(Packet("10.0.0.1", "10.0.0.2", size_bytes=100), 0)
+        self.assertTrue(self.switch.remove_flow(match))
+        self.assertEqual(self.switch.get_aggregate_stats(), {"packet_count": 0, "byte_count": 0, "flow_count": 0})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from components.flow_table import FlowTable
+from components.host import Host
+from components.switch import Switch
+from core.address_registry import AddressRegistry, pack_flow_key, unpack_flow_key
+from core.emulator import Emulator
+from core.packet import Packet
+
+class TestAddressRegistry(unittest.TestCase):
+    def test_interns_dense_ids(self):
+        registry = AddressRegistry()
+        self.assertEqual(registry.intern_ip("10.0.0.1"), 0)
+        self.assertEqual(registry.intern_ip("10.0.0.2"), 1)
+        self.assertEqual(registry.intern_ip("10.0.0.1"), 0)
+        self.assertEqual(registry.ip_values[1], 0x0A000002)
+        self.assertEqual(registry.intern_mac("00:00:00:00:00:01"), 0)
+        self.assertEqual(unpack_flow_key(pack_flow_key(3, 7)), (3, 7))
+
+    def test_emulator_registers_node_addresses(self):
+        emulator = Emulator()
+        emulator.add_node(Host("Host1", "10.0.0.1", "00:00:00:00:00:01"))
+        self.assertIn("10.0.0.1", emulator.addresses.ip_ids)
+        self.assertIn("00:00:00:00:00:01", emulator.addresses.mac_ids)
+
+class TestFlowTable(unittest.TestCase):
+    def test_rekeys_entries_when_registry_is_set(self):
+        table = FlowTable()
+        table[("10.0.0.1", "10.0.0.2")] = {"out_port": 1}
+        registry = AddressRegistry()
+        table.set_registry(registry)
+        self.assertIn(("10.0.0.1", "10.0.0.2"), table)
+        self.assertEqual(list(table), [("10.0.0.1", "10.0.0.2")])
+        self.assertEqual(list(table.entries), [registry.flow_key("10.0.0.1", "10.0.0.2")])
+
+    def test_switch_lookup_uses_packet_address_ids(self):
+        emulator = Emulator()
+        switch = Switch("Switch1")
+        switch.install_flow(("10.0.0.1", "10.0.0.2"), {"out_port": 1})
+        emulator.add_node(switch)
+        packet = Packet(src="10.0.0.1", dst="10.0.0.2", payload="x")
+        self.assertEqual(switch.flow_table.lookup(packet), {"out_port": 1})
+        # 一度求めたアドレス ID はパケットに記録される
+        self.assertEqual(packet.src_id, emulator.addresses.ip_ids["10.0.0.1"])
+        self.assertEqual(switch.flow_table[("10.0.0.1", "10.0.0.2")], {"out_port": 1})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from components.group_table import flow_hash
+from components.switch import Switch
+from core.packet import Packet
+
+class FakeLink:
+    # 状態だけを持つリンク
+    def __init__(self):
+        self.up = True
+
+class RecordingSwitch(Switch):
+    # 送信したパケットをリンクに渡さずに記録するスイッチ
+    def __init__(self, name):
+        super().__init__(name)
+        self.outputs = []
+        self.links = [FakeLink() for _ in range(4)]
+
+    def send_packet(self, packet, out_port):
+        self.outputs.append((out_port, packet.src_port))
+
+class TestGroupTable(unittest.TestCase):
+    def setUp(self):
+        self.switch = RecordingSwitch("Switch1")
+
+    def test_all_group_copies_to_every_bucket(self):
+        self.switch.install_group(1, "all", [{"actions": {"out_port": 1}}, {"actions": {"out_port": 2}}])
+        self.switch.install_flow({"dst": "10.0.1.0/24"}, {"group": 1}, priority=10)
+        self.switch.receive_packet(Packet("10.0.0.1", "10.0.1.5", src_port=5), 0)
+        self.assertEqual(self.switch.outputs, [(1, 5), (2, 5)])
+        self.assertEqual(self.switch.get_group_stats()[0]["bucket_packets"], [1, 1])
+
+    def test_select_group_keeps_flows_on_one_bucket(self):
+        self.switch.install_group(1, "select", [
+            {"actions": {"out_port": 1}}, {"actions": {"out_port": 2}}, {"actions": {"out_port": 3}, "weight": 2},
+        ])
+        self.switch.install_flow({"dst": "10.0.1.0/24"}, {"group": 1}, priority=10)
+        ports = {}
+        for src_port in range(200):
+            for _ in range(2):
+                self.switch.receive_packet(Packet("10.0.0.1", "10.0.1.5", src_port=src_port), 0)
+        for out_port, src_port in self.switch.outputs:
+            ports.setdefault(src_port, set()).add(out_port)
+        self.assertTrue(all(len(chosen) == 1 for chosen in ports.values()))
+        self.assertTrue(all(count > 0 for count in self.switch.get_group_stats()[0]["bucket_packets"]))
+
+        # ダウンしたポートのフローだけが他のバケットに移る
+        self.switch.links[3].up = False
+        self.switch.outputs = []
+        for src_port in range(200):
+            self.switch.receive_packet(Packet("10.0.0.1", "10.0.1.5", src_port=src_port), 0)
+        for out_port, src_port in self.switch.outputs:
+            self.assertNotEqual(out_port, 3)
+            if ports[src_port] != {3}:
+                self.assertEqual({out_port}, ports[src_port])
+
+    def test_flow_hash_ignores_protocol_case(self):
+        for protocol in ("udp", "tcp"):
+            lower = Packet("10.0.0.1", "10.0.1.5", protocol=protocol, src_port=5000, dst_port=53)
+            upper = Packet("10.0.0.1", "10.0.1.5", protocol=protocol.upper(), src_port=5000, dst_port=53)
+            self.assertEqual(flow_hash(lower), flow_hash(upper))
+
+    def test_fast_failover_uses_first_live_bucket(self):
+        self.switch.install_group(1, "fast_failover", [{"actions": {"out_port": 1}}, {"actions": {"out_port": 2}}])
+        self.switch.install_flow(("10.0.0.1", "10.0.0.2"), {"group": 1})
+        packet = Packet("10.0.0.1", "10.0.0.2")
+        self.switch.receive_packet(packet.copy(), 0)
+        self.switch.links[1].up = False
+        self.switch.receive_packet(packet.copy(), 0)
+        self.switch.links[2].up = False
+        self.switch.receive_packet(packet.copy(), 0)
+        self.assertEqual([port for port, _ in self.switch.outputs], [1, 2])
+        self.assertEqual(self.switch.get_group_stats()[0]["dropped_packets"], 1)
+
+    def test_modify_and_remove_group(self):
+        with self.assertRaises(ValueError):
+            self.switch.install_flow(("10.0.0.1", "10.0.0.2"), {"group": 9})
+        with self.assertRaises(ValueError):
+            self.switch.install_group(1, "indirect", [])
+        self.switch.install_group(1, "all", [{"actions": {"out_port": 1}}])
+        self.switch.install_flow(("10.0.0.1", "10.0.0.2"), {"group": 1})
+        self.switch.install_group(1, "all", [{"actions": {"out_port": 3}}])
+        self.switch.receive_packet(Packet("10.0.0.1", "10.0.0.2"), 0)
+        self.assertEqual(self.switch.outputs, [(3, 0)])
+        self.assertTrue(self.switch.remove_group(1))
+        self.assertEqual(self.switch.get_flow_stats(), [])
+
+    def test_remove_group_purges_routes(self):
+        self.switch.install_group(1, "all", [{"actions": {"out_port": 2}}])
+        self.switch.add_route("10.0.0.0/8", {"out_port": 1})
+        self.switch.add_route("10.0.1.0/24", {"group": 1})
+        self.switch.receive_packet(Packet("10.0.0.1", "10.0.1.5"), 0)
+        self.assertTrue(self.switch.remove_group(1))
+        self.assertEqual(len(self.switch.routing_table), 1)
+        self.switch.receive_packet(Packet("10.0.0.1", "10.0.1.5"), 0)
+        self.assertEqual(self.switch.outputs, [(2, 0), (1, 0)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@ import unittest
 from components.host import Host
 from components.link import Link
 from core.packet import Packet
+from core.emulator import Emulator
 
 class TestLink(unittest.TestCase):
     def setUp(self):
@@ -28,4 +29,49 @@ class TestLink(unittest.TestCase):
         self.link.transfer_packet(packet, self.host1)
 
         # パケットが正しく転送されたことを確認
-        self.assertEqual(self.host2.get_packets_received(), 1, "パケットが Host2 に到達していません")
\ No newline at end of file
+        self.assertEqual(self.host2.get_packets_received(), 1, "パケットが Host2 に到達していません")
+
+    def test_ports_are_assigned_once_at_attach_time(self):
+        link = Link(node1=self.host1, node2=self.host2)
+        # 既に接続されたリンクを再度追加してもポートは増えない
+        self.assertEqual(self.host1.add_link(link), 1)
+        self.assertEqual([port.number for port in self.host1.ports], [0, 1])
+        self.assertIs(self.host2.ports[1].link, link)
+        self.assertEqual(link.port_map[self.host1], (1, 1))
+        self.assertEqual(self.link.get_port_number(self.host2), 0)
+
+    def test_transfer_packet_with_emulator_uses_virtual_time(self):
+        emulator = Emulator()
+        emulator.add_node(self.host1)
+        emulator.add_node(self.host2)
+        packet = Packet(src="10.0.0.1", dst="10.0.0.2", payload="Test Payload", protocol="TCP")
+
+        self.link.transfer_packet(packet, self.host1)
+        # 配送はイベントとしてスケジュールされ、まだ到達していない
+        self.assertEqual(self.host2.get_packets_received(), 0)
+
+        emulator.run_simulation(duration=1)
+        self.assertEqual(self.host2.get_packets_received(), 1)
+        # シリアライズ時間（12 バイト / 100 Mbps）と伝搬遅延の合計で到着する
+        serialization = len("Test Payload") * 8 / (self.link.bandwidth * 1_000_000)
+        self.assertAlmostEqual(emulator.current_time, serialization + self.link.delay / 1000.0)
+
+    def test_egress_queue_tail_drop(self):
+        emulator = Emulator()
+        emulator.add_node(self.host1)
+        emulator.add_node(self.host2)
+        link = Link(node1=self.host1, node2=self.host2, bandwidth=1, delay=1, buffer_bytes=250)
+
+        for _ in range(3):
+            link.transfer_packet(Packet(src="10.0.0.1", dst="10.0.0.2", payload="x" * 100), self.host1)
+
+        # 容量 250 バイトのキューには 100 バイトのパケットが 2 つしか入らない
+        stats = link.get_queue_stats()[("Host1", "Host2")]
+        self.assertEqual(stats["sent_packets"], 2)
+        self.assertEqual(stats["dropped_packets"], 1)
+        self.assertEqual(stats["dropped_bytes"], 100)
+
+        emulator.run_simulation(duration=1)
+        self.assertEqual(self.host2.get_packets_received(), 2)
+        # 2 パケット目は 1 パケット目の送信完了を待ってから送信される
+        self.assertAlmostEqual(emulator.current_time, 2 * 100 * 8 / 1_000_000 + 0.001)
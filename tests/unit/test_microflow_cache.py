@@ -0,0 +1,33 @@
+import unittest
+from components.microflow_cache import MicroflowCache
+from components.switch import Switch
+from core.packet import Packet
+
+class TestMicroflowCache(unittest.TestCase):
+    def test_lru_eviction_and_counters(self):
+        cache = MicroflowCache(capacity=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)  # "a" が最近参照されたため "b" が削除される
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        stats = cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"], stats["entries"]), (1, 1, 1, 2))
+
+    def test_switch_caches_wildcard_results_and_invalidates(self):
+        switch = Switch("Switch1")
+        switch.install_flow({"dst": "10.0.0.0/24"}, {"out_port": 1}, priority=10)
+        packet = Packet("10.0.0.1", "10.0.0.2", protocol="TCP", dst_port=80)
+        self.assertEqual(switch.lookup_flow(packet, 0), {"out_port": 1})
+        self.assertEqual(switch.lookup_flow(packet, 0), {"out_port": 1})
+        self.assertEqual(switch.microflow_cache.hits, 1)
+
+        # より優先度の高いエントリを追加するとキャッシュは破棄される
+        switch.install_flow({"dst": "10.0.0.2", "dst_port": 80}, {"out_port": 2}, priority=20)
+        self.assertEqual(switch.lookup_flow(packet, 0), {"out_port": 2})
+        self.assertTrue(switch.remove_flow({"dst": "10.0.0.2", "dst_port": 80}, priority=20))
+        self.assertEqual(switch.lookup_flow(packet, 0), {"out_port": 1})
+        self.assertEqual(switch.microflow_cache.invalidations, 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import pickle
+import unittest
+from core.packet import Packet, PacketPool
+
+class TestPacket(unittest.TestCase):
+    def test_header_fields_and_size(self):
+        packet = Packet(src_ip="10.0.0.1", dst_ip="10.0.0.2", src_mac="00:00:00:00:00:01", src_port=1234, size_bytes=1500)
+        self.assertEqual((packet.src, packet.dst), ("10.0.0.1", "10.0.0.2"))
+        self.assertEqual(packet.size_bytes, 1500)
+        self.assertIsNone(packet.payload)
+        # サイズを省略した場合はペイロードの長さ
+        self.assertEqual(Packet("10.0.0.1", "10.0.0.2", "Hello").size_bytes, 5)
+        self.assertFalse(hasattr(packet, "__dict__"))
+
+    def test_pool_recycles_released_packets(self):
+        pool = PacketPool()
+        first = pool.acquire("10.0.0.1", "10.0.0.2", size_bytes=100)
+        first.release()
+        second = pool.acquire("10.0.0.3", "10.0.0.4", size_bytes=200)
+        self.assertIs(first, second)
+        self.assertEqual((second.src, second.size_bytes, second.ttl), ("10.0.0.3", 200, 64))
+        self.assertEqual((pool.allocated, pool.reused), (1, 1))
+
+    def test_pickle_drops_pool_reference(self):
+        packet = PacketPool().acquire("10.0.0.1", "10.0.0.2", "data", flow_id=7)
+        copy = pickle.loads(pickle.dumps(packet))
+        self.assertIsNone(copy.pool)
+        self.assertEqual((copy.payload, copy.flow_id, copy.size_bytes), ("data", 7, 4))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+from components.switch import Switch
+from controller.base_controller import BaseController
+from core.emulator import Emulator
+from core.packet import Packet
+
+class RecordingController(BaseController):
+    def __init__(self, reactive=False):
+        super().__init__()
+        self.reactive = reactive
+        self.packet_ins = []
+
+    def handle_packet_in(self, packet, switch, in_port, buffer_id=None):
+        self.packet_ins.append((packet.dst, buffer_id))
+        if self.reactive:
+            self.send_flow_mod(switch, (packet.src, packet.dst), {"out_port": 0})
+
+class TestPacketIn(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator()
+
+    def make_switch(self, controller, **kwargs):
+        switch = Switch("Switch1", **kwargs)
+        self.emulator.add_node(switch)
+        controller.add_switch(switch)
+        return switch
+
+    def test_one_packet_in_per_flow_and_release_on_flow_mod(self):
+        controller = RecordingController()
+        switch = self.make_switch(controller)
+        for _ in range(5):
+            switch.receive_packet(Packet("10.0.0.1", "10.0.0.2", size_bytes=100), 0)
+        self.assertEqual(controller.packet_ins, [("10.0.0.2", 0)])
+        self.assertEqual((switch.buffered_packets, switch.coalesced_packets), (5, 4))
+
+        controller.send_flow_mod(switch, ("10.0.0.1", "10.0.0.2"), {"out_port": 0})
+        self.assertEqual(switch.miss_buffers, {})
+        self.assertEqual(switch.buffered_packets, 0)
+        self.assertEqual(switch.get_flow_stats()[0]["packet_count"], 5)
+
+    def test_reactive_controller_receives_single_packet_in(self):
+        controller = RecordingController(reactive=True)
+        switch = self.make_switch(controller)
+        for _ in range(3):
+            switch.receive_packet(Packet("10.0.0.1", "10.0.0.2"), 0)
+        self.assertEqual(len(controller.packet_ins), 1)
+        self.assertEqual(switch.get_aggregate_stats()["packet_count"], 3)
+
+    def test_token_bucket_limits_packet_in_rate(self):
+        controller = RecordingController()
+        switch = self.make_switch(controller, packet_in_rate=2)
+        for index in range(5):
+            switch.receive_packet(Packet("10.0.0.1", f"10.0.0.{index + 2}"), 0)
+        self.assertEqual(len(controller.packet_ins), 2)
+        self.assertEqual((switch.throttled_packet_ins, switch.miss_drops), (3, 3))
+
+    def test_flow_mod_releases_only_its_buffer(self):
+        controller = RecordingController()
+        switch = self.make_switch(controller)
+        switch.receive_packet(Packet("10.0.0.1", "10.0.1.5"), 0)
+        switch.receive_packet(Packet("10.0.0.1", "10.0.2.5"), 0)
+        # ワイルドカードのエントリは buffer_id を指定したバッファだけを解放する
+        controller.send_flow_mod(switch, {"dst": "10.0.0.0/16"}, {"out_port": 0}, priority=10, buffer_id=1)
+        self.assertEqual(list(switch.miss_buffers), [0])
+        self.assertEqual(switch.get_aggregate_stats()["packet_count"], 1)
+        controller.send_flow_mod(switch, {"dst": "10.0.0.0/16"}, {"out_port": 0}, priority=10, buffer_id=0)
+        self.assertEqual((switch.miss_buffers, switch.pending_pairs), ({}, {}))
+
+    def test_full_miss_buffer_counts_and_releases_packet(self):
+        controller = RecordingController(reactive=True)
+        switch = self.make_switch(controller, miss_buffer_size=1)
+        pool = self.emulator.packet_pool
+        switch.receive_packet(pool.acquire("10.0.0.1", "10.0.0.2"), 0)
+        # 応答を待つ間にバッファが満杯になる
+        controller.reactive = False
+        switch.receive_packet(pool.acquire("10.0.0.1", "10.0.0.3"), 0)
+        switch.receive_packet(pool.acquire("10.0.0.1", "10.0.0.4"), 0)
+        self.assertEqual(controller.packet_ins, [("10.0.0.2", 0), ("10.0.0.3", 1), ("10.0.0.4", None)])
+        self.assertEqual((switch.miss_drops, len(pool.free)), (1, 1))
+
+    def test_unanswered_buffer_expires(self):
+        controller = RecordingController()
+        switch = self.make_switch(controller, packet_in_timeout=0.5)
+        switch.receive_packet(Packet("10.0.0.1", "10.0.0.2"), 0)
+        self.emulator.run_simulation(1.0)
+        self.assertEqual((switch.buffered_packets, switch.miss_drops), (0, 1))
+        switch.receive_packet(Packet("10.0.0.1", "10.0.0.2"), 0)
+        self.assertEqual(len(controller.packet_ins), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from components.actions import compile_action
+from components.switch import Switch
+from core.packet import Packet
+
+class RecordingSwitch(Switch):
+    # 送信したパケットをリンクに渡さずに記録するスイッチ
+    def __init__(self, name):
+        super().__init__(name)
+        self.outputs = []
+
+    def send_packet(self, packet, out_port):
+        self.outputs.append((out_port, packet.dst, packet.dst_port))
+
+class TestCompileAction(unittest.TestCase):
+    def test_rejects_invalid_actions(self):
+        with self.assertRaises(ValueError):
+            compile_action({"flood": True}, print)
+        with self.assertRaises(ValueError):
+            compile_action({"set_field": {"payload": "x"}}, print)
+        with self.assertRaises(ValueError):
+            compile_action({"goto_table": 1}, print, table_id=1)
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.switch = RecordingSwitch("Switch1")
+
+    def test_goto_table_with_set_field_and_multiple_outputs(self):
+        self.switch.install_flow(
+            {"dst": "10.0.1.0/24"}, {"set_field": {"dst_port": 8080}, "goto_table": 1}, priority=100
+        )
+        self.switch.install_flow({"dst_port": 8080}, {"out_port": [1, 2]}, priority=10, table_id=1)
+        self.switch.receive_packet(Packet("10.0.0.1", "10.0.1.5", dst_port=80), 0)
+        self.assertEqual(self.switch.outputs, [(1, "10.0.1.5", 8080), (2, "10.0.1.5", 8080)])
+
+        stats = self.switch.get_pipeline_stats()
+        self.assertEqual([table["lookups"] for table in stats["tables"]], [1, 1])
+        self.assertEqual([table["matches"] for table in stats["tables"]], [1, 1])
+        self.assertEqual((stats["average_depth"], stats["max_depth"]), (2.0, 2))
+        # flow_table や lookup_flow は変換前のアクションの辞書を返す
+        self.assertEqual(
+            self.switch.lookup_flow(Packet("10.0.0.1", "10.0.1.5"), 0), {"set_field": {"dst_port": 8080}, "goto_table": 1}
+        )
+
+    def test_write_actions_run_at_end_of_pipeline(self):
+        self.switch.install_flow(("10.0.0.1", "10.0.0.2"), {"out_port": 3})
+        self.assertEqual(self.switch.flow_table[("10.0.0.1", "10.0.0.2")], {"out_port": 3})
+        self.switch.install_flow(
+            {"src": "10.0.0.9"}, {"write_actions": {"out_port": 1, "set_field": {"dst": "10.0.0.7"}}, "goto_table": 2},
+            priority=5,
+        )
+        self.switch.install_flow({"protocol": "UDP"}, {"clear_actions": True, "out_port": 4}, priority=5, table_id=2)
+        self.switch.install_flow({"protocol": "TCP"}, {"set_field": {"dst_port": 22}}, priority=5, table_id=2)
+        self.switch.receive_packet(Packet("10.0.0.1", "10.0.0.2"), 0)
+        self.switch.receive_packet(Packet("10.0.0.9", "10.0.0.2", protocol="TCP", dst_port=80), 0)
+        self.switch.receive_packet(Packet("10.0.0.9", "10.0.0.2", protocol="UDP", dst_port=80), 0)
+        self.assertEqual(self.switch.outputs, [(3, "10.0.0.2", 0), (1, "10.0.0.7", 22), (4, "10.0.0.2", 80)])
+
+    def test_drop_and_table_miss_in_later_table(self):
+        self.switch.install_flow({"dst": "10.0.0.2"}, {"drop": True}, priority=5)
+        self.switch.install_flow({"dst": "10.0.0.3"}, {"goto_table": 1, "out_port": 1}, priority=5)
+        self.switch.receive_packet(Packet("10.0.0.1", "10.0.0.2"), 0)
+        self.switch.receive_packet(Packet("10.0.0.1", "10.0.0.3"), 0)
+        # テーブル 1 が無い場合も out_port は直ちに実行される
+        self.assertEqual(self.switch.outputs, [(1, "10.0.0.3", 0)])
+        self.assertEqual(self.switch.get_pipeline_stats()["tables"][0]["matches"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import struct
+import tempfile
+import unittest
+from components.host import Host
+from components.link import Link
+from core.emulator import Emulator
+from core.packet import Packet
+from core.wire import encode
+from monitoring.capture import CaptureTap
+from traffic.replay import ReplaySource, iter_pcap
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.emulator = Emulator()
+        self.host1 = Host(name="Host1", ip_address="10.0.0.1", mac_address="00:00:00:00:00:01")
+        self.host2 = Host(name="Host2", ip_address="10.0.0.2", mac_address="00:00:00:00:00:02")
+        self.emulator.add_node(self.host1)
+        self.emulator.add_node(self.host2)
+        Link(node1=self.host1, node2=self.host2, delay=1, buffer_bytes=10**6)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_csv_trace_is_replayed_at_scaled_times(self):
+        path = os.path.join(self.folder.name, "trace.csv")
+        with open(path, "w") as file:
+            file.write("timestamp,src,dst,size_bytes,protocol\n")
+            file.write("100.0,10.0.0.1,10.0.0.2,500,UDP\n")
+            file.write("101.0,10.0.0.1,10.0.0.2,500,UDP\n")
+            file.write("102.0,10.0.0.9,10.0.0.2,500,UDP\n")
+        sent_times = []
+        original_send = self.host1.send_packet
+        self.host1.send_packet = lambda packet, port: (sent_times.append(self.emulator.current_time), original_send(packet, port))
+        replay = ReplaySource(self.emulator, path, time_scale=0.5)
+        replay.start()
+        self.emulator.run_simulation(10)
+        self.assertEqual(sent_times, [0.0, 0.5])
+        self.assertEqual((replay.injected_packets, replay.skipped_packets), (2, 1))
+        self.assertEqual(self.host2.get_bytes_received(), 1000)
+
+    def test_pcap_written_by_capture_is_replayed(self):
+        path = os.path.join(self.folder.name, "trace.pcap")
+        with CaptureTap(path) as tap:
+            for index in range(3):
+                tap.capture(Packet("10.0.0.1", "10.0.0.2", "data", size_bytes=200), 5.0 + index * 0.25)
+        self.assertEqual([timestamp for timestamp, _ in iter_pcap(path)], [5.0, 5.25, 5.5])
+        replay = ReplaySource(self.emulator, path)
+        replay.start()
+        self.emulator.run_simulation(10)
+        self.assertEqual(self.host2.get_packets_received(), 3)
+        self.assertEqual(self.host2.get_bytes_received(), 600)
+
+    def test_pcap_uses_ihl_and_skips_truncated_ports(self):
+        # IHL=6（4 バイトのオプション付き）の UDP フレーム
+        frame = bytearray(encode(Packet("10.0.0.1", "10.0.0.2", protocol="UDP", src_port=5000, dst_port=53, size_bytes=100)))
+        frame[14] = 0x46
+        frame[34:34] = bytes(4)
+        struct.pack_into("!H", frame, 16, struct.unpack_from("!H", frame, 16)[0] + 4)
+        records = [bytes(frame), bytes(frame[:14 + 24 + 2]), encode(Packet("10.0.0.1", "10.0.0.2", protocol="TCP", src_port=7, dst_port=80))]
+        path = os.path.join(self.folder.name, "options.pcap")
+        with open(path, "wb") as file:
+            file.write(struct.pack("<IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, 65535, 1))
+            for index, record in enumerate(records):
+                file.write(struct.pack("<IIII", index, 0, len(record), len(record)))
+                file.write(record)
+        fields = [(timestamp, record["src_port"], record["dst_port"], record["size_bytes"]) for timestamp, record in iter_pcap(path)]
+        self.assertEqual(fields, [(0.0, 5000, 53, 100), (2.0, 7, 80, 0)])
+
+if __name__ == '__main__':
+    unittest.main()
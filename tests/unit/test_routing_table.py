@@ -0,0 +1,67 @@
+import ipaddress
+import random
+import unittest
+from components.routing_table import RoutingTable
+from components.switch import Switch
+from core.packet import Packet
+
+class TestRoutingTable(unittest.TestCase):
+    def test_longest_prefix_wins(self):
+        table = RoutingTable()
+        table.add_route("0.0.0.0/0", "default")
+        table.add_route("10.0.0.0/8", "a")
+        table.add_route("10.1.2.0/24", "c")
+        table.add_route("10.1.0.0/16", "b")
+        table.add_route("10.1.2.3/32", "d")
+        self.assertEqual(table.lookup_address("10.1.2.3"), "d")
+        self.assertEqual(table.lookup_address("10.1.2.4"), "c")
+        self.assertEqual(table.lookup_address("10.1.9.9"), "b")
+        self.assertEqual(table.lookup_address("10.200.0.1"), "a")
+        self.assertEqual(table.lookup_address("192.168.0.1"), "default")
+        self.assertTrue(table.remove_route("10.1.2.0/24"))
+        self.assertEqual(table.lookup_address("10.1.2.4"), "b")
+
+    def test_matches_linear_search(self):
+        rng = random.Random(1)
+        routes = []
+        for index in range(300):
+            length = rng.choice([4, 12, 16, 19, 24, 27, 32])
+            routes.append((str(ipaddress.IPv4Network((rng.getrandbits(32), length), strict=False)), index))
+        table = RoutingTable()
+        table.bulk_load(routes)
+        networks = [(ipaddress.IPv4Network(prefix), action) for prefix, action in dict(routes).items()]
+        for _ in range(500):
+            address = ipaddress.IPv4Address(rng.getrandbits(32))
+            matches = [(network.prefixlen, action) for network, action in networks if address in network]
+            expected = max(matches)[1] if matches else None
+            self.assertEqual(table.lookup(int(address)), expected)
+
+    def test_remove_restores_covering_routes(self):
+        rng = random.Random(2)
+        routes = {}
+        for index in range(300):
+            length = rng.choice([0, 8, 12, 16, 19, 24, 27, 32])
+            routes[str(ipaddress.IPv4Network((rng.getrandbits(32) & 0x0A0FFFFF, length), strict=False))] = index
+        table = RoutingTable()
+        table.bulk_load(routes.items())
+        for prefix in rng.sample(sorted(routes), len(routes) * 2 // 3):
+            self.assertTrue(table.remove_route(prefix))
+            del routes[prefix]
+        self.assertFalse(table.remove_route("192.0.2.0/24"))
+        networks = [(ipaddress.IPv4Network(prefix), action) for prefix, action in routes.items()]
+        for _ in range(1000):
+            address = ipaddress.IPv4Address(rng.getrandbits(32) & 0x0A0FFFFF)
+            matches = [(network.prefixlen, action) for network, action in networks if address in network]
+            expected = max(matches)[1] if matches else None
+            self.assertEqual(table.lookup(int(address)), expected)
+
+    def test_switch_falls_back_to_routes(self):
+        switch = Switch("Switch1")
+        switch.load_routes([("10.0.1.0/24", {"out_port": 2})])
+        switch.install_flow(("10.0.0.1", "10.0.1.5"), {"out_port": 1})
+        self.assertEqual(switch.lookup_flow(Packet("10.0.0.1", "10.0.1.5"), 0), {"out_port": 1})
+        self.assertEqual(switch.lookup_flow(Packet("10.0.0.9", "10.0.1.5"), 0), {"out_port": 2})
+        self.assertIsNone(switch.lookup_flow(Packet("10.0.0.9", "10.0.2.5"), 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,7 @@
 
 import unittest
 from components.switch import Switch
-from core.packet import Packet
+from core.packet import Packet, PacketPool
 
 class TestSwitch(unittest.TestCase):
 
@@ -23,5 +23,16 @@ class TestSwitch(unittest.TestCase):
             self.switch.receive_packet(packet, 1)
             self.assertIn("パケットに対するフローエントリが存在しません", log.output[0])
 
+    def test_dropped_packets_return_to_pool(self):
+        pool = PacketPool()
+        # コントローラが無いスイッチのテーブルミス
+        self.switch.receive_packet(pool.acquire("10.0.0.1", "10.0.0.2"), 1)
+        self.assertEqual((self.switch.miss_drops, len(pool.free)), (1, 1))
+        # 待ち行列が満杯の場合
+        self.switch.buffer.extend([(None, 0)] * self.switch.buffer_size)
+        self.switch.receive_packet(pool.acquire("10.0.0.1", "10.0.0.2"), 1)
+        self.assertEqual((self.switch.buffer_drops, len(pool.free)), (1, 1))
+        self.assertEqual(pool.reused, 1)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,81 @@
+import unittest
+from components.switch import Switch
+from controller.base_controller import BaseController
+from core.emulator import Emulator
+from core.packet import Packet
+from core.timing_wheel import TimingWheel
+
+class RecordingController(BaseController):
+    def __init__(self):
+        super().__init__()
+        self.removed = []
+
+    def handle_packet_in(self, packet, switch, in_port, buffer_id=None):
+        pass
+
+    def handle_flow_removed(self, switch, entry, reason, stats):
+        self.removed.append((switch.emulator.current_time, entry.match, reason))
+
+class TestTimingWheel(unittest.TestCase):
+    def test_timers_expire_in_order_across_levels(self):
+        wheel = TimingWheel(tick=0.01, wheel_size=8, levels=2)
+        deadlines = [0.05, 0.3, 0.7, 2.5, 40.0]  # 最後の期限はホイール全体の範囲（0.64 秒）を超える
+        for deadline in reversed(deadlines):
+            wheel.add(deadline, deadline)
+        expired = []
+        while len(wheel):
+            now = wheel.next_expiry_time()
+            for item in wheel.advance(now):
+                self.assertGreaterEqual(now, item - 1e-9)
+                expired.append(item)
+        self.assertEqual(expired, deadlines)
+
+    def test_cancel(self):
+        wheel = TimingWheel(tick=0.1)
+        handle = wheel.add(1.0, "a")
+        wheel.add(2.0, "b")
+        self.assertTrue(wheel.cancel(handle))
+        self.assertFalse(wheel.cancel(handle))
+        self.assertEqual(wheel.advance(5.0), ["b"])
+        self.assertIsNone(wheel.next_expiry_time())
+
+class TestFlowTimeouts(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator()
+        self.switch = Switch("Switch1")
+        self.emulator.add_node(self.switch)
+        self.controller = RecordingController()
+        self.controller.add_switch(self.switch)
+
+    def test_hard_timeout_removes_entry_and_notifies_controller(self):
+        self.controller.send_flow_mod(self.switch, ("10.0.0.1", "10.0.0.2"), {"out_port": 1}, hard_timeout=2.0)
+        self.emulator.run_simulation(1.9)
+        self.assertIn(("10.0.0.1", "10.0.0.2"), self.switch.flow_table)
+        self.emulator.run_simulation(3.0)
+        self.assertNotIn(("10.0.0.1", "10.0.0.2"), self.switch.flow_table)
+        self.assertEqual(self.controller.removed, [(2.0, ("10.0.0.1", "10.0.0.2"), "hard_timeout")])
+
+    def test_idle_timeout_is_extended_by_matching_packets(self):
+        match = {"dst": "10.0.0.0/24"}
+        self.switch.install_flow(match, {"out_port": 1}, priority=10, idle_timeout=1.0)
+        packet = Packet("10.0.0.1", "10.0.0.2")
+        for delay in (0.5, 1.2):
+            self.emulator.schedule_timer(delay, lambda: self.switch.lookup_flow(packet, 0))
+        self.emulator.run_simulation(2.0)
+        self.assertEqual(len(self.switch.classifier), 1)
+        self.emulator.run_simulation(1.0)
+        self.assertEqual(len(self.switch.classifier), 0)
+        self.assertIsNone(self.switch.lookup_flow(packet, 0))
+        time, removed_match, reason = self.controller.removed[0]
+        self.assertAlmostEqual(time, 2.2)
+        self.assertEqual((removed_match, reason), (match, "idle_timeout"))
+
+    def test_removed_entry_does_not_expire(self):
+        self.switch.install_flow(("10.0.0.1", "10.0.0.2"), {"out_port": 1}, idle_timeout=1.0)
+        self.assertTrue(self.switch.remove_flow(("10.0.0.1", "10.0.0.2")))
+        self.emulator.run_simulation(5.0)
+        self.assertEqual(self.controller.removed, [])
+        self.assertEqual(len(self.switch.flow_timeouts), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import json
+import os
+import tempfile
+import unittest
+from components.host import Host
+from components.link import Link
+from core.emulator import Emulator
+from core.packet import Packet
+from core.tracing import Tracer, tracer, LEVEL_OFF, LEVEL_PACKET, TRACE_SEND
+
+class TestTracer(unittest.TestCase):
+    def test_disabled_tracer_has_no_enabled_tracepoints(self):
+        disabled = Tracer()
+        self.assertEqual((disabled.drops, disabled.control, disabled.packets), (False, False, False))
+        control = Tracer("control")
+        self.assertEqual((control.drops, control.control, control.packets), (True, True, False))
+        with self.assertRaises(ValueError):
+            Tracer("verbose")
+
+    def test_ring_keeps_latest_records(self):
+        ring = Tracer(LEVEL_PACKET, capacity=2)
+        host = Host("Host1", "10.0.0.1", "00:00:00:00:00:01")
+        packets = [Packet("10.0.0.1", "10.0.0.2", size_bytes=size) for size in (10, 20, 30)]
+        for port, packet in enumerate(packets):
+            ring.record(TRACE_SEND, host, packet, port)
+        self.assertEqual(ring.overwritten, 1)
+        self.assertEqual(ring.records(), [(0.0, "Host1", "send", 1, 2, 20), (0.0, "Host1", "send", 2, 3, 30)])
+        self.assertEqual(ring.format_text()[0], "0.000000000 Host1 send port=1 packet=2 bytes=20")
+
+class TestTracepoints(unittest.TestCase):
+    def setUp(self):
+        tracer.configure(LEVEL_PACKET, capacity=16)
+        self.folder = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        tracer.configure(LEVEL_OFF, capacity=65536)
+        self.folder.cleanup()
+
+    def test_packet_is_traced_across_link_with_virtual_time(self):
+        emulator = Emulator()
+        host1 = Host("Host1", "10.0.0.1", "00:00:00:00:00:01")
+        host2 = Host("Host2", "10.0.0.2", "00:00:00:00:00:02")
+        emulator.add_node(host1)
+        emulator.add_node(host2)
+        Link(host1, host2, delay=5)
+        host1.send_packet(Packet("10.0.0.1", "10.0.0.2", size_bytes=0), 0)
+        emulator.run_simulation(1.0)
+
+        path = os.path.join(self.folder.name, "trace.jsonl")
+        tracer.write_jsonl(path)
+        with open(path, encoding="utf-8") as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual([(record["node"], record["event"], record["port"]) for record in records],
+                         [("Host1", "send", 0), ("Host2", "receive", 0)])
+        self.assertEqual(records[0]["packet_id"], records[1]["packet_id"])
+        self.assertAlmostEqual(records[1]["time"], 0.005)
+
+if __name__ == '__main__':
+    unittest.main()
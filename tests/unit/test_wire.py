@@ -0,0 +1,35 @@
+import unittest
+from core.packet import Packet
+from core.wire import encode, decode, encode_batch, decode_batch
+
+class TestWire(unittest.TestCase):
+    def test_round_trip_header_fields(self):
+        packet = Packet(
+            src="10.0.0.1", dst="10.0.0.2", payload="Hello", protocol="TCP",
+            src_mac="00:00:00:00:00:01", dst_mac="00:00:00:00:00:02", src_port=5000, dst_port=80, ttl=32,
+        )
+        view = decode(encode(packet))
+        self.assertEqual((view.src, view.dst, view.protocol, view.ttl), ("10.0.0.1", "10.0.0.2", "TCP", 32))
+        self.assertEqual((view.src_mac, view.dst_mac), ("00:00:00:00:00:01", "00:00:00:00:00:02"))
+        self.assertEqual((view.src_port, view.dst_port, view.size_bytes), (5000, 80, 5))
+        self.assertIsInstance(view.payload, memoryview)
+        self.assertEqual(view.to_packet().payload, "Hello")
+
+    def test_batch_keeps_size_without_payload(self):
+        packets = [Packet("10.0.0.1", "10.0.0.2", protocol="UDP", size_bytes=1400), Packet("10.0.0.3", "10.0.0.4", "abc")]
+        buffer, offsets = encode_batch(packets)
+        self.assertEqual(len(buffer), offsets[-1])
+        views = decode_batch(buffer, offsets)
+        self.assertEqual([view.size_bytes for view in views], [1400, 3])
+        self.assertEqual([view.protocol for view in views], ["UDP", "TCP"])
+        self.assertIsNone(views[0].to_packet().payload)
+
+    def test_lowercase_protocol_round_trips(self):
+        for protocol in ("udp", "tcp"):
+            packet = Packet("10.0.0.1", "10.0.0.2", protocol=protocol, src_port=5000, dst_port=53, size_bytes=100)
+            view = decode(encode(packet))
+            self.assertEqual((view.protocol, view.src_port, view.dst_port), (protocol.upper(), 5000, 53))
+            self.assertEqual(view.size_bytes, 100)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -59,9 +59,7 @@ class TopologyBuilder:
         Returns:
             Link: 追加されたリンクオブジェクト。
         """
-        link = Link(node1, node2, bandwidth, delay, packet_loss_rate)
-        node1.add_link(link)
-        node2.add_link(link)
+        link = Link(node1, node2, bandwidth, delay, packet_loss_rate)  # 両端のノードへの接続も行われる
         self.links.append(link)
         return link
 
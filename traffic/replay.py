@@ -0,0 +1,256 @@
+import csv
+import json
+import mmap
+import os
+import struct
+from core.wire import ETHERNET_HEADER, ETHERTYPE_IPV4, L4_OFFSET, decode
+
+# pcap のマジックナンバー -> (バイトオーダー, タイムスタンプの小数部の単位)
+PCAP_MAGICS = {
+    b"\xd4\xc3\xb2\xa1": ("<", 1e-6),
+    b"\xa1\xb2\xc3\xd4": (">", 1e-6),
+    b"\x4d\x3c\xb2\xa1": ("<", 1e-9),
+    b"\xa1\xb2\x3c\x4d": (">", 1e-9),
+}
+PCAP_GLOBAL_HEADER_SIZE = 24
+# CSV / JSON Lines のトレースで使用できる列（タイムスタンプ以外）
+TRACE_FIELDS = {
+    "src": str, "dst": str, "size_bytes": int, "protocol": str,
+    "src_port": int, "dst_port": int, "ttl": int, "flow_id": int, "payload": str,
+}
+
+def _map_file(file_path):
+    # ファイルを読み取り専用でメモリマップする（空のファイルは None）
+    with open(file_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+def iter_pcap(file_path):
+    """
+    pcap ファイルをメモリマップし、IPv4 のレコードを先頭から順に返します。
+    ファイル全体を読み込まないため、大きなトレースでもメモリ使用量はほぼ一定です。
+
+    Args:
+        file_path (str): pcap ファイルのパス（マイクロ秒・ナノ秒精度、両バイトオーダーに対応）。
+
+    Yields:
+        tuple: (タイムスタンプ（秒）, Packet のフィールドの辞書)。
+
+    Raises:
+        ValueError: pcap ファイルとして解釈できない場合に発生。
+    """
+    mapped = _map_file(file_path)
+    if mapped is None:
+        return
+    try:
+        magic = PCAP_MAGICS.get(bytes(mapped[:4]))
+        if magic is None:
+            raise ValueError(f"pcap ファイルとして解釈できません: {file_path}")
+        byte_order, fraction_unit = magic
+        record_header = struct.Struct(byte_order + "IIII")
+        view = memoryview(mapped)
+        try:
+            offset = PCAP_GLOBAL_HEADER_SIZE
+            end = len(mapped)
+            while offset + record_header.size <= end:
+                seconds, fraction, captured_length, _ = record_header.unpack_from(mapped, offset)
+                offset += record_header.size
+                frame_end = offset + captured_length
+                if captured_length >= L4_OFFSET and struct.unpack_from("!H", mapped, offset + ETHERNET_HEADER.size - 2)[0] == ETHERTYPE_IPV4:
+                    packet_view = decode(view[offset:frame_end])
+                    # IHL から求めた位置でポート番号まで取り込まれていないレコードは読み飛ばす
+                    l4_offset = packet_view.l4_offset
+                    if l4_offset < L4_OFFSET or packet_view.has_ports and captured_length < l4_offset + 4:
+                        offset = frame_end
+                        continue
+                    payload = packet_view.payload
+                    yield seconds + fraction * fraction_unit, {
+                        "src": packet_view.src,
+                        "dst": packet_view.dst,
+                        "protocol": packet_view.protocol,
+                        "src_port": packet_view.src_port,
+                        "dst_port": packet_view.dst_port,
+                        "ttl": packet_view.ttl,
+                        "size_bytes": packet_view.size_bytes,
+                        "payload": bytes(payload).decode("utf-8", errors="replace") if len(payload) else None,
+                        "src_mac": packet_view.src_mac,
+                        "dst_mac": packet_view.dst_mac,
+                    }
+                offset = frame_end
+        finally:
+            # メモリマップを閉じられるようにビューへの参照を解放する
+            packet_view = payload = None
+            view.release()
+    finally:
+        mapped.close()
+
+def _iter_lines(file_path):
+    # メモリマップしたファイルを 1 行ずつ返す
+    mapped = _map_file(file_path)
+    if mapped is None:
+        return
+    try:
+        for line in iter(mapped.readline, b""):
+            yield line.decode("utf-8")
+    finally:
+        mapped.close()
+
+def _record_fields(record, file_path):
+    # トレースの 1 レコードを (タイムスタンプ, Packet のフィールドの辞書) に変換する
+    try:
+        timestamp = float(record["timestamp"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"タイムスタンプの無いレコードがあります: {file_path}: {record}")
+    fields = {}
+    for name, convert in TRACE_FIELDS.items():
+        value = record.get(name)
+        if value is not None and value != "":
+            fields[name] = convert(value)
+    return timestamp, fields
+
+def iter_csv(file_path):
+    """
+    ヘッダ行付きの CSV フロートレースを 1 行ずつ返します。
+    列は timestamp（秒、必須）と src、dst、size_bytes、protocol、src_port、dst_port、ttl、flow_id、payload です。
+
+    Args:
+        file_path (str): CSV ファイルのパス。
+
+    Yields:
+        tuple: (タイムスタンプ（秒）, Packet のフィールドの辞書)。
+    """
+    for record in csv.DictReader(_iter_lines(file_path)):
+        yield _record_fields(record, file_path)
+
+def iter_jsonl(file_path):
+    """
+    JSON Lines 形式のフロートレースを 1 行ずつ返します。各行は CSV と同じキーを持つオブジェクトです。
+
+    Args:
+        file_path (str): JSON Lines ファイルのパス。
+
+    Yields:
+        tuple: (タイムスタンプ（秒）, Packet のフィールドの辞書)。
+    """
+    for line in _iter_lines(file_path):
+        if line.strip():
+            yield _record_fields(json.loads(line), file_path)
+
+TRACE_READERS = {"pcap": iter_pcap, "csv": iter_csv, "jsonl": iter_jsonl}
+
+class ReplaySource:
+    """
+    pcap や CSV / JSON Lines のトレースに記録されたパケットを、記録された時刻に従って
+    ホストから送信するトラフィック源。
+
+    トレースはメモリマップして先頭から順に読み進め、次に送信するパケットの時刻にだけ TIMER イベントを
+    スケジュールするため、巨大なトレースでもファイル全体やイベントをまとめて読み込むことはありません。
+    """
+
+    def __init__(self, emulator, file_path, hosts=None, time_scale=1.0, trace_format=None):
+        """
+        リプレイ元を初期化します。
+
+        Args:
+            emulator (Emulator): パケットを送信するエミュレータ。
+            file_path (str): トレースファイルのパス。
+            hosts (dict): 送信元 IP アドレス -> 送信するホストの名前（オプション）。
+                省略した場合は、送信元 IP アドレスと同じ IP アドレスを持つホストから送信します。
+            time_scale (float): 記録された時刻の間隔に掛ける係数（0.5 で 2 倍速、2.0 で半分の速さ）。
+            trace_format (str): "pcap"、"csv"、"jsonl" のいずれか（省略時は拡張子から判定）。
+
+        Raises:
+            ValueError: トレースの形式が不明な場合に発生。
+        """
+        if trace_format is None:
+            extension = os.path.splitext(file_path)[1].lower().lstrip(".")
+            trace_format = {"pcap": "pcap", "cap": "pcap", "csv": "csv", "jsonl": "jsonl", "ndjson": "jsonl"}.get(extension)
+        if trace_format not in TRACE_READERS:
+            raise ValueError(f"トレースの形式を判定できません: {file_path}")
+        self.emulator = emulator
+        self.file_path = file_path
+        self.trace_format = trace_format
+        self.time_scale = time_scale
+        if hosts is None:
+            self.hosts = {
+                node.ip_address: node for node in emulator.nodes.values() if getattr(node, "ip_address", None) is not None
+            }
+        else:
+            self.hosts = {ip_address: emulator.get_node_by_name(name) for ip_address, name in hosts.items()}
+        self.records = None  # トレースのレコードのイテレータ
+        self.pending = None  # 次に送信するレコード
+        self.timer = None  # 次回送信のタイマーのハンドル
+        self.base_time = None  # トレースの最初のレコードの時刻
+        self.start_time = None  # リプレイを開始したシミュレーション時刻
+        # 統計情報の初期化
+        self.injected_packets = 0  # 送信したパケット数
+        self.skipped_packets = 0  # 送信元のホストが見つからず省略したパケット数
+
+    def start(self):
+        """
+        現在のシミュレーション時刻からリプレイを開始します。
+        """
+        self.records = TRACE_READERS[self.trace_format](self.file_path)
+        self.start_time = self.emulator.current_time
+        self.base_time = None
+        self._schedule_next()
+        print(f"トレースのリプレイを開始しました: {self.file_path}")
+
+    def stop(self):
+        """
+        リプレイを停止し、トレースファイルを閉じます。
+        """
+        if self.timer is not None:
+            self.emulator.cancel_event(self.timer)
+            self.timer = None
+        if self.records is not None:
+            self.records.close()
+            self.records = None
+        self.pending = None
+        print(f"トレースのリプレイを停止しました: {self.file_path}（送信 {self.injected_packets}、省略 {self.skipped_packets}）")
+
+    def _virtual_time(self, timestamp):
+        # トレースの時刻をシミュレーション時刻に変換する
+        return self.start_time + (timestamp - self.base_time) * self.time_scale
+
+    def _schedule_next(self):
+        # 次のレコードを読み込み、その時刻にタイマーをスケジュールする
+        self.timer = None
+        self.pending = next(self.records, None)
+        if self.pending is None:
+            self.records = None
+            return
+        if self.base_time is None:
+            self.base_time = self.pending[0]
+        delay = max(0.0, self._virtual_time(self.pending[0]) - self.emulator.current_time)
+        self.timer = self.emulator.schedule_timer(delay, self._on_timer)
+
+    def _on_timer(self):
+        """
+        内部メソッド: 現在時刻までに送信するレコードをすべて送信し、次のレコードをスケジュールします。
+        """
+        emulator = self.emulator
+        now = emulator.current_time
+        while self.pending is not None and self._virtual_time(self.pending[0]) <= now:
+            self._inject(self.pending[1])
+            self.pending = next(self.records, None)
+        if self.pending is None:
+            self.timer = None
+            self.records = None
+            return
+        self.timer = emulator.schedule_timer(self._virtual_time(self.pending[0]) - now, self._on_timer)
+
+    def _inject(self, fields):
+        # レコードからパケットを生成し、送信元のホストから送信する
+        host = self.hosts.get(fields.get("src"))
+        if host is None:
+            self.skipped_packets += 1
+            return
+        fields = dict(fields)
+        packet = self.emulator.packet_pool.acquire(
+            fields.pop("src"), fields.pop("dst", None), fields.pop("payload", None), fields.pop("protocol", "TCP"),
+            timestamp=self.emulator.current_time, **fields,
+        )
+        self.injected_packets += 1
+        host.send_packet(packet, 0)
@@ -8,7 +8,7 @@ class TrafficGenerator:
     特定の送信元から宛先に向けて、定期的にパケットを生成し送信します。
     """
 
-    def __init__(self, source, destination, interval=1.0, payload="Test Packet"):
+    def __init__(self, source, destination, interval=1.0, payload="Test Packet", arrival="constant", size_bytes=None):
         """
         TrafficGenerator の初期化。
 
@@ -17,21 +17,39 @@ class TrafficGenerator:
             destination (str): 宛先のIPアドレス。
             interval (float): パケットを生成する間隔（秒）。
             payload (str): 送信するパケットのペイロード。
+            arrival (str): 送信間隔の分布。"constant" は一定間隔、"poisson" は平均 interval の指数分布
+                （ポアソン到着）です。"poisson" はエミュレータの仮想時間で動作する場合のみ有効です。
+            size_bytes (int): パケットのサイズ（バイト）。省略した場合はペイロードの長さ。
         """
         self.source = source  # 送信元ホスト
         self.destination = destination  # 宛先IPアドレス
         self.interval = interval  # パケットを生成する間隔
         self.payload = payload  # パケットのペイロード
+        if arrival not in ("constant", "poisson"):
+            raise ValueError(f"未対応の到着分布です: {arrival}")
+        self.arrival = arrival  # 送信間隔の分布
+        self.size_bytes = size_bytes  # パケットのサイズ
+        self.stream = None  # ポアソン到着の間隔に使う乱数ストリーム
+        self.flow_ids = None  # (送信元, 宛先) のアドレス ID
         self.running = False  # トラフィック生成を管理するフラグ
         self.thread = None  # トラフィック生成用のスレッド
+        self.timer = None  # 仮想時間で動作する場合の次回送信タイマーのハンドル
 
     def start(self):
         """
         トラフィック生成を開始します。
+        送信元ホストがエミュレータに属している場合は、エミュレータの仮想時間に沿って
+        TIMER イベントでパケットを生成します。それ以外の場合はスレッドで実時間に生成します。
         """
         self.running = True
-        self.thread = threading.Thread(target=self._generate_traffic)
-        self.thread.start()  # 新しいスレッドでトラフィック生成を開始
+        emulator = self.source.emulator
+        if emulator is not None:
+            if self.arrival == "poisson":
+                self.stream = emulator.random.stream(f"traffic:{self.source.name}->{self.destination}")
+            self.timer = emulator.schedule_timer(0, self._on_timer, self.source)
+        else:
+            self.thread = threading.Thread(target=self._generate_traffic)
+            self.thread.start()  # 新しいスレッドでトラフィック生成を開始
         print(f"トラフィック生成を開始しました: {self.source.name} -> {self.destination}")
 
     def stop(self):
@@ -39,16 +57,40 @@ class TrafficGenerator:
         トラフィック生成を停止します。
         """
         self.running = False
+        if self.timer is not None:
+            self.source.emulator.cancel_event(self.timer)  # 次回送信のタイマーを取り消す
+            self.timer = None
         if self.thread:
             self.thread.join()  # スレッドの終了を待つ
         print(f"トラフィック生成を停止しました: {self.source.name} -> {self.destination}")
 
+    def _on_timer(self):
+        """
+        内部メソッド: 仮想時間のタイマーでパケットを 1 つ送信し、次回の送信をスケジュールします。
+        """
+        if not self.running:
+            return
+        emulator = self.source.emulator
+        if self.flow_ids is None:
+            # 送信元と宛先のアドレス ID は一度だけ求め、生成するすべてのパケットに付与する
+            addresses = emulator.addresses
+            self.flow_ids = (addresses.intern_ip(self.source.ip_address), addresses.intern_ip(self.destination))
+        # エミュレータのパケットプールから再利用可能なパケットを取得する
+        packet = emulator.packet_pool.acquire(
+            self.source.ip_address, self.destination, self.payload,
+            size_bytes=self.size_bytes, timestamp=emulator.current_time,
+            src_id=self.flow_ids[0], dst_id=self.flow_ids[1],
+        )
+        self.source.send_packet(packet, 0)  # 送信元ホストからパケットを送信
+        delay = self.interval if self.stream is None else self.stream.expovariate(1.0 / self.interval)
+        self.timer = emulator.schedule_timer(delay, self._on_timer, self.source)
+
     def _generate_traffic(self):
         """
         内部メソッド: 指定した間隔でパケットを生成し、送信元ホストから送信します。
         """
         while self.running:
-            packet = Packet(src=self.source.ip_address, dst=self.destination, payload=self.payload)
+            packet = Packet(src=self.source.ip_address, dst=self.destination, payload=self.payload, size_bytes=self.size_bytes)
             self.source.send_packet(packet, 0)  # 送信元ホストからパケットを送信
             print(f"{self.source.name} から {self.destination} へパケットを送信しました: {self.payload}")
             time.sleep(self.interval)  # 次のパケット生成までの間隔を待機
\ No newline at end of file
@@ -0,0 +1,327 @@
+import contextlib
+import copy
+import csv
+import hashlib
+import io
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# 短縮名 -> シナリオ内のパス（"*" はリストの全要素を表す）
+PARAMETER_ALIASES = {
+    "bandwidth": "network.links.*.bandwidth",
+    "delay": "network.links.*.delay",
+    "packet_loss_rate": "network.links.*.packet_loss_rate",
+    "buffer_size": "network.links.*.buffer_size",
+    "interval": "network.traffic.*.interval",
+}
+
+def load_scenario(network_config_path, controller_config_path, duration=5.0):
+    """
+    設定ファイルからスイープの基準となるシナリオを作成します。
+
+    Args:
+        network_config_path (str): network_config.json のパス。
+        controller_config_path (str): controller_config.json のパス。
+        duration (float): 各実行のシミュレーション期間（秒）。
+
+    Returns:
+        dict: {"network": ..., "controllers": ..., "duration": ...} 形式のシナリオ。
+    """
+    from utils.utility_functions import load_config
+    return {
+        "network": load_config(network_config_path),
+        "controllers": load_config(controller_config_path),
+        "duration": duration,
+    }
+
+def expand_grid(grid):
+    """
+    パラメータグリッドを全組み合わせのリストに展開します。
+
+    Args:
+        grid (dict): パラメータ名 -> 値のリスト。
+
+    Returns:
+        list: パラメータ名 -> 値の辞書のリスト。
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+def sample_random(space, count, seed=0):
+    """
+    パラメータ空間から一様乱数でサンプルを生成します。
+
+    Args:
+        space (dict): パラメータ名 -> (下限, 上限)。
+        count (int): サンプル数。
+        seed (int): 乱数のシード。
+
+    Returns:
+        list: パラメータ名 -> 値の辞書のリスト。
+    """
+    rng = random.Random(seed)
+    return [{name: rng.uniform(low, high) for name, (low, high) in space.items()} for _ in range(count)]
+
+def sample_latin_hypercube(space, count, seed=0):
+    """
+    パラメータ空間からラテン超方格法でサンプルを生成します。
+    各パラメータの範囲を count 個の区間に等分し、各区間から 1 つずつ値を選びます。
+
+    Args:
+        space (dict): パラメータ名 -> (下限, 上限)。
+        count (int): サンプル数。
+        seed (int): 乱数のシード。
+
+    Returns:
+        list: パラメータ名 -> 値の辞書のリスト。
+    """
+    rng = random.Random(seed)
+    samples = [{} for _ in range(count)]
+    for name, (low, high) in space.items():
+        strata = list(range(count))
+        rng.shuffle(strata)
+        for sample, stratum in zip(samples, strata):
+            sample[name] = low + (stratum + rng.random()) / count * (high - low)
+    return samples
+
+def apply_parameters(scenario, params):
+    """
+    シナリオのコピーにパラメータを適用します。
+
+    Args:
+        scenario (dict): 基準となるシナリオ。
+        params (dict): パラメータ名（短縮名またはドット区切りのパス）-> 値。
+
+    Returns:
+        dict: パラメータを適用したシナリオ。
+    """
+    scenario = copy.deepcopy(scenario)
+    for name, value in params.items():
+        path = PARAMETER_ALIASES.get(name, name).split(".")
+        _set_path(scenario, path, value)
+    return scenario
+
+def _set_path(target, path, value):
+    # ドット区切りのパスに沿って値を設定する（"*" はリストの全要素）
+    key, rest = path[0], path[1:]
+    if key == "*":
+        indices = range(len(target))
+    elif isinstance(target, list):
+        indices = [int(key)]
+    else:
+        if not rest:
+            target[key] = value
+        else:
+            _set_path(target.setdefault(key, {}), rest, value)
+        return
+    for index in indices:
+        if not rest:
+            target[index] = value
+        else:
+            _set_path(target[index], rest, value)
+
+def run_scenario(scenario, params, seed, quiet=True):
+    """
+    パラメータを適用したシナリオを 1 回実行し、集計結果を返します。
+    各実行は独自の Emulator とコントローラを使用し、他の実行と状態を共有しません。
+
+    Args:
+        scenario (dict): 基準となるシナリオ。
+        params (dict): 適用するパラメータ。
+        seed (int): 乱数のシード。
+        quiet (bool): True の場合、シミュレーション中の標準出力を抑制します。
+
+    Returns:
+        dict: 実行結果の集計。
+    """
+    from core.emulator import Emulator
+    from components.host import Host
+    from traffic.traffic_generator import TrafficGenerator
+    from utils.utility_functions import build_network_from_config, initialize_controllers
+
+    scenario = apply_parameters(scenario, params)
+    random.seed(seed)
+    started = time.perf_counter()
+    output = io.StringIO() if quiet else None
+    with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+        emulator = Emulator(seed=seed)
+        build_network_from_config(emulator, scenario["network"])
+        initialize_controllers(emulator, scenario["controllers"])
+        generators = []
+        for flow in scenario["network"].get("traffic", []):
+            generator = TrafficGenerator(
+                emulator.get_node_by_name(flow["source"]),
+                flow["destination"],
+                flow.get("interval", 1.0),
+                flow.get("payload", "Test Packet"),
+                flow.get("arrival", "constant"),
+                flow.get("size_bytes"),
+            )
+            generator.start()
+            generators.append(generator)
+        emulator.run_simulation(scenario.get("duration", 5.0))
+        for generator in generators:
+            generator.stop()
+
+    hosts = [node for node in emulator.nodes.values() if isinstance(node, Host)]
+    links = {id(link): link for node in emulator.nodes.values() for link in node.links}.values()
+    egress_queues = [egress for link in links for egress in link.egress_queues.values()]
+    packets_sent = sum(host.get_packets_sent() for host in hosts)
+    packets_received = sum(host.get_packets_received() for host in hosts)
+    return {
+        "packets_sent": packets_sent,
+        "packets_received": packets_received,
+        "bytes_sent": sum(host.get_bytes_sent() for host in hosts),
+        "bytes_received": sum(host.get_bytes_received() for host in hosts),
+        "delivery_ratio": packets_received / packets_sent if packets_sent else 0.0,
+        "dropped_packets": sum(egress.dropped_packets for egress in egress_queues),
+        "max_queued_bytes": max((egress.max_queued_bytes for egress in egress_queues), default=0),
+        "simulated_time": emulator.current_time,
+        "wall_time": time.perf_counter() - started,
+    }
+
+def scenario_fingerprint(scenario):
+    """
+    シナリオの内容から、再開時に同じシナリオの結果かどうかを判定するための識別子を返します。
+
+    Args:
+        scenario (dict): 基準となるシナリオ。
+
+    Returns:
+        str: シナリオを正規化した JSON の SHA-256 の先頭 16 文字。
+    """
+    text = json.dumps(scenario, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+def _run_job(job):
+    # ワーカープロセスで実行する関数（pickle 可能なトップレベル関数）
+    run_id, scenario, fingerprint, params, seed = job
+    return {
+        "run_id": run_id,
+        "scenario": fingerprint,
+        "seed": seed,
+        "duration": scenario.get("duration", 5.0),
+        "params": params,
+        "metrics": run_scenario(scenario, params, seed),
+    }
+
+def load_results(path):
+    """
+    スイープ結果の JSON Lines ファイルを読み込みます。途中で途切れた行は無視します。
+
+    Args:
+        path (str): 結果ファイルのパス。
+
+    Returns:
+        list: 実行結果のリスト。
+    """
+    if not os.path.exists(path):
+        return []
+    rows = []
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return rows
+
+def _repair_tail(path):
+    # 書き込みの途中で中断された末尾の行を切り詰める（解釈できる行に改行が無い場合は改行を補う）
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as file:
+        data = file.read()
+        if not data:
+            return
+        start = data.rfind(b"\n", 0, len(data) - 1) + 1
+        try:
+            json.loads(data[start:])
+        except ValueError:
+            file.truncate(start)
+            return
+        if not data.endswith(b"\n"):
+            file.write(b"\n")
+
+def run_sweep(scenario, parameter_sets, output_path, workers=None, base_seed=0, resume=True):
+    """
+    パラメータの組ごとにシナリオを ProcessPoolExecutor で並列に実行します。
+    各実行の結果は完了した順に JSON Lines ファイルへ追記されるため、中断したスイープは
+    同じ引数で再実行すると未完了の実行のみを再開します。各行にはシナリオの識別子、シード、
+    シミュレーション期間を記録し、再開時にはこれらとパラメータがすべて一致する行だけを再利用します。
+    中断によって末尾に途切れた行が残っている場合は、追記する前に切り詰めます。
+
+    Args:
+        scenario (dict): 基準となるシナリオ。
+        parameter_sets (list): パラメータの辞書のリスト（expand_grid などで生成）。
+        output_path (str): 結果を追記する JSON Lines ファイルのパス。
+        workers (int): ワーカープロセス数（省略時は CPU 数）。
+        base_seed (int): 乱数シードの基準値（実行番号 i のシードは base_seed + i）。
+        resume (bool): True の場合、結果ファイルに記録済みの実行を省略します。
+
+    Returns:
+        list: 実行番号順に並べたすべての実行結果。
+    """
+    folder = os.path.dirname(output_path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+
+    fingerprint = scenario_fingerprint(scenario)
+    duration = scenario.get("duration", 5.0)
+    completed = {}
+    if resume:
+        _repair_tail(output_path)
+        for row in load_results(output_path):
+            run_id = row.get("run_id")
+            if (
+                isinstance(run_id, int) and 0 <= run_id < len(parameter_sets)
+                and row.get("scenario") == fingerprint
+                and row.get("seed") == base_seed + run_id
+                and row.get("duration") == duration
+                and row.get("params") == parameter_sets[run_id]
+            ):
+                completed[run_id] = row
+    else:
+        open(output_path, "w").close()
+
+    jobs = [
+        (run_id, scenario, fingerprint, params, base_seed + run_id)
+        for run_id, params in enumerate(parameter_sets)
+        if run_id not in completed
+    ]
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as executor, open(output_path, "a", encoding="utf-8") as file:
+            futures = [executor.submit(_run_job, job) for job in jobs]
+            for future in as_completed(futures):
+                row = future.result()
+                file.write(json.dumps(row, ensure_ascii=False) + "\n")
+                file.flush()
+                completed[row["run_id"]] = row
+                print(f"スイープの実行 {row['run_id']} が完了しました（{len(completed)}/{len(parameter_sets)}）")
+
+    return [completed[run_id] for run_id in sorted(completed)]
+
+def save_table_csv(rows, file_path):
+    """
+    スイープ結果をパラメータと集計値を列とする 1 つの表として CSV ファイルに保存します。
+
+    Args:
+        rows (list): run_sweep が返した実行結果のリスト。
+        file_path (str): 保存先のパス。
+    """
+    param_names = list(dict.fromkeys(name for row in rows for name in row["params"]))
+    metric_names = list(dict.fromkeys(name for row in rows for name in row["metrics"]))
+    with open(file_path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["run_id", "seed"] + param_names + metric_names)
+        for row in rows:
+            writer.writerow(
+                [row["run_id"], row["seed"]]
+                + [row["params"].get(name) for name in param_names]
+                + [row["metrics"].get(name) for name in metric_names]
+            )
+    print(f"スイープ結果を {file_path} に保存しました。")
@@ -81,8 +81,8 @@ def build_network_from_config(emulator, config):
     # リンクの生成
     for link_config in config['links']:
         # get_node_by_name を使って Node オブジェクトを取得
-        node1 = emulator.get_node_by_name(link_config['node1'])[1]
-        node2 = emulator.get_node_by_name(link_config['node2'])[1]
+        node1 = emulator.get_node_by_name(link_config['node1'])
+        node2 = emulator.get_node_by_name(link_config['node2'])
         if node1 is None or node2 is None:
             raise ValueError(f"リンクのノードが見つかりません: {link_config['node1']}, {link_config['node2']}")
 
@@ -92,12 +92,10 @@ def build_network_from_config(emulator, config):
             node2=node2,
             bandwidth=link_config.get('bandwidth', 100),
             delay=link_config.get('delay', 10),
-            packet_loss_rate=link_config.get('packet_loss_rate', 0.0)
+            packet_loss_rate=link_config.get('packet_loss_rate', 0.0),
+            buffer_size=link_config.get('buffer_size', 10)
         )
-        emulator.add_link(link)  # エミュレータにリンクを追加
-        # ノードにリンクを追加
-        node1.add_link(link)
-        node2.add_link(link)
+        emulator.add_link(link)  # エミュレータにリンクを追加（ノードへの接続は Link の作成時に行われる）
 
 def initialize_controllers(emulator, config):
     """
@@ -117,6 +115,13 @@ def initialize_controllers(emulator, config):
         controller.set_ip(controller_data['ip_address'])
         controller.set_port(controller_data['port'])
 
+        # グループを各スイッチに設定（ルールの "group" アクションから参照されるため、ルールより先に設定する）
+        for group in controller_data.get('groups', []):
+            switch = emulator.get_node_by_name(group['switch_name'])
+            if switch is None:
+                raise ValueError(f"スイッチ {group['switch_name']} が見つかりません")
+            controller.send_group_mod(switch, group['group_id'], group['type'], group['buckets'])
+
         # ルールを各スイッチに設定
         for rule in controller_data['rules']:
             switch_name = rule.get('switch_name')
@@ -125,11 +130,33 @@ def initialize_controllers(emulator, config):
             if switch is None:
                 raise ValueError(f"スイッチ {switch_name} が見つかりません")
 
-            # フローエントリを設定
-            switch.install_flow(
-                (rule['src_ip'], rule['dst_ip']),
-                {'out_port': rule['out_port']}
-            )
+            # フローエントリを設定（"match" を指定したルールは優先度付きのワイルドカードのエントリ）
+            # "actions" を指定したルールはパイプラインのアクション（goto_table や set_field など）を使用する
+            action = rule['actions'] if 'actions' in rule else {'out_port': rule['out_port']}
+            if 'match' in rule:
+                switch.install_flow(
+                    rule['match'], action, rule.get('priority'),
+                    rule.get('idle_timeout', 0), rule.get('hard_timeout', 0), rule.get('table_id', 0)
+                )
+            else:
+                switch.install_flow(
+                    (rule['src_ip'], rule['dst_ip']),
+                    action,
+                    rule.get('priority'),
+                    rule.get('idle_timeout', 0),
+                    rule.get('hard_timeout', 0),
+                    rule.get('table_id', 0)
+                )
+
+        # CIDR の経路をスイッチごとにまとめて転送表に設定
+        routes = {}
+        for route in controller_data.get('routes', []):
+            routes.setdefault(route['switch_name'], []).append((route['prefix'], route['out_port']))
+        for switch_name, switch_routes in routes.items():
+            switch = emulator.get_node_by_name(switch_name)
+            if switch is None:
+                raise ValueError(f"スイッチ {switch_name} が見つかりません")
+            controller.send_routes(switch, switch_routes)
 
         # コントローラを各スイッチに設定
         for node in emulator.nodes.values():  # 修正: values() を使用して Node オブジェクトを取得
@@ -177,46 +204,3 @@ def save_results_to_csv(stats, folder_path, file_prefix):
 
     print(f"結果をファイルに保存しました: {file_path}")
     return file_path
-
-
-def initialize_controllers(emulator, config):
-    """
-    controller_config.json の内容に基づいてコントローラを初期化し、スイッチに設定します。
-
-    Args:
-        emulator (Emulator): エミュレータインスタンス。
-        config (dict): controller_config.json から読み込んだ設定データ。
-
-    Returns:
-        list: 作成されたコントローラのリスト。
-    """
-    controllers = []
-
-    for controller_data in config['controllers']:
-        controller = CustomController()
-        controller.set_ip(controller_data['ip_address'])
-        controller.set_port(controller_data['port'])
-
-        # ルールを各スイッチに設定
-        for rule in controller_data['rules']:
-            switch_name = rule.get('switch_name')
-            switch = get_node_by_name(emulator.nodes, switch_name)[1]
-
-            if switch is None:
-                print(emulator.nodes)
-                raise ValueError(f"スイッチ {switch_name} が見つかりません")
-
-            # フローエントリを設定
-            switch.install_flow(
-                (rule['src_ip'], rule['dst_ip']),
-                {'out_port': rule['out_port']}
-            )
-
-        # コントローラを各スイッチに設定
-        for node in emulator.nodes:
-            if isinstance(node, Switch):
-                controller.add_switch(node)
-
-        controllers.append(controller)
-
-    return controllers
\ No newline at end of file